@@ -0,0 +1,58 @@
+"""Multi-day batch optimization.
+
+A batch carries the roster once plus one task list per date. The roster is
+parsed and normalized a single time and shared by every day, and days are
+independent solves, so they run concurrently on the solver pool.
+"""
+import logging
+from typing import Dict, List
+
+from models import BatchOptimizeRequest, BatchSummary, OptimizeRequest, OptimizeResponse
+from roster import Roster
+
+logger = logging.getLogger("optimizer")
+
+
+def day_requests(batch: BatchOptimizeRequest) -> List[OptimizeRequest]:
+    """One ``OptimizeRequest`` per day, all referencing the batch's already validated worker list."""
+    return [
+        OptimizeRequest.model_construct(
+            tasks=day.tasks,
+            workers=batch.workers,
+            date=day.date,
+            previous_assignments=day.previous_assignments,
+            stability_weight=day.stability_weight,
+            solver_options=batch.solver_options,
+            duration_mode=batch.duration_mode,
+            mode=batch.mode,
+            symmetry_breaking=batch.symmetry_breaking,
+            time_granularity_minutes=batch.time_granularity_minutes,
+            lexicographic=batch.lexicographic,
+            timezone=batch.timezone,
+        )
+        for day in batch.days
+    ]
+
+
+def solve_day(req: OptimizeRequest, roster: Roster) -> OptimizeResponse:
+    """Pool entry point: solve one day against the batch's normalized roster."""
+    from optimizer import solve  # pool processes only; the API process never loads OR-Tools
+    return solve(req, roster=roster)
+
+
+def summarize(requests: List[OptimizeRequest], results: Dict[str, OptimizeResponse], wall_time: float) -> BatchSummary:
+    total_units = sum(t.units for req in requests for t in req.tasks)
+    unassigned = sum(u.remaining_units for response in results.values() for u in response.unassigned_tasks)
+    assigned_units = total_units - unassigned
+    solve_time = sum(c.solve_time for response in results.values() for c in response.components)
+    summary = BatchSummary(
+        days=len(results),
+        total_units=total_units,
+        assigned_units=assigned_units,
+        assignment_rate=assigned_units / total_units * 100 if total_units > 0 else 0.0,
+        solve_time=solve_time,
+        wall_time=wall_time,
+    )
+    logger.info(f"Batch of {summary.days} days: {summary.assignment_rate:.1f}% of {total_units} units assigned, "
+                f"{solve_time:.2f}s solve time in {wall_time:.2f}s wall time")
+    return summary
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: reified per-task break constraints vs. fixed break intervals
+
+Builds the same synthetic instance twice and reports model size, build time
+and (with --solve-seconds) the solve:
+- reified: the original two BoolVars and three enforced constraints per
+           (task, worker) pair keeping each piece before or after the break
+- interval: one fixed interval per break in the worker's NoOverlap
+
+Usage:
+    python benchmark_breaks.py --workers 400 --tasks 300
+    python benchmark_breaks.py --workers 12 --tasks 8 --load-factor 0.3 --solve-seconds 30
+"""
+
+import argparse
+import logging
+import time
+
+from ortools.sat.python import cp_model
+
+from benchmark_dependencies import model_size
+from instances import InstanceSpec, generate_instance
+from optimizer import build_model
+from roster import normalize_workers
+
+
+def build_reified(req):
+    """Build without breaks, then add the original before/after-break reification."""
+    windows = normalize_workers(req.workers).break_windows()
+    no_breaks = req.model_copy(update={"workers": [w.model_copy(update={"breaks": []}) for w in req.workers]})
+    built = build_model(no_breaks)
+    model = built.model
+    for (t_id, w_id), presence in built.presences.items():
+        for break_start, break_end in windows[w_id]:
+            before_break = model.NewBoolVar(f"before_break_t{t_id}_w{w_id}")
+            after_break = model.NewBoolVar(f"after_break_t{t_id}_w{w_id}")
+            model.Add(built.end_vars[(t_id, w_id)] <= break_start).OnlyEnforceIf(before_break)
+            model.Add(built.start_vars[(t_id, w_id)] >= break_end).OnlyEnforceIf(after_break)
+            model.AddBoolOr([before_break, after_break]).OnlyEnforceIf(presence)
+    return built
+
+
+def measure(name: str, build, req, solve_seconds: float, search_workers: int):
+    started = time.perf_counter()
+    built = build(req)
+    build_time = time.perf_counter() - started
+    variables, constraints = model_size(built.model)
+    line = f"{name:<9} variables={variables:>9,} constraints={constraints:>9,} build={build_time:6.2f}s"
+    if solve_seconds > 0:
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = solve_seconds
+        solver.parameters.num_search_workers = search_workers
+        status = solver.Solve(built.model)
+        line += (f" status={solver.StatusName(status):<8} objective={solver.ObjectiveValue():>12,.0f}"
+                 f" solve={solver.WallTime():6.2f}s")
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=400)
+    parser.add_argument("--tasks", type=int, default=300)
+    parser.add_argument("--dependency-density", type=float, default=0.0, help="share of tasks depending on an earlier one")
+    parser.add_argument("--load-factor", type=float, default=0.9, help="task units per unit of roster capacity")
+    parser.add_argument("--skills", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--solve-seconds", type=float, default=0.0, help="also solve each model with this time limit")
+    parser.add_argument("--search-workers", type=int, default=8, help="CP-SAT num_search_workers")
+    args = parser.parse_args()
+
+    logging.getLogger("optimizer").setLevel(logging.ERROR)
+    req = generate_instance(InstanceSpec(workers=args.workers, tasks=args.tasks, skills=args.skills,
+                                         dependency_density=args.dependency_density, load_factor=args.load_factor,
+                                         seed=args.seed))
+    edges = sum(len(t.dependencies or []) for t in req.tasks)
+    print(f"Instance: {args.workers} workers, {args.tasks} tasks, {edges} dependency edges, {args.skills} skills")
+    measure("reified", build_reified, req, args.solve_seconds, args.search_workers)
+    measure("interval", build_model, req, args.solve_seconds, args.search_workers)
+
+
+if __name__ == "__main__":
+    main()
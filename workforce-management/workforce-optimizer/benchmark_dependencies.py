@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pairwise vs. aggregate task-dependency formulation
+
+Builds the same synthetic instance twice and reports model size and build time:
+- before: one enforced constraint per (task worker, dependency worker) pair
+- after:  per-task aggregate start/end variables (add_dependency_constraints)
+
+Usage:
+    python benchmark_dependencies.py --workers 400 --tasks 300 --dependency-density 0.67
+    python benchmark_dependencies.py --workers 30 --tasks 20 --dependency-density 0.5 --load-factor 0.3 --solve-seconds 10
+"""
+
+import argparse
+import logging
+import time
+
+from ortools.sat.python import cp_model
+
+from instances import InstanceSpec, generate_instance
+from models import OptimizeRequest
+from optimizer import build_model
+
+
+def add_pairwise_dependencies(req: OptimizeRequest, built):
+    """The original O(W^2)-per-edge dependency constraints."""
+    for t in req.tasks:
+        for dep in t.dependencies or []:
+            for w1 in req.workers:
+                for w2 in req.workers:
+                    if (t.id, w1.id) in built.start_vars and (dep, w2.id) in built.end_vars:
+                        built.model.Add(built.start_vars[(t.id, w1.id)] >= built.end_vars[(dep, w2.id)]).OnlyEnforceIf([
+                            built.presences[(t.id, w1.id)], built.presences[(dep, w2.id)]
+                        ])
+
+
+def build_pairwise(req: OptimizeRequest):
+    no_deps = req.model_copy(update={"tasks": [t.model_copy(update={"dependencies": []}) for t in req.tasks]})
+    built = build_model(no_deps)
+    add_pairwise_dependencies(req, built)
+    return built
+
+
+def model_size(model: cp_model.CpModel) -> tuple:
+    proto = model.Proto()
+    return len(proto.variables), len(proto.constraints)
+
+
+def measure(name: str, build, req: OptimizeRequest, solve_seconds: float):
+    started = time.perf_counter()
+    built = build(req)
+    build_time = time.perf_counter() - started
+    variables, constraints = model_size(built.model)
+    line = f"{name:<10} variables={variables:>9,} constraints={constraints:>10,} build={build_time:7.2f}s"
+    if solve_seconds > 0:
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = solve_seconds
+        status = solver.Solve(built.model)
+        line += f" status={solver.StatusName(status)} objective={solver.ObjectiveValue():.0f} solve={solver.WallTime():.2f}s"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=150)
+    parser.add_argument("--dependency-density", type=float, default=0.67, help="share of tasks depending on an earlier one")
+    parser.add_argument("--load-factor", type=float, default=0.9, help="task units per unit of roster capacity")
+    parser.add_argument("--skills", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--solve-seconds", type=float, default=0.0, help="also solve each model with this time limit")
+    args = parser.parse_args()
+
+    logging.getLogger("optimizer").setLevel(logging.ERROR)
+    req = generate_instance(InstanceSpec(workers=args.workers, tasks=args.tasks, skills=args.skills,
+                                         dependency_density=args.dependency_density, load_factor=args.load_factor,
+                                         seed=args.seed))
+    edges = sum(len(t.dependencies or []) for t in req.tasks)
+    print(f"Instance: {args.workers} workers, {args.tasks} tasks, {edges} dependency edges, {args.skills} skills")
+    measure("pairwise", build_pairwise, req, args.solve_seconds)
+    measure("aggregate", build_model, req, args.solve_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: solve one generated instance per size tier and compare with baselines
+
+Each tier (see TIERS) is generated by instances.generate_instance and solved
+in a fresh process, recording model-build time, solve wall time, objective,
+gap, assignment rate, model size and peak memory (max RSS). CP-SAT runs with
+one search worker and a deterministic time limit, so objectives are
+reproducible on the same OR-Tools version. Results are compared with
+benchmark_baselines.json; the exit status is 1 if any tier regressed.
+
+Usage:
+    python benchmark_suite.py                      # all tiers, compare with baselines
+    python benchmark_suite.py --tiers small medium
+    python benchmark_suite.py --update-baselines   # record the current results
+    python benchmark_suite.py --time-tolerance 1.0 # allow timings to double (e.g. on a slower machine)
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+
+import ortools
+
+from instances import InstanceSpec, generate_instance
+from models import SolverOptions
+from optimizer import assignment_rate, build_model, solve
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baselines.json")
+
+TIERS = {
+    "small": (InstanceSpec(workers=30, tasks=20, skills=6, seed=1), 0.5),
+    "medium": (InstanceSpec(workers=150, tasks=100, skills=12, seed=2), 1.0),
+    "large": (InstanceSpec(workers=300, tasks=200, skills=16, seed=3), 2.0),
+}
+
+# Metric -> (direction, relative tolerance, absolute slack). "max" metrics regress when they
+# grow beyond the tolerance, "min" metrics when they shrink. Timing tolerances are set by --time-tolerance.
+CHECKS = {
+    "build_time": ("max", None, 0.05),
+    "wall_time": ("max", None, 0.1),
+    "peak_rss_mb": ("max", 0.25, 20.0),
+    "objective": ("min", 0.01, 0.0),
+    "assignment_rate": ("min", 0.0, 1.0),
+    "gap": ("max", 0.0, 0.02),
+}
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_tier(name: str) -> Dict[str, float]:
+    """Generate and solve one tier; meant to run in a fresh process so peak RSS is per tier."""
+    logging.getLogger("optimizer").setLevel(logging.ERROR)
+    spec, deterministic_time = TIERS[name]
+    req = generate_instance(spec)
+    req.solver_options = SolverOptions(num_search_workers=1, max_deterministic_time=deterministic_time,
+                                       random_seed=0, time_limit=300.0)
+    # Best of three builds, since one is short enough to be noisy
+    build_time = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        built = build_model(req)
+        build_time = min(build_time, time.perf_counter() - started)
+    response = solve(req)
+    stats = response.solver_stats
+    return {
+        "workers": spec.workers,
+        "tasks": spec.tasks,
+        "variables": len(built.model.Proto().variables) if built is not None else 0,
+        "constraints": len(built.model.Proto().constraints) if built is not None else 0,
+        "status": stats.status if stats is not None else "MODEL_INVALID",
+        "build_time": round(build_time, 3),
+        "wall_time": round(stats.wall_time, 3) if stats is not None else 0.0,
+        "objective": stats.objective if stats is not None and stats.objective is not None else 0.0,
+        "gap": round(stats.gap, 4) if stats is not None and stats.gap is not None else 0.0,
+        "assignment_rate": round(assignment_rate(req, response), 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def compare(result: Dict[str, float], baseline: Dict[str, float], time_tolerance: float = 0.5) -> List[str]:
+    """Regressions of ``result`` against ``baseline``, one message per metric."""
+    regressions = []
+    for metric, (direction, tolerance, slack) in CHECKS.items():
+        if metric not in baseline:
+            continue
+        tolerance = time_tolerance if tolerance is None else tolerance
+        expected, actual = baseline[metric], result[metric]
+        if direction == "max" and actual > expected * (1 + tolerance) + slack:
+            regressions.append(f"{metric} {actual} > baseline {expected}")
+        if direction == "min" and actual < expected * (1 - tolerance) - slack:
+            regressions.append(f"{metric} {actual} < baseline {expected}")
+    return regressions
+
+
+def load_baselines(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=list(TIERS))
+    parser.add_argument("--baselines", default=BASELINES)
+    parser.add_argument("--update-baselines", action="store_true")
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="allowed relative growth of timings")
+    args = parser.parse_args()
+
+    baselines = load_baselines(args.baselines)
+    if baselines.get("ortools") not in (None, ortools.__version__):
+        print(f"Baselines were recorded with OR-Tools {baselines['ortools']}, running {ortools.__version__}")
+    failed = False
+    for name in args.tiers:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            result = executor.submit(run_tier, name).result()
+        print(f"{name:<7} {result['workers']:>5} workers {result['tasks']:>4} tasks  status={result['status']:<8} "
+              f"objective={result['objective']:>14,.0f} gap={result['gap']:.4f} rate={result['assignment_rate']:5.1f}% "
+              f"build={result['build_time']:6.2f}s wall={result['wall_time']:6.2f}s rss={result['peak_rss_mb']:7.1f}MB "
+              f"vars={result['variables']:,}")
+        if args.update_baselines:
+            baselines[name] = result
+            continue
+        if name not in baselines:
+            print(f"  no baseline for {name}")
+            continue
+        for regression in compare(result, baselines[name], args.time_tolerance):
+            failed = True
+            print(f"  REGRESSION {regression}")
+
+    if args.update_baselines:
+        baselines["ortools"] = ortools.__version__
+        with open(args.baselines, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baselines written to {args.baselines}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
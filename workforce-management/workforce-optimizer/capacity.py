@@ -0,0 +1,168 @@
+"""Capacity presolve: how much of a request can be assigned at all.
+
+Before any CP-SAT model is built, the eligible (task, worker) pairs are
+relaxed to a transportation LP: units of each task flow to its eligible
+workers, each unit costs a worker ``60 / productivity`` minutes of their free
+shift time, and every pair is capped at the units that fit its worker's
+longest stretch between breaks. Productivity makes this a generalized flow
+rather than a plain max-flow, so it is solved with GLOP. Its optimum, using
+the model's per-unit objective coefficients, is an upper bound on the CP-SAT
+objective (the relaxation drops dependencies, whole-minute durations and the
+load penalty). A cheaper per-skill bound (demand vs. what the skill's workers
+can do) is reported with every response.
+"""
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from models import OptimizeRequest, SkillCapacity
+from replan import FrozenWork
+from roster import UNIT_MINUTES, Roster, TaskEligibility, free_windows, longest_window, unit_rates
+
+logger = logging.getLogger("optimizer")
+
+
+def max_lp_pairs() -> int:
+    """Largest number of eligible pairs for which the LP bound is computed."""
+    return int(os.getenv("OPTIMIZER_CAPACITY_MAX_PAIRS", 200000))
+
+
+@dataclass
+class PairCapacity:
+    """Eligible pairs as parallel arrays, with unit caps for the (re-plan) window."""
+    task: np.ndarray  # index into req.tasks
+    worker: np.ndarray  # roster index
+    rate: np.ndarray  # roster.unit_rates of the pair's productivity
+    max_units: np.ndarray
+    coefficient: np.ndarray  # objective value per unit
+    free_minutes: np.ndarray  # per roster worker: shift (or re-plan window) minus breaks
+
+    def __len__(self) -> int:
+        return len(self.task)
+
+
+def pair_capacity(req: OptimizeRequest, roster: Roster, eligibility: Dict[str, TaskEligibility],
+                  frozen: Optional[FrozenWork] = None) -> PairCapacity:
+    longest = roster.longest_window.copy()
+    free = (roster.shift_end - roster.shift_start - roster.break_minutes).astype(np.int64)
+    if frozen is not None:
+        index = {w_id: i for i, w_id in enumerate(roster.worker_ids)}
+        for w_id, start in frozen.window_start.items():
+            i = index.get(w_id)
+            if i is None:
+                continue
+            end = int(roster.shift_end[i])
+            longest[i] = longest_window(start, end, roster.breaks[i])
+            free[i] = sum(b - a for a, b in free_windows(start, end, roster.breaks[i]))
+
+    task, worker, rate, max_units, coefficient = [], [], [], [], []
+    for j, t in enumerate(req.tasks):
+        elig = eligibility[t.id]
+        if len(elig) == 0:
+            continue
+        rates = unit_rates(elig.productivity)
+        caps = np.minimum(np.minimum(elig.max_units, rates * longest[elig.workers] // UNIT_MINUTES), t.units)
+        task.append(np.full(len(elig), j))
+        worker.append(elig.workers)
+        rate.append(rates)
+        max_units.append(caps)
+        coefficient.append(t.priority * 1000 + (elig.quality * 500).astype(np.int64))
+    if not task:
+        empty = np.empty(0, dtype=np.int64)
+        return PairCapacity(empty, empty, empty, empty, empty, free)
+    pairs = PairCapacity(
+        task=np.concatenate(task),
+        worker=np.concatenate(worker),
+        rate=np.concatenate(rate),
+        max_units=np.concatenate(max_units),
+        coefficient=np.concatenate(coefficient),
+        free_minutes=free,
+    )
+    usable = pairs.max_units > 0
+    if not usable.all():
+        pairs = PairCapacity(pairs.task[usable], pairs.worker[usable], pairs.rate[usable],
+                             pairs.max_units[usable], pairs.coefficient[usable], free)
+    return pairs
+
+
+def prune_eligibility(req: OptimizeRequest, eligibility: Dict[str, TaskEligibility],
+                      pairs: PairCapacity) -> Dict[str, TaskEligibility]:
+    """``eligibility`` without the pairs that cannot hold a unit, and with ``max_units`` cut to the pair caps.
+
+    Tasks whose pairs are unchanged keep their (shared) eligibility arrays.
+    """
+    # pair_capacity emits the pairs task by task, in eligibility order
+    bounds = np.searchsorted(pairs.task, np.arange(len(req.tasks) + 1))
+    pruned = {}
+    for j, t in enumerate(req.tasks):
+        elig = eligibility[t.id]
+        caps = pairs.max_units[bounds[j]:bounds[j + 1]]
+        if len(caps) == len(elig) and np.array_equal(caps, elig.max_units):
+            pruned[t.id] = elig
+            continue
+        keep = np.isin(elig.workers, pairs.worker[bounds[j]:bounds[j + 1]])
+        pruned[t.id] = TaskEligibility(workers=elig.workers[keep], productivity=elig.productivity[keep],
+                                       quality=elig.quality[keep], max_units=caps)
+    return pruned
+
+
+def skill_capacity(req: OptimizeRequest, pairs: PairCapacity) -> List[SkillCapacity]:
+    """Per skill: demanded units and an upper bound on the units its eligible workers can do.
+
+    Each worker contributes at most what fits their free minutes at this
+    skill's productivity, and each task at most its units; workers shared
+    between skills count fully for each, so the bound is optimistic.
+    """
+    skills = np.array([t.skill_id for t in req.tasks], dtype=np.int64)
+    units = np.array([t.units for t in req.tasks], dtype=np.int64)
+    result = []
+    for skill in sorted(set(skills.tolist())):
+        on_skill = skills[pairs.task] == skill
+        demand = int(units[skills == skill].sum())
+        if not on_skill.any():
+            result.append(SkillCapacity(skill_id=skill, demand_units=demand, max_assignable_units=0))
+            continue
+        task_side = np.zeros(len(req.tasks), dtype=np.int64)
+        np.add.at(task_side, pairs.task[on_skill], pairs.max_units[on_skill])
+        worker_side = np.zeros(len(pairs.free_minutes), dtype=np.int64)
+        np.maximum.at(worker_side, pairs.worker[on_skill],
+                      pairs.rate[on_skill] * pairs.free_minutes[pairs.worker[on_skill]] // UNIT_MINUTES)
+        bound = min(demand, int(np.minimum(task_side, units)[skills == skill].sum()), int(worker_side.sum()))
+        result.append(SkillCapacity(skill_id=skill, demand_units=demand, max_assignable_units=bound))
+        if bound < demand:
+            logger.info(f"Skill {skill}: at most {bound} of {demand} units can be assigned")
+    return result
+
+
+def objective_bound(req: OptimizeRequest, pairs: PairCapacity) -> Optional[float]:
+    """LP upper bound on the model objective; None when it is not computed.
+
+    Skipped for more than ``OPTIMIZER_CAPACITY_MAX_PAIRS`` pairs and for
+    requests with a ``stability_weight``, whose objective has per-pair terms.
+    """
+    if len(pairs) == 0:
+        return 0.0
+    if len(pairs) > max_lp_pairs() or req.stability_weight > 0:
+        return None
+    from ortools.linear_solver import pywraplp
+
+    solver = pywraplp.Solver.CreateSolver("GLOP")
+    units = [solver.NumVar(0, float(cap), "") for cap in pairs.max_units.tolist()]
+    task_rows = [solver.Constraint(0, t.units) for t in req.tasks]
+    worker_rows = {}
+    objective = solver.Objective()
+    for u, j, i, rate, coef in zip(units, pairs.task.tolist(), pairs.worker.tolist(),
+                                   pairs.rate.tolist(), pairs.coefficient.tolist()):
+        task_rows[j].SetCoefficient(u, 1)
+        if i not in worker_rows:
+            worker_rows[i] = solver.Constraint(0, float(pairs.free_minutes[i]))
+        worker_rows[i].SetCoefficient(u, UNIT_MINUTES / rate)
+        objective.SetCoefficient(u, coef)
+    objective.SetMaximization()
+    if solver.Solve() != pywraplp.Solver.OPTIMAL:
+        logger.warning("Capacity LP did not solve to optimality, no objective bound")
+        return None
+    return objective.Value()
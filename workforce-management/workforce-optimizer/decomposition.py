@@ -0,0 +1,76 @@
+"""Split a request into independent subproblems.
+
+Tasks only interact with workers that are eligible for them, and with each
+other through shared workers and ``dependencies``. The connected components of
+that task-worker-dependency graph can therefore be solved as separate CP-SAT
+models: the objective is a sum of per-pair and per-worker terms, so the merged
+plan is exactly as good as one solved as a whole.
+"""
+from typing import Dict, List
+
+from models import OptimizeRequest
+from roster import Roster, TaskEligibility, take_workers
+
+
+class _DisjointSet:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, x: int) -> int:
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[rb] = ra
+
+
+def find_components(req: OptimizeRequest, roster: Roster, eligibility: Dict[str, TaskEligibility]) -> List[OptimizeRequest]:
+    """One sub-request per connected component that has at least one eligible pair.
+
+    Tasks without eligible workers and workers without eligible tasks belong to
+    no component; callers report them as unassigned / idle.
+    """
+    n_tasks = len(req.tasks)
+    nodes = _DisjointSet(n_tasks + len(roster))
+    task_index = {t.id: j for j, t in enumerate(req.tasks)}
+
+    # Tasks of the same (skill, priority) class share one eligibility array, so
+    # join each array's workers once and attach every task to its first worker
+    joined = set()
+    for j, t in enumerate(req.tasks):
+        workers = eligibility[t.id].workers
+        if len(workers) == 0:
+            continue
+        first = n_tasks + int(workers[0])
+        if id(workers) not in joined:
+            joined.add(id(workers))
+            for i in workers[1:].tolist():
+                nodes.union(first, n_tasks + i)
+        nodes.union(j, first)
+
+    # A dependency only constrains anything when both tasks can be assigned
+    for j, t in enumerate(req.tasks):
+        if len(eligibility[t.id]) == 0:
+            continue
+        for dep in t.dependencies or []:
+            if dep in task_index and len(eligibility[dep]):
+                nodes.union(j, task_index[dep])
+
+    tasks_by_root = {}
+    for j, t in enumerate(req.tasks):
+        if len(eligibility[t.id]):
+            tasks_by_root.setdefault(nodes.find(j), []).append(t)
+    workers_by_root = {}
+    for i in range(len(roster)):
+        workers_by_root.setdefault(nodes.find(n_tasks + i), []).append(i)
+
+    return [
+        req.model_copy(update={"tasks": tasks, "workers": take_workers(req.workers, workers_by_root[root])})
+        for root, tasks in tasks_by_root.items()
+    ]
@@ -0,0 +1,61 @@
+"""Feasibility diagnostics for ``POST /optimize/diagnose``.
+
+Explains, per task, why workers holding its skill are not eligible: their
+level is below the task's minimum (``get_minimum_skill_level_required``), or
+the whole task takes longer than their available shift. Tasks nobody can take
+also get a single ``reason``. Every check is a NumPy pass over the task's
+skill holders, so this is cheap enough to call on the full roster; ``/optimize``
+itself only logs it at debug level.
+"""
+from typing import Optional
+
+import numpy as np
+
+from capacity import pair_capacity, skill_capacity
+from models import DiagnoseResponse, OptimizeRequest, TaskDiagnosis
+from roster import UNIT_MINUTES, Roster, compute_eligibility, minimum_skill_levels, request_roster, unit_rates
+
+
+def diagnose(req: OptimizeRequest, roster: Optional[Roster] = None) -> DiagnoseResponse:
+    if roster is None:
+        roster = request_roster(req)
+    eligibility = compute_eligibility(req.tasks, roster)
+    worker_ids = np.asarray(roster.worker_ids, dtype=object)
+    available = roster.available_minutes
+    min_levels = minimum_skill_levels(np.array([t.priority for t in req.tasks], dtype=np.int64))
+
+    tasks = []
+    for t, min_level in zip(req.tasks, min_levels.tolist()):
+        eligible = len(eligibility[t.id])
+        holders = roster.skill_workers.get(t.skill_id)
+        if holders is None or len(holders) == 0:
+            tasks.append(TaskDiagnosis(task_id=t.id, skill_id=t.skill_id, min_skill_level=min_level,
+                                       skill_holders=0, eligible_workers=0, reason="missing_skill"))
+            continue
+        col = roster.skill_col[t.skill_id]
+        # Critical tasks (priority >= 8) accept under-skilled workers, so only others exclude them
+        below = roster.skill_level[holders, col] < min_level
+        if t.priority >= 8:
+            below[:] = False
+        rate = unit_rates(roster.productivity[holders, col])
+        duration = -(-UNIT_MINUTES * t.units // np.maximum(rate, 1))
+        too_long = duration > available[holders]
+        reason = None
+        if eligible == 0:
+            reason = "level_below_minimum" if below.all() else "duration_exceeds_shift"
+        tasks.append(TaskDiagnosis(
+            task_id=t.id,
+            skill_id=t.skill_id,
+            min_skill_level=min_level,
+            skill_holders=len(holders),
+            eligible_workers=eligible,
+            reason=reason,
+            level_below_minimum=worker_ids[holders[below]].tolist(),
+            duration_exceeds_shift=worker_ids[holders[too_long & ~below]].tolist(),
+        ))
+
+    return DiagnoseResponse(
+        tasks=tasks,
+        unassignable_tasks=sum(1 for d in tasks if d.reason is not None),
+        capacity=skill_capacity(req, pair_capacity(req, roster, eligibility)),
+    )
@@ -0,0 +1,90 @@
+"""Seeded synthetic ``OptimizeRequest`` instances for benchmarks and tests.
+
+Instances look like a warehouse day: a few common skills and a tail of
+rare ones, workers holding a handful of skills each with a personal speed
+around the skill's base rate, day / evening / overnight shifts in configurable
+proportions, and task demand sized against the roster's capacity. Everything is
+drawn from one ``random.Random(seed)``, so a spec always yields the same request.
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+from models import OptimizeRequest, Task, Worker
+
+SHIFTS = {
+    "day": ("08:00", "16:00"),
+    "evening": ("16:00", "00:00"),
+    "night": ("00:00", "08:00"),
+    "overnight": ("22:00", "06:00"),
+}
+PROCESSES = ["Receive", "Stow", "Pick", "Pack", "Sort", "Ship"]
+TASK_TYPES = ["In", "Out"]
+
+
+@dataclass
+class InstanceSpec:
+    workers: int
+    tasks: int
+    skills: int = 10
+    skills_per_worker: Tuple[int, int] = (1, 3)  # inclusive range
+    dependency_density: float = 0.2  # share of tasks that depend on an earlier task
+    shift_mix: Dict[str, float] = field(default_factory=lambda: {"day": 0.5, "evening": 0.3, "overnight": 0.2})
+    productivity_spread: float = 0.25  # spread of worker speed around the skill's base rate (0 = identical)
+    load_factor: float = 0.9  # total task units per unit of roster capacity
+    seed: int = 0
+
+
+def generate_instance(spec: InstanceSpec, date: str = "2025-07-16") -> OptimizeRequest:
+    rng = random.Random(spec.seed)
+    skill_ids = [100 + i for i in range(spec.skills)]
+    # Skill popularity falls off like 1/rank, so a few skills are common and the rest rare
+    popularity = [1.0 / (rank + 1) for rank in range(spec.skills)]
+    base_rate = {s: rng.randint(40, 120) for s in skill_ids}
+    shift_names = list(spec.shift_mix)
+    shift_weights = [spec.shift_mix[name] for name in shift_names]
+
+    workers = []
+    capacity = {s: 0.0 for s in skill_ids}  # units per skill the roster could do if it did nothing else
+    for i in range(spec.workers):
+        count = min(spec.skills, rng.randint(*spec.skills_per_worker))
+        held = set()
+        while len(held) < count:
+            held.add(rng.choices(skill_ids, weights=popularity)[0])
+        held = sorted(held)
+        productivity = {str(s): max(1, round(base_rate[s] * rng.lognormvariate(0, spec.productivity_spread))) for s in held}
+        levels = {str(s): rng.choices([1, 2, 3, 4], weights=[2, 4, 3, 1])[0] for s in held}
+        shift_start, shift_end = SHIFTS[rng.choices(shift_names, weights=shift_weights)[0]]
+        break_minutes = rng.choice([30, 45, 60])
+        workers.append(Worker(
+            id=f"W{i}",
+            name=f"Worker {i}",
+            skills=held,
+            productivity=productivity,
+            skill_levels=levels,
+            shift_start=shift_start,
+            shift_end=shift_end,
+            break_minutes=break_minutes,
+        ))
+        hours = (8 * 60 - break_minutes) / 60.0
+        for s in held:
+            capacity[s] += productivity[str(s)] * hours / len(held)
+
+    # Demand follows the same popularity as the skills, scaled to the roster's capacity
+    task_skills = [rng.choices(skill_ids, weights=popularity)[0] for _ in range(spec.tasks)]
+    tasks_per_skill = {s: task_skills.count(s) for s in skill_ids}
+    tasks = []
+    for j, s in enumerate(task_skills):
+        mean_units = spec.load_factor * capacity[s] / tasks_per_skill[s]
+        tasks.append(Task(
+            id=str(j),
+            name=f"{PROCESSES[j % len(PROCESSES)]} {j}",
+            skill_id=s,
+            priority=rng.choices(range(1, 11), weights=[3, 3, 3, 3, 3, 2, 2, 2, 1, 1])[0],
+            units=max(1, round(mean_units * rng.uniform(0.5, 1.5))),
+            type=rng.choice(TASK_TYPES),
+        ))
+    for j in range(1, spec.tasks):
+        if rng.random() < spec.dependency_density:
+            tasks[j].dependencies = [str(rng.randrange(j))]
+    return OptimizeRequest(tasks=tasks, workers=workers, date=date)
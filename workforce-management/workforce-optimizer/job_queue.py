@@ -0,0 +1,264 @@
+"""Durable job queue in a local SQLite file, shared by API and solver processes.
+
+``/optimize/jobs`` and ``/optimize`` solve on the API process's own pool, so a
+crash or deploy loses every solve in flight and solver capacity can only grow
+with API capacity. With ``OPTIMIZER_QUEUE_PATH`` set, ``POST /optimize/queue``
+instead stores the request in this file and returns a job id. Any number of
+solver processes on the host (``python job_queue.py``) claim jobs from it:
+
+- a claim is a lease of ``lease_seconds``, renewed while the solve runs; a job
+  whose lease expires (its process died) goes to the next claimant, and fails
+  after ``max_attempts`` claims;
+- results are stored with the job, so they survive restarts of either side,
+  and finished jobs are dropped after ``ttl_seconds``;
+- a request equal to a queued, running or completed job (same
+  ``result_cache.request_key``) returns that job instead of adding another.
+
+SQLite's write lock serializes claims, so a job is never leased twice at once.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from models import OptimizeRequest
+from result_cache import request_key
+
+logger = logging.getLogger("optimizer")
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+WAIT_WINDOW = 300.0  # seconds of recent claims averaged into the reported wait time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    request_key TEXT NOT NULL,
+    request TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_by_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_by_key ON jobs (request_key);
+"""
+
+
+@dataclass
+class Lease:
+    job_id: str
+    request: str  # OptimizeRequest JSON
+    owner: str
+    attempt: int
+
+
+class JobQueue:
+    def __init__(self, path: str, lease_seconds: float = 60.0, max_attempts: int = 3, ttl_seconds: float = 86400.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.ttl_seconds = ttl_seconds
+        with self._connect() as db:
+            # WAL lets readers (status polls, metrics) proceed while a claim holds the write lock
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls, path: Optional[str] = None) -> Optional["JobQueue"]:
+        """Configure from ``OPTIMIZER_QUEUE_PATH`` and the ``OPTIMIZER_QUEUE_*`` settings; None when no path is set."""
+        path = path or os.getenv("OPTIMIZER_QUEUE_PATH")
+        if not path:
+            return None
+        return cls(
+            path,
+            lease_seconds=float(os.getenv("OPTIMIZER_QUEUE_LEASE", 60)),
+            max_attempts=int(os.getenv("OPTIMIZER_QUEUE_MAX_ATTEMPTS", 3)),
+            ttl_seconds=float(os.getenv("OPTIMIZER_QUEUE_TTL", 86400)),
+        )
+
+    @contextmanager
+    def _connect(self):
+        # Autocommit; multi-statement updates open their own BEGIN IMMEDIATE, rolled back if not committed
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def enqueue(self, req: OptimizeRequest, refresh: bool = False) -> Tuple[dict, bool]:
+        """Add ``req`` unless an equal job exists; returns (job summary, deduplicated).
+
+        ``refresh`` always adds a new job.
+        """
+        key = request_key(req)
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                       (COMPLETED, FAILED, now - self.ttl_seconds))
+            row = None
+            if not refresh:
+                row = db.execute("SELECT id FROM jobs WHERE request_key = ? AND status != ? ORDER BY created_at DESC LIMIT 1",
+                                 (key, FAILED)).fetchone()
+            if row is not None:
+                job_id = row[0]
+            else:
+                job_id = uuid.uuid4().hex
+                db.execute("INSERT INTO jobs (id, request_key, request, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                           (job_id, key, req.model_dump_json(), QUEUED, now))
+            db.execute("COMMIT")
+        return self.get(job_id, with_result=False), row is not None
+
+    def get(self, job_id: str, with_result: bool = True) -> Optional[dict]:
+        """Job state, with the response as a dict once completed; None for an unknown (or expired) job."""
+        with self._connect() as db:
+            row = db.execute("SELECT status, attempts, created_at, started_at, finished_at, error, result "
+                             "FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        status, attempts, created_at, started_at, finished_at, error, result = row
+        state = {"job_id": job_id, "status": status, "attempts": attempts, "created_at": created_at,
+                 "started_at": started_at, "finished_at": finished_at, "error": error}
+        if with_result and result is not None:
+            state["result"] = json.loads(result)
+        return state
+
+    def claim(self, owner: str) -> Optional[Lease]:
+        """Lease the oldest queued job (or one whose lease expired) to ``owner``; None when there is none."""
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            while True:
+                row = db.execute("SELECT id, request, attempts FROM jobs WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                                 "ORDER BY created_at LIMIT 1", (QUEUED, RUNNING, now)).fetchone()
+                if row is None:
+                    db.execute("COMMIT")
+                    return None
+                job_id, request, attempts = row
+                if attempts < self.max_attempts:
+                    break
+                # Every claimant so far died mid-solve; do not hand the job to another
+                db.execute("UPDATE jobs SET status = ?, finished_at = ?, error = ?, lease_owner = NULL WHERE id = ?",
+                           (FAILED, now, f"Solver process lost {attempts} times", job_id))
+                logger.error(f"Queued job {job_id} failed: solver process lost {attempts} times")
+            db.execute("UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ?, "
+                       "started_at = COALESCE(started_at, ?) WHERE id = ?",
+                       (RUNNING, owner, now + self.lease_seconds, now, job_id))
+            db.execute("COMMIT")
+        return Lease(job_id, request, owner, attempts + 1)
+
+    def renew(self, lease: Lease) -> bool:
+        """Extend ``lease``; False once another process has taken the job over."""
+        return self._update(lease, "lease_expires = ?", time.time() + self.lease_seconds)
+
+    def complete(self, lease: Lease, result: str) -> bool:
+        """Store the response JSON; False (and nothing stored) if the lease was lost."""
+        return self._update(lease, "status = ?, finished_at = ?, result = ?, lease_owner = NULL",
+                            COMPLETED, time.time(), result)
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        return self._update(lease, "status = ?, finished_at = ?, error = ?, lease_owner = NULL",
+                            FAILED, time.time(), error)
+
+    def _update(self, lease: Lease, assignments: str, *values) -> bool:
+        with self._connect() as db:
+            cursor = db.execute(f"UPDATE jobs SET {assignments} WHERE id = ? AND status = ? AND lease_owner = ?",
+                                (*values, lease.job_id, RUNNING, lease.owner))
+        return cursor.rowcount == 1
+
+    def stats(self) -> dict:
+        """Jobs per status, the age of the oldest queued job and the mean wait of recently claimed ones."""
+        now = time.time()
+        with self._connect() as db:
+            counts = dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            oldest = db.execute("SELECT MIN(created_at) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+            recent_wait = db.execute("SELECT AVG(started_at - created_at) FROM jobs WHERE started_at >= ?",
+                                     (now - WAIT_WINDOW,)).fetchone()[0]
+        return {
+            **{status: counts.get(status, 0) for status in (QUEUED, RUNNING, COMPLETED, FAILED)},
+            "oldest_wait": now - oldest if oldest is not None else 0.0,
+            "recent_wait": recent_wait or 0.0,
+        }
+
+
+def _keep_leased(queue: JobQueue, lease: Lease, done: threading.Event):
+    while not done.wait(queue.lease_seconds / 3):
+        if not queue.renew(lease):
+            logger.warning(f"Lost the lease on queued job {lease.job_id}")
+            return
+
+
+def process_next(queue: JobQueue, owner: str) -> bool:
+    """Claim one job, solve it and store the result; False when the queue is empty."""
+    from optimizer import solve  # solver processes only; API processes just enqueue
+
+    lease = queue.claim(owner)
+    if lease is None:
+        return False
+    logger.info(f"Solving queued job {lease.job_id} (attempt {lease.attempt})")
+    done = threading.Event()
+    threading.Thread(target=_keep_leased, args=(queue, lease, done), daemon=True).start()
+    try:
+        response = solve(OptimizeRequest.model_validate_json(lease.request))
+        stored = queue.complete(lease, response.model_dump_json())
+    except Exception as e:
+        logger.exception(f"Queued job {lease.job_id} failed")
+        stored = queue.fail(lease, str(e))
+    finally:
+        done.set()
+    if not stored:
+        logger.warning(f"Queued job {lease.job_id} was taken over by another process, result discarded")
+    return True
+
+
+def run_worker(path: str, poll_interval: float = 0.5):
+    """Solver process: warm up, then claim and solve jobs until killed."""
+    from solver_pool import configure_logging, warm_up
+
+    configure_logging()
+    warm_up()
+    queue = JobQueue.from_env(path)
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info(f"Queue worker {owner} polling {path}")
+    while True:
+        if not process_next(queue, owner):
+            time.sleep(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve jobs from the durable job queue.")
+    parser.add_argument("--path", default=os.getenv("OPTIMIZER_QUEUE_PATH"), help="queue file (OPTIMIZER_QUEUE_PATH)")
+    parser.add_argument("--processes", type=int, default=1, help="solver processes to run")
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("--path or OPTIMIZER_QUEUE_PATH is required")
+    JobQueue.from_env(args.path)  # create the schema once, before the processes race to
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=run_worker, args=(args.path, args.poll_interval)) for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
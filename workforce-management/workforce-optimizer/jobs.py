@@ -0,0 +1,203 @@
+"""Asynchronous optimization jobs with streamed intermediate solutions.
+
+``POST /optimize/jobs`` admits a solve to the solver pool and returns a job id
+straight away. The pool process reports every improving CP-SAT solution through
+a manager queue; ``JobManager`` keeps the latest one per job so callers can
+long-poll or follow the Server-Sent-Events stream, and can cancel a job or
+accept its current best plan.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from queue import Empty
+from typing import Dict, List, Optional
+
+from models import OptimizeRequest
+
+logger = logging.getLogger("optimizer")
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+FAILED = "failed"
+TERMINAL_STATES = (COMPLETED, CANCELLED, FAILED)
+
+_STARTED = "started"
+
+
+def run_job(req: OptimizeRequest, updates, stop_event):
+    """Pool entry point: solve ``req`` and stream progress into ``updates``."""
+    from optimizer import solve  # loaded by the pool process's warm-up, not by the API process
+    updates.put({"event": _STARTED})
+    return solve(req, on_solution=updates.put, stop_event=stop_event).model_dump()
+
+
+def take_updates(updates, timeout: float) -> List[dict]:
+    """Wait up to ``timeout`` seconds for an update, then take every one queued.
+
+    Each call on a manager queue is a round trip to the manager process, so
+    ``JobManager`` runs this in a thread rather than on the event loop.
+    """
+    try:
+        taken = [updates.get(timeout=timeout)]
+    except Empty:
+        return []
+    while True:
+        try:
+            taken.append(updates.get_nowait())
+        except Empty:
+            return taken
+
+
+class Job:
+    def __init__(self, job_id: str, stop_event):
+        self.id = job_id
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.accepted = False
+        self.latest: Optional[dict] = None  # most recent improving solution
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.stop_event = stop_event
+        self.changed = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATES
+
+    @property
+    def solution_count(self) -> int:
+        return self.latest["solution"] if self.latest else 0
+
+    def summary(self) -> dict:
+        """Job state plus the latest solution's metrics (without the plan itself)."""
+        progress = None
+        if self.latest:
+            progress = {k: v for k, v in self.latest.items() if k != "response"}
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "accepted": self.accepted,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "progress": progress,
+            "error": self.error,
+        }
+
+    async def notify(self):
+        async with self.changed:
+            self.changed.notify_all()
+
+    async def wait_for_change(self, after_solution: int, timeout: float) -> bool:
+        """Wait until a solution newer than ``after_solution`` exists or the job ends."""
+        async with self.changed:
+            try:
+                await asyncio.wait_for(
+                    self.changed.wait_for(lambda: self.done or self.solution_count > after_solution),
+                    timeout
+                )
+                return True
+            except asyncio.TimeoutError:
+                return False
+
+
+class JobManager:
+    """Tracks optimization jobs submitted to a ``SolverPool``."""
+
+    def __init__(self, pool, ttl_seconds: float = 3600.0, poll_interval: float = 0.1):
+        self.pool = pool
+        self.ttl_seconds = ttl_seconds
+        self.poll_interval = poll_interval
+        self._jobs: Dict[str, Job] = {}
+        self._manager = None
+
+    @classmethod
+    def from_env(cls, pool) -> "JobManager":
+        return cls(pool, ttl_seconds=float(os.getenv("OPTIMIZER_JOB_TTL", 3600)))
+
+    def start(self):
+        if self._manager is None:
+            # Manager proxies are picklable, so they can be handed to pool processes
+            self._manager = multiprocessing.get_context("spawn").Manager()
+
+    def shutdown(self):
+        for job in self._jobs.values():
+            if not job.done:
+                job.stop_event.set()
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def submit(self, req: OptimizeRequest) -> Job:
+        """Admit ``req`` to the pool; raises the pool's backpressure errors when full."""
+        if self._manager is None:
+            raise RuntimeError("JobManager is not started")
+        self._expire()
+        updates = self._manager.Queue()
+        job = Job(uuid.uuid4().hex, self._manager.Event())
+        future = self.pool.submit(run_job, req, updates, job.stop_event)
+        self._jobs[job.id] = job
+        asyncio.ensure_future(self._follow(job, future, updates))
+        return job
+
+    async def cancel(self, job: Job):
+        """Stop the search and discard its result."""
+        if not job.done:
+            job.status = CANCELLED
+            job.finished_at = time.time()
+            job.stop_event.set()
+            await job.notify()
+
+    async def accept(self, job: Job, timeout: float = 10.0) -> Job:
+        """Stop the search and keep the best plan found so far as the job result."""
+        if not job.done:
+            job.accepted = True
+            job.stop_event.set()
+            async with job.changed:
+                try:
+                    await asyncio.wait_for(job.changed.wait_for(lambda: job.done), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        return job
+
+    async def _follow(self, job: Job, future: asyncio.Future, updates):
+        try:
+            while not future.done():
+                await self._drain(job, updates, self.poll_interval)
+            await self._drain(job, updates, 0)
+            result = future.result()
+            if job.status != CANCELLED:
+                job.result = result
+                job.status = COMPLETED
+        except Exception as e:
+            logger.error(f"Optimization job {job.id} failed: {e}")
+            if job.status != CANCELLED:
+                job.status = FAILED
+                job.error = str(e)
+        finally:
+            job.finished_at = job.finished_at or time.time()
+            await job.notify()
+
+    async def _drain(self, job: Job, updates, timeout: float):
+        pending = await asyncio.to_thread(take_updates, updates, timeout)
+        for update in pending:
+            if update.get("event") == _STARTED:
+                if job.status == QUEUED:
+                    job.status = RUNNING
+            elif job.status != CANCELLED:
+                job.latest = update
+        if pending:
+            await job.notify()
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl_seconds
+        for job_id in [j.id for j in self._jobs.values() if j.done and j.finished_at < cutoff]:
+            del self._jobs[job_id]
@@ -0,0 +1,137 @@
+"""Lexicographic (staged) objective: priority first, then quality, then load balance.
+
+The default objective is one weighted sum: priority x 1000 plus quality x 500
+per unit, minus 2 per unit of load above 500 on any worker. Its wide
+coefficient range slows bound improvement, and the search spends its time
+trading off terms that only matter once the priority work is placed. With
+``req.lexicographic`` the built model is solved in up to three stages. Each
+stage has its own time budget and is warm-started from the previous stage's
+solution:
+
+1. ``priority``: maximize priority-weighted units;
+2. ``quality``: keep stage 1's value (within ``priority_tolerance``) and
+   maximize quality-weighted units;
+3. ``fairness``: keep stage 2's value (within ``quality_tolerance``) and
+   minimize the units above the fairness target on any worker.
+
+Independent components (see decomposition.py) are staged separately, so the
+default fairness target is the mean load of the component's own stage 2 plan.
+Components share no workers and no work can move between them, so a
+request-wide mean would only ask the components above it to drop units.
+
+A stage that finds no solution (or is stopped) ends the sequence with the
+previous stage's plan.
+"""
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from models import LexicographicObjective, StageResult
+
+STAGES = ("priority", "quality", "fairness")
+DEFAULT_SHARES = (0.5, 0.3, 0.2)  # of the time limit, per stage, unless stage_time_limits is set
+
+
+@dataclass
+class StagedSolve:
+    status: str  # OPTIMAL when every completed stage was, else FEASIBLE; CP-SAT's status if stage 1 found nothing
+    response: Optional[object] = None  # CpSolverResponse of the last successful stage
+    objective: Optional[float] = None  # the weighted objective of the final plan, for comparison
+    stages: List[StageResult] = field(default_factory=list)
+    wall_time: float = 0.0
+    branches: int = 0
+    conflicts: int = 0
+
+
+def stage_time_limits(config: LexicographicObjective, time_limit: float) -> List[float]:
+    if config.stage_time_limits is not None:
+        return list(config.stage_time_limits)
+    return [share * time_limit for share in DEFAULT_SHARES]
+
+
+def _at_least(value: float, tolerance: float) -> int:
+    # Stage values are integral; the epsilon absorbs float round-off of value * (1 - tolerance)
+    return math.ceil(value * (1 - tolerance) - 1e-9) if value >= 0 else math.ceil(value * (1 + tolerance) - 1e-9)
+
+
+def _weighted_objective(model: cp_model.CpModel) -> Tuple[np.ndarray, np.ndarray, float, float]:
+    objective = model.Proto().objective
+    return (np.array(list(objective.vars), dtype=np.int64), np.array(list(objective.coeffs), dtype=np.int64),
+            objective.offset, objective.scaling_factor or 1.0)
+
+
+def _hint(model: cp_model.CpModel, solution: Sequence[int]):
+    """Hint every variable with its value in ``solution`` (variables added later stay unhinted)."""
+    model.ClearHints()
+    hint = model.Proto().solution_hint
+    hint.vars.extend(range(len(solution)))
+    hint.values.extend(solution)
+
+
+def solve_lexicographic(built, config: LexicographicObjective, time_limit: float,
+                        run: Callable[[float], Tuple[cp_model.CpSolver, int]],
+                        stopped: Callable[[], bool] = lambda: False) -> StagedSolve:
+    """Solve ``built`` (an ``optimizer.BuiltModel``) stage by stage; ``run(limit)`` solves its model once.
+
+    The model's hints (greedy or previous plan) seed stage 1, and no further
+    stage starts once ``stopped()`` is true. The model's objective and hints
+    are replaced along the way, so it is not reusable.
+    """
+    model = built.model
+    objective_vars, objective_coeffs, offset, scaling = _weighted_objective(model)
+    keys = list(built.split_unit_vars)
+    units = [built.split_unit_vars[key] for key in keys]
+    priority = cp_model.LinearExpr.WeightedSum(units, [built.task_map[t_id].priority for t_id, _ in keys])
+    quality = cp_model.LinearExpr.WeightedSum(units, [int(built.quality_scores[key] * 500) for key in keys])
+    limits = stage_time_limits(config, time_limit)
+    deadline = time.monotonic() + time_limit
+    staged = StagedSolve(status="UNKNOWN")
+
+    for name, limit in zip(STAGES, limits):
+        target = None
+        if name == "priority":
+            model.Maximize(priority)
+        elif name == "quality":
+            model.Add(priority >= _at_least(staged.stages[-1].objective, config.priority_tolerance))
+            model.Maximize(quality)
+        else:
+            model.Add(quality >= _at_least(staged.stages[-1].objective, config.quality_tolerance))
+            loads = list(built.worker_loads.values())
+            solution = staged.response.solution
+            target = config.fairness_target
+            if target is None:
+                # The mean load of the quality stage's plan, over this component's workers
+                target = math.ceil(sum(solution[load.Index()] for load in loads) / max(1, len(loads)))
+            overloads = []
+            for load in loads:
+                overload = model.NewIntVar(0, 10000, f"over_target_{load.Name()}")
+                model.Add(overload >= load - target)
+                overloads.append(overload)
+            model.Minimize(cp_model.LinearExpr.Sum(overloads))
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or (staged.stages and stopped()):
+            break
+        solver, status = run(max(0.1, min(limit, remaining)))
+        staged.wall_time += solver.WallTime()
+        staged.branches += solver.NumBranches()
+        staged.conflicts += solver.NumConflicts()
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            if not staged.stages:
+                staged.status = solver.StatusName(status)
+            break
+        staged.stages.append(StageResult(name=name, status=solver.StatusName(status), objective=solver.ObjectiveValue(),
+                                         best_bound=solver.BestObjectiveBound(), solve_time=solver.WallTime(),
+                                         fairness_target=target))
+        staged.response = solver.response_proto
+        staged.status = "OPTIMAL" if all(s.status == "OPTIMAL" for s in staged.stages) else "FEASIBLE"
+        _hint(model, staged.response.solution)
+
+    if staged.response is not None:
+        solution = np.asarray(staged.response.solution, dtype=np.int64)
+        staged.objective = scaling * (offset + float(objective_coeffs @ solution[objective_vars]))
+    return staged
@@ -0,0 +1,216 @@
+"""Prometheus metrics for the optimizer service, served by ``GET /metrics``.
+
+A small registry rendering the Prometheus text format (version 0.0.4), so
+scraping needs no extra dependency. Values are per API process. Solves run in
+pool processes, which send their phase timings back with the result (see
+``timing.SolveTrace``); the API process records them here.
+
+Solve time is labelled with the instance's size class (workers x tasks, see
+``SIZE_CLASSES``), so percentiles per size come from
+``histogram_quantile(0.95, sum by (size, le) (rate(optimizer_solve_seconds_bucket[5m])))``.
+"""
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from timing import SolveTrace
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Upper bound on workers x tasks -> size class
+SIZE_CLASSES = ((1_000, "xs"), (10_000, "s"), (100_000, "m"), (1_000_000, "l"))
+
+
+def size_class(workers: int, tasks: int) -> str:
+    pairs = workers * tasks
+    for limit, name in SIZE_CLASSES:
+        if pairs <= limit:
+            return name
+    return "xl"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = TIME_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * len(self.buckets), 0.0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[0][-1] if entry is not None else 0
+
+    def samples(self):
+        for key, (counts, total) in sorted(self._values.items()):
+            for bound, count in zip(self.buckets, counts):
+                le = 'le="' + _format_value(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {count}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {counts[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> bytes:
+        lines = [line for metric in self._metrics.values() for line in metric.render()]
+        return ("\n".join(lines) + "\n").encode()
+
+
+REGISTRY = Registry()
+
+PHASE_SECONDS = REGISTRY.register(Histogram(
+    "optimizer_phase_seconds", "Time spent per solve phase (summed over components).", ["phase"]))
+SOLVE_SECONDS = REGISTRY.register(Histogram(
+    "optimizer_solve_seconds", "Wall time of a solve, by instance size class (workers x tasks).", ["size"]))
+SOLVES = REGISTRY.register(Counter(
+    "optimizer_solves_total", "Solves by worst component status and the engine that produced the plan.",
+    ["status", "engine"]))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "optimizer_cache_requests_total", "Result cache lookups by outcome (hit, miss, coalesced).", ["outcome"]))
+MODEL_VARIABLES = REGISTRY.register(Gauge(
+    "optimizer_model_variables", "CP-SAT variables in the most recent solve's models."))
+MODEL_CONSTRAINTS = REGISTRY.register(Gauge(
+    "optimizer_model_constraints", "CP-SAT constraints in the most recent solve's models."))
+MODEL_INTERVALS = REGISTRY.register(Gauge(
+    "optimizer_model_intervals", "CP-SAT interval variables (tasks and breaks) in the most recent solve's models."))
+SOLVES_IN_FLIGHT = REGISTRY.register(Gauge(
+    "optimizer_solves_in_flight", "Calls running on the solver pool."))
+SOLVES_QUEUED = REGISTRY.register(Gauge(
+    "optimizer_solves_queued", "Calls waiting for a solver pool process."))
+POOL_WARM = REGISTRY.register(Gauge(
+    "optimizer_pool_warm_processes", "Solver pool processes that finished their warm-up solve."))
+POOL_WARM_UP_FAILED = REGISTRY.register(Gauge(
+    "optimizer_pool_warm_up_failures", "Solver pool processes whose warm-up solve raised."))
+QUEUE_JOBS = REGISTRY.register(Gauge(
+    "optimizer_queue_jobs", "Jobs in the durable job queue by status.", ["status"]))
+QUEUE_OLDEST_WAIT = REGISTRY.register(Gauge(
+    "optimizer_queue_oldest_wait_seconds", "Age of the oldest job waiting in the durable job queue."))
+QUEUE_WAIT = REGISTRY.register(Gauge(
+    "optimizer_queue_wait_seconds", "Mean wait from enqueue to first claim of jobs claimed in the last 5 minutes."))
+
+
+def record_phase(name: str, seconds: float):
+    PHASE_SECONDS.observe(seconds, phase=name)
+
+
+def record_solve(trace: SolveTrace):
+    for name, seconds in trace.phases.items():
+        record_phase(name, seconds)
+    stats = trace.solver_stats
+    if stats is None:
+        # No feasible task/worker pair, so no model was built
+        SOLVES.inc(status="MODEL_INVALID", engine="none")
+        return
+    SOLVES.inc(status=stats.status, engine=stats.engine)
+    SOLVE_SECONDS.observe(stats.wall_time, size=size_class(trace.workers, trace.tasks))
+    MODEL_VARIABLES.set(stats.variables)
+    MODEL_CONSTRAINTS.set(stats.constraints)
+    MODEL_INTERVALS.set(stats.intervals)
+
+
+def record_cache(outcome: str):
+    CACHE_REQUESTS.inc(outcome=outcome)
+
+
+def render(pool_stats: Optional[dict] = None, queue_stats: Optional[dict] = None) -> bytes:
+    """The exposition text; ``pool_stats`` (``SolverPool.stats()``) and ``queue_stats`` (``JobQueue.stats()``)
+    refresh the pool and queue gauges first."""
+    if pool_stats is not None:
+        SOLVES_IN_FLIGHT.set(pool_stats["running"])
+        SOLVES_QUEUED.set(pool_stats["queued"])
+        POOL_WARM.set(pool_stats["warm"])
+        POOL_WARM_UP_FAILED.set(pool_stats["warm_up_failed"])
+    if queue_stats is not None:
+        for status in ("queued", "running", "completed", "failed"):
+            QUEUE_JOBS.set(queue_stats[status], status=status)
+        QUEUE_OLDEST_WAIT.set(queue_stats["oldest_wait"])
+        QUEUE_WAIT.set(queue_stats["recent_wait"])
+    return REGISTRY.render()
@@ -0,0 +1,291 @@
+import datetime
+import zoneinfo
+
+from pydantic import BaseModel, field_validator, model_validator
+from typing import Dict, List, Literal, Optional
+
+
+def _parse_timestamp(value: str) -> datetime.datetime:
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{value!r} is not an ISO 8601 datetime")
+
+
+def _local_timestamp(value: str, tz: zoneinfo.ZoneInfo) -> str:
+    """``value`` as naive local time in ``tz`` if it carries an offset (``Z``, ``+02:00``), else unchanged."""
+    parsed = _parse_timestamp(value)
+    if parsed.tzinfo is None:
+        return value
+    return parsed.astimezone(tz).replace(tzinfo=None).isoformat()
+
+
+def _time_zone(name: str) -> zoneinfo.ZoneInfo:
+    try:
+        return zoneinfo.ZoneInfo(name)
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone {name!r}")
+
+
+def _localize(assignments: Optional[List["Assignment"]], tz: zoneinfo.ZoneInfo):
+    for a in assignments or []:
+        a.start = _local_timestamp(a.start, tz)
+        a.end = _local_timestamp(a.end, tz)
+
+
+# --- Data Models ---
+class Task(BaseModel):
+    id: str
+    name: str
+    skill_id: int
+    priority: int
+    units: int
+    dependencies: Optional[List[str]] = []
+    type: Optional[str] = None  # For legend/coloring
+
+class BreakWindow(BaseModel):
+    """A fixed break: at clock time ``start`` if given, else ``after_minutes`` into the shift."""
+    minutes: int
+    after_minutes: int = 240
+    start: Optional[str] = None  # 'HH:MM'
+
+class Worker(BaseModel):
+    id: str
+    name: str
+    skills: List[int]
+    productivity: dict  # skill_id -> units/hour
+    skill_levels: Optional[dict] = {}  # skill_id -> level (1-4)
+    shift_start: str  # '08:00'
+    shift_end: str    # '16:00'
+    break_minutes: int = 60
+    breaks: Optional[List[BreakWindow]] = None  # default: one break_minutes break 4 hours into the shift
+
+class Assignment(BaseModel):
+    worker_id: str
+    task_id: str
+    task_name: Optional[str] = None
+    start: str  # ISO datetime
+    end: str    # ISO datetime
+    units: int
+    is_break: bool = False
+    task_type: Optional[str] = None  # For legend/coloring
+
+    @field_validator("start", "end")
+    @classmethod
+    def _check_timestamp(cls, value: str) -> str:
+        _parse_timestamp(value)
+        return value
+
+class SolverOptions(BaseModel):
+    """CP-SAT tuning; explicitly set fields override the preset's."""
+    preset: Optional[Literal["interactive", "thorough"]] = None
+    time_limit: Optional[float] = None  # seconds for the whole request, default 30
+    num_search_workers: Optional[int] = None
+    relative_gap_limit: Optional[float] = None
+    absolute_gap_limit: Optional[float] = None
+    max_deterministic_time: Optional[float] = None
+    random_seed: Optional[int] = None
+    greedy_hint: Optional[bool] = None  # seed the search with the greedy plan unless warm-started; default on
+    capacity_presolve: Optional[bool] = None  # bound the objective by the capacity LP before solving; default on
+
+class LexicographicObjective(BaseModel):
+    """Staged solve instead of the weighted objective; see lexicographic.py."""
+    priority_tolerance: float = 0.0  # later stages keep priority units >= (1 - tolerance) x stage 1's value
+    quality_tolerance: float = 0.0  # the fairness stage keeps quality >= (1 - tolerance) x stage 2's value
+    fairness_target: Optional[int] = None  # units per worker above which load is minimized; default each component's mean load
+    stage_time_limits: Optional[List[float]] = None  # seconds per stage; fewer entries run fewer stages
+
+class StageResult(BaseModel):
+    """One stage of a lexicographic solve."""
+    name: str  # priority, quality or fairness
+    status: str
+    objective: float  # the stage's own objective
+    best_bound: float
+    solve_time: float
+    fairness_target: Optional[int] = None
+
+class OptimizeRequest(BaseModel):
+    tasks: List[Task]
+    workers: List[Worker]
+    date: str  # 'YYYY-MM-DD'
+    previous_assignments: Optional[List[Assignment]] = None  # earlier plan to warm-start from
+    stability_weight: int = 0  # objective penalty per (task, worker) pair changed vs previous_assignments
+    now: Optional[str] = None  # ISO datetime; re-plan only the rest of the day from here
+    committed_assignments: Optional[List[Assignment]] = None  # plan being executed; work started before `now` is frozen
+    solver_options: Optional[SolverOptions] = None
+    duration_mode: Literal["division", "linear"] = "division"  # how duration = ceil(60 * units / prod) is encoded
+    mode: Literal["exact", "fast"] = "exact"  # fast: greedy plan only, no CP-SAT
+    symmetry_breaking: bool = False  # order interchangeable workers and tasks in the model (opt-in)
+    time_granularity_minutes: Literal[1, 5, 10, 15, 30, 60] = 1  # work starts on this grid; see optimizer.build_model
+    lexicographic: Optional[LexicographicObjective] = None  # staged objective instead of the weighted sum
+    timezone: str = "UTC"  # IANA zone of the roster's clock times; timestamps with an offset are converted to it
+
+    @field_validator("now")
+    @classmethod
+    def _check_now(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None:
+            _parse_timestamp(value)
+        return value
+
+    @model_validator(mode="after")
+    def _localize_timestamps(self):
+        # Shift times are naive local times, so every timestamp is compared as one
+        tz = _time_zone(self.timezone)
+        if self.now is not None:
+            self.now = _local_timestamp(self.now, tz)
+        _localize(self.committed_assignments, tz)
+        _localize(self.previous_assignments, tz)
+        return self
+
+class SkillMatrix(BaseModel):
+    """Sparse (worker, skill) entries of a ``ColumnarRoster``, one per skill a worker holds."""
+    worker: List[int]  # index into the roster columns
+    skill_id: List[int]
+    productivity: List[Optional[float]]  # units/hour; null when unknown (counts as 1)
+    level: Optional[List[int]] = None  # 1-4, default 1
+
+class ColumnarRoster(BaseModel):
+    """Workers as parallel arrays plus a sparse skill matrix (see ``roster.normalize_columns``)."""
+    id: List[str]
+    name: List[str]
+    shift_start: List[str]  # '08:00'
+    shift_end: List[str]    # '16:00'
+    break_minutes: Optional[List[int]] = None  # default 60 each
+    breaks: Optional[Dict[int, List[BreakWindow]]] = None  # worker index -> breaks replacing the default one
+    skills: SkillMatrix
+
+    @model_validator(mode="after")
+    def _check_lengths(self):
+        n = len(self.id)
+        columns = [self.name, self.shift_start, self.shift_end] + ([self.break_minutes] if self.break_minutes is not None else [])
+        if any(len(column) != n for column in columns):
+            raise ValueError("Worker columns must all have one entry per worker id")
+        entries = len(self.skills.worker)
+        if len(self.skills.skill_id) != entries or len(self.skills.productivity) != entries or (
+                self.skills.level is not None and len(self.skills.level) != entries):
+            raise ValueError("Skill matrix columns must all have the same length")
+        if any(not 0 <= i < n for i in self.skills.worker) or any(not 0 <= i < n for i in self.breaks or {}):
+            raise ValueError("Worker index out of range")
+        return self
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+class ColumnarOptimizeRequest(OptimizeRequest):
+    """``OptimizeRequest`` with the roster sent as columns, for ``POST /optimize/columnar``."""
+    workers: ColumnarRoster
+
+class UnassignedTask(BaseModel):
+    id: str
+    remaining_units: int
+
+class SkillCapacity(BaseModel):
+    """Capacity presolve result for one skill (see capacity.py)."""
+    skill_id: int
+    demand_units: int
+    max_assignable_units: int  # upper bound; below demand_units means the skill is over-loaded
+
+class ComponentResult(BaseModel):
+    """Outcome of one independently solved subproblem."""
+    tasks: int
+    workers: int
+    status: str  # CP-SAT status name, e.g. OPTIMAL / FEASIBLE / INFEASIBLE
+    engine: str = "cp-sat"  # what produced the plan: cp-sat, or greedy (mode=fast or fallback)
+    objective: Optional[float] = None
+    heuristic_objective: Optional[float] = None  # objective of the greedy plan, for comparison
+    best_bound: Optional[float] = None
+    gap: Optional[float] = None  # |best_bound - objective| / max(1, |objective|)
+    capacity_bound: Optional[float] = None  # LP upper bound from the capacity presolve
+    solve_time: float  # seconds
+    branches: int = 0
+    conflicts: int = 0
+    variables: int = 0  # model size
+    constraints: int = 0
+    intervals: int = 0
+    worker_classes: int = 0  # interchangeable-worker classes, singletons included
+    task_classes: int = 0
+    stages: List[StageResult] = []  # lexicographic solves only
+
+class SolverStats(BaseModel):
+    """Solver statistics for a whole request, summed over its components."""
+    status: str  # worst component status
+    engine: str = "cp-sat"  # cp-sat, greedy, or mixed when components differ
+    objective: Optional[float] = None
+    heuristic_objective: Optional[float] = None
+    best_bound: Optional[float] = None
+    gap: Optional[float] = None
+    wall_time: float  # seconds, including model build
+    branches: int = 0
+    conflicts: int = 0
+    variables: int = 0
+    constraints: int = 0
+    intervals: int = 0
+    compression_ratio: Optional[float] = None  # (workers + tasks) / (worker classes + task classes)
+
+class RequestTrace(BaseModel):
+    """Where one traced request's time went (``X-Optimizer-Trace``); model size is in ``solver_stats``."""
+    phases: Dict[str, float]  # seconds per phase, see timing.py
+    wall_time: float  # seconds from receiving the request to the end of extraction
+    profile: Optional[str] = None  # cProfile stats file on the server, when a profile was requested
+
+class OptimizeResponse(BaseModel):
+    assignments: List[Assignment]
+    unassigned_tasks: List[UnassignedTask] = []
+    components: List[ComponentResult] = []
+    solver_stats: Optional[SolverStats] = None
+    capacity: List[SkillCapacity] = []
+    trace: Optional[RequestTrace] = None  # only for requests sent with X-Optimizer-Trace
+
+class TaskDiagnosis(BaseModel):
+    """Why a task cannot be assigned, or which of its skill holders cannot take it."""
+    task_id: str
+    skill_id: int
+    min_skill_level: int  # get_minimum_skill_level_required(priority)
+    skill_holders: int
+    eligible_workers: int
+    # Set when no worker is eligible: missing_skill, level_below_minimum or duration_exceeds_shift
+    reason: Optional[Literal["missing_skill", "level_below_minimum", "duration_exceeds_shift"]] = None
+    level_below_minimum: List[str] = []  # worker ids excluded by skill level
+    duration_exceeds_shift: List[str] = []  # worker ids whose available shift is shorter than the whole task
+
+class DiagnoseResponse(BaseModel):
+    tasks: List[TaskDiagnosis]
+    unassignable_tasks: int  # tasks with no eligible worker
+    capacity: List[SkillCapacity] = []
+
+class DayTasks(BaseModel):
+    """One date of a batch; the roster is shared by every day."""
+    date: str  # 'YYYY-MM-DD'
+    tasks: List[Task]
+    previous_assignments: Optional[List[Assignment]] = None
+    stability_weight: int = 0
+
+class BatchOptimizeRequest(BaseModel):
+    workers: List[Worker]
+    days: List[DayTasks]
+    solver_options: Optional[SolverOptions] = None  # applies to every day
+    duration_mode: Literal["division", "linear"] = "division"
+    mode: Literal["exact", "fast"] = "exact"
+    symmetry_breaking: bool = False
+    time_granularity_minutes: Literal[1, 5, 10, 15, 30, 60] = 1
+    lexicographic: Optional[LexicographicObjective] = None
+    timezone: str = "UTC"
+
+    @model_validator(mode="after")
+    def _localize_timestamps(self):
+        tz = _time_zone(self.timezone)
+        for day in self.days:
+            _localize(day.previous_assignments, tz)
+        return self
+
+class BatchSummary(BaseModel):
+    days: int
+    total_units: int
+    assigned_units: int
+    assignment_rate: float  # percent of all requested units
+    solve_time: float  # seconds of CP-SAT time summed over days
+    wall_time: float  # seconds from submit to the last day finishing
+
+class BatchOptimizeResponse(BaseModel):
+    results: Dict[str, OptimizeResponse]  # date -> plan
+    summary: BatchSummary
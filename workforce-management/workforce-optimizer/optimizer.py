@@ -0,0 +1,908 @@
+"""CP-SAT model construction and solve for the workforce optimizer.
+
+Nothing in this module depends on FastAPI, so ``solve`` can be shipped to the
+solver process pool (see ``solver_pool.py``) and run off the event loop.
+"""
+import datetime
+import logging
+import contextvars
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from capacity import PairCapacity, objective_bound, pair_capacity, prune_eligibility, skill_capacity
+from decomposition import find_components
+from diagnostics import diagnose
+from models import Assignment, ComponentResult, OptimizeRequest, OptimizeResponse, SolverOptions, Task, UnassignedTask, Worker
+from heuristic import GreedyPlan, greedy_plan
+from replan import FrozenWork, freeze_committed, remaining_request
+from roster import UNIT_MINUTES, Roster, TaskEligibility, compute_eligibility, longest_window, merge_windows, request_roster, unit_rates
+from solver_options import aggregate_stats, apply_options, resolve_options, share_search_workers
+from lexicographic import solve_lexicographic
+from symmetry import EquivalenceClasses, canonical_plan, find_classes
+from timing import (BUILD, BUILD_DEPENDENCIES, BUILD_NO_OVERLAP, DIAGNOSTICS, ELIGIBILITY, EXTRACTION, PRESOLVE, ROSTER, SOLVE,
+                    phase)
+from warm_start import add_solution_hints, previous_plan
+
+logger = logging.getLogger("optimizer")
+
+
+# --- Helper Functions ---
+def get_skill_quality_score(worker: Worker, skill_id: int) -> float:
+    """Calculate quality score based on skill level and productivity."""
+    skill_level = worker.skill_levels.get(str(skill_id)) or worker.skill_levels.get(skill_id) or 1
+    productivity = (
+        worker.productivity.get(str(skill_id))
+        or worker.productivity.get(skill_id)
+        or worker.productivity.get(int(skill_id))
+        or 1
+    )
+    
+    # Quality score combines skill level (1-4) and productivity (0-100)
+    # Higher skill level = better quality, higher productivity = faster completion
+    skill_weight = skill_level / 4.0  # Normalize to 0-1
+    productivity_weight = productivity / 100.0  # Normalize to 0-1
+    
+    # Weighted combination: 60% skill level, 40% productivity
+    return (0.6 * skill_weight) + (0.4 * productivity_weight)
+
+def get_minimum_skill_level_required(task_priority: int) -> int:
+    """Determine minimum skill level required based on task priority."""
+    # Relaxed skill requirements to improve assignment rate
+    if task_priority >= 9:  # Only the most critical tasks require high skill
+        return 3
+    elif task_priority >= 7:  # Important tasks require medium skill
+        return 2
+    else:  # Regular tasks can be done by anyone with the skill
+        return 1
+
+# --- Optimizer Logic (CP-SAT) ---
+@dataclass
+class BuiltModel:
+    """CP-SAT model for one request plus the variables needed to read a plan back."""
+    model: cp_model.CpModel
+    task_map: Dict[str, Task]
+    shift_bounds: Dict[str, Tuple[int, int]]
+    breaks: Dict[str, List[Tuple[int, int]]]
+    intervals: dict
+    presences: dict
+    start_vars: dict
+    end_vars: dict
+    split_unit_vars: dict
+    quality_scores: dict
+    unit_caps: dict
+    roster: Roster
+    eligibility: Dict[str, TaskEligibility]
+    classes: EquivalenceClasses
+    pair_keys: List[Tuple[str, str]]  # (task id, worker id) per row of var_index
+    var_index: np.ndarray  # per pair: presence, units, start and end variable indices
+    productivity: np.ndarray  # per pair unit rate, to recover exact minute durations on a coarse grid
+    granularity: int = 1  # minutes per model time step (req.time_granularity_minutes)
+    break_intervals: int = 0
+    frozen: Optional[FrozenWork] = None
+    hinted: bool = False  # warm-started from a previous plan
+    symmetry_broken: bool = False  # interchangeable workers/tasks are ordered (see symmetry.py)
+    worker_loads: Optional[dict] = None  # worker id -> assigned units variable, for workers with eligible pieces
+
+
+def add_dependency_constraints(model: cp_model.CpModel, req: OptimizeRequest, start_vars: dict, end_vars: dict, presences: dict, horizon: int,
+                               fixed_ends: Optional[Dict[str, int]] = None, deadlines: Optional[Dict[str, int]] = None):
+    """Every assigned piece of a task starts after every assigned piece of its dependencies ends.
+
+    Instead of one constraint per (task worker, dependency worker) pair, each task
+    involved in a dependency gets an aggregate start (<= its pieces' starts) and
+    an aggregate end (>= its pieces' ends), so an edge costs O(eligible workers).
+    Tasks without any assigned piece leave their aggregate free, exactly like the
+    pairwise form where a missing piece enforces nothing. ``fixed_ends`` holds
+    the end of work already frozen by a re-plan, which dependents must also wait for;
+    ``deadlines`` the earliest frozen start of a task's dependents, which its new
+    pieces must end by.
+    """
+    fixed_ends = fixed_ends or {}
+    pieces = {}
+    for (t_id, w_id) in start_vars:
+        pieces.setdefault(t_id, []).append(w_id)
+
+    for t_id, deadline in (deadlines or {}).items():
+        for w_id in pieces.get(t_id, []):
+            model.Add(end_vars[(t_id, w_id)] <= deadline).OnlyEnforceIf(presences[(t_id, w_id)])
+
+    task_starts = {}
+    task_ends = {}
+    for t in req.tasks:
+        deps = [dep for dep in (t.dependencies or []) if dep in pieces or dep in fixed_ends]
+        if t.id not in pieces or not deps:
+            continue
+        if t.id not in task_starts:
+            task_start = model.NewIntVar(0, horizon, f"task_start_t{t.id}")
+            for w_id in pieces[t.id]:
+                model.Add(start_vars[(t.id, w_id)] >= task_start).OnlyEnforceIf(presences[(t.id, w_id)])
+            task_starts[t.id] = task_start
+        for dep in deps:
+            if dep not in task_ends:
+                task_end = model.NewIntVar(fixed_ends.get(dep, 0), max(horizon, fixed_ends.get(dep, 0)), f"task_end_t{dep}")
+                for w_id in pieces.get(dep, []):
+                    model.Add(task_end >= end_vars[(dep, w_id)]).OnlyEnforceIf(presences[(dep, w_id)])
+                task_ends[dep] = task_end
+            model.Add(task_starts[t.id] >= task_ends[dep])
+
+
+def add_duration_constraint(model: cp_model.CpModel, mode: str, duration, split_units, rate: int, granularity: int = 1):
+    """duration == ceil(UNIT_MINUTES * split_units / (rate * granularity)) for a per-pair constant ``rate``.
+
+    ``rate`` is the pair's productivity from ``roster.unit_rates``. ``duration``
+    counts time steps of ``granularity`` minutes, rounded up, so the piece
+    always fits the steps it occupies.
+
+    - division: AddDivisionEquality, a non-linear constraint
+    - linear:   the same relation as two linear inequalities,
+                UNIT_MINUTES * units <= step * duration <= UNIT_MINUTES * units + step - 1, step = rate * granularity
+    """
+    step = rate * granularity
+    if mode == "linear":
+        model.Add(step * duration >= UNIT_MINUTES * split_units)
+        model.Add(step * duration <= UNIT_MINUTES * split_units + step - 1)
+    else:
+        # Use AddDivisionEquality for integer division in CP-SAT
+        model.AddDivisionEquality(duration, split_units * UNIT_MINUTES + step - 1, step)
+
+
+def _log_assignment_analysis(req: OptimizeRequest, roster: Roster):
+    """Debug log of ``diagnose``: per task, its eligible workers and why the others are not."""
+    for d in diagnose(req, roster).tasks:
+        if d.reason is not None:
+            logger.debug(f"Task {d.task_id} cannot be assigned: {d.reason}")
+            continue
+        logger.debug(f"Task {d.task_id}: {d.eligible_workers}/{d.skill_holders} eligible workers; "
+                     f"level below {d.min_skill_level}: {d.level_below_minimum}; "
+                     f"whole task longer than shift: {d.duration_exceeds_shift}")
+
+
+def build_model(req: OptimizeRequest, roster: Optional[Roster] = None, frozen: Optional[FrozenWork] = None,
+                eligibility: Optional[Dict[str, TaskEligibility]] = None) -> Optional[BuiltModel]:
+    """Build the assignment model for ``req``; None when no task/worker pair is feasible.
+
+    ``roster`` may be passed in when the same workers are reused across requests,
+    and ``eligibility`` when it was already computed for them.
+    With ``frozen`` (an intraday re-plan, ``req`` holding only the remaining
+    units) new work starts no earlier than each worker's frozen window start.
+
+    Time variables count steps of ``req.time_granularity_minutes``. Rounding is
+    conservative, so every plan on the grid is feasible in minutes:
+    - work windows shrink to whole steps;
+    - breaks grow to whole steps;
+    - durations round up.
+    ``extract_assignments`` converts steps back to minutes, with each piece's exact end.
+    """
+    if roster is None:
+        roster = request_roster(req)
+    if eligibility is None:
+        eligibility = compute_eligibility(req.tasks, roster)
+
+    model = cp_model.CpModel()
+    task_map = {t.id: t for t in req.tasks}
+    shift_bounds = roster.shift_bounds()
+    g = req.time_granularity_minutes
+    shift_starts = roster.shift_start.tolist()
+    shift_ends = roster.shift_end.tolist()
+    overnight = int((roster.shift_end > 24 * 60).sum())
+    logger.info(f"Shift bounds computed for {len(roster)} workers ({overnight} overnight)")
+
+    intervals = {}
+    presences = {}
+    start_vars = {}
+    end_vars = {}
+    split_unit_vars = {}
+    quality_scores = {}  # Store quality scores for objective function
+    unit_caps = {}
+    var_rows = []  # presence, units, start, end variable indices, in intervals order
+    pair_productivity = []
+    task_pieces = {}  # task id -> worker ids with an interval
+    worker_pieces = [[] for _ in range(len(roster))]  # worker index -> task ids with an interval
+    break_intervals = 0
+
+    for t in req.tasks:
+        elig = eligibility[t.id]
+        for i, rate, quality_score, max_units in zip(elig.workers.tolist(), unit_rates(elig.productivity).tolist(),
+                                                       elig.quality.tolist(), elig.max_units.tolist()):
+            w_id = roster.worker_ids[i]
+            shift_start_min, shift_end_min = shift_starts[i], shift_ends[i]
+            if frozen is not None:
+                # Only the rest of the shift is still open for new work
+                shift_start_min = frozen.window_start.get(w_id, shift_start_min)
+                max_units = min(max_units, rate * longest_window(shift_start_min, shift_end_min, roster.breaks[i]) // UNIT_MINUTES)
+                if max_units <= 0:
+                    continue
+            # Whole time steps inside the window
+            window_start, window_end = -(-shift_start_min // g), shift_end_min // g
+            if window_end <= window_start:
+                continue
+            quality_scores[(t.id, w_id)] = quality_score
+            # Allow splitting: units assigned to this worker for this task
+            unit_caps[(t.id, w_id)] = min(t.units, max_units)
+            split_units = model.NewIntVar(0, unit_caps[(t.id, w_id)], f"units_t{t.id}_w{w_id}")
+            duration = model.NewIntVar(0, window_end - window_start, f"duration_t{t.id}_w{w_id}")
+            # duration = ceil(60 * units / (productivity * g))
+            add_duration_constraint(model, req.duration_mode, duration, split_units, rate, g)
+            start = model.NewIntVar(window_start, window_end, f"start_t{t.id}_w{w_id}")
+            end = model.NewIntVar(window_start, window_end, f"end_t{t.id}_w{w_id}")
+            presence = model.NewBoolVar(f"presence_t{t.id}_w{w_id}")
+            interval = model.NewOptionalIntervalVar(start, duration, end, presence, f"interval_t{t.id}_w{w_id}")
+            intervals[(t.id, w_id)] = interval
+            start_vars[(t.id, w_id)] = start
+            end_vars[(t.id, w_id)] = end
+            split_unit_vars[(t.id, w_id)] = split_units
+            presences[(t.id, w_id)] = presence
+            var_rows.append((presence.Index(), split_units.Index(), start.Index(), end.Index()))
+            pair_productivity.append(rate)
+            # Enforce: if presence==1 then split_units>0, if presence==0 then split_units==0
+            model.Add(split_units > 0).OnlyEnforceIf(presence)
+            model.Add(split_units == 0).OnlyEnforceIf(presence.Not())
+            task_pieces.setdefault(t.id, []).append(w_id)
+            worker_pieces[i].append(t.id)
+
+    # Diagnostics: If no intervals created, log reason
+    if not intervals:
+        logger.error("No intervals created for any task/worker combination. Check skills, productivity, and shift durations.")
+        return None
+
+    # Each task: sum of split units assigned to all workers <= total units
+    # Track tasks that have no possible assignments for analysis
+    tasks_with_no_workers = []
+    for t in req.tasks:
+        possible_workers = task_pieces.get(t.id)
+        if not possible_workers:
+            tasks_with_no_workers.append(t)
+            logger.debug(f"🚫 Task {t.id} ('{t.name}') has NO possible worker assignments")
+            continue
+        model.Add(cp_model.LinearExpr.Sum([split_unit_vars[(t.id, wid)] for wid in possible_workers]) <= t.units)
+
+    if tasks_with_no_workers:
+        logger.warning(f"📊 {len(tasks_with_no_workers)} tasks have no possible assignments out of {len(req.tasks)} total tasks")
+
+    # No overlap for each worker, including their fixed breaks
+    with phase(BUILD_NO_OVERLAP):
+        for i, task_ids in enumerate(worker_pieces):
+            if not task_ids:
+                continue
+            w_id = roster.worker_ids[i]
+            # Breaks cover every time step they touch; two that touch the same step become one
+            steps = merge_windows([(start // g, -(-end // g)) for start, end in roster.breaks[i] if end > start])
+            breaks = [
+                model.NewFixedSizeIntervalVar(start, end - start, f"break{k}_w{w_id}")
+                for k, (start, end) in enumerate(steps)
+            ]
+            model.AddNoOverlap([intervals[(t_id, w_id)] for t_id in task_ids] + breaks)
+            break_intervals += len(breaks)
+
+    # Task dependencies
+    horizon = max(end for (_, end) in shift_bounds.values()) // g
+    fixed_ends = {t_id: -(-end // g) for t_id, end in frozen.task_ends.items()} if frozen is not None else None
+    deadlines = {t_id: start // g for t_id, start in frozen.deadlines.items()} if frozen is not None else None
+    with phase(BUILD_DEPENDENCIES):
+        add_dependency_constraints(model, req, start_vars, end_vars, presences, horizon, fixed_ends, deadlines)
+
+    # Enhanced Objective: maximize weighted combination of priority, quality, and load balancing
+    objective_vars = []
+    objective_coeffs = []
+
+    # Term 1: Priority-weighted units (primary objective), scaled up for integer optimization
+    # Term 2: Quality-weighted assignments (secondary objective)
+    for (t_id, w_id), split_units in split_unit_vars.items():
+        priority_weight = task_map[t_id].priority * 1000
+        quality_weight = int(quality_scores[(t_id, w_id)] * 500)
+        objective_vars.append(split_units)
+        objective_coeffs.append(priority_weight + quality_weight)
+
+    # Term 3: Load balancing penalty (tertiary objective)
+    # Create variables to track worker utilization
+    worker_loads = {}
+    for i, task_ids in enumerate(worker_pieces):
+        if not task_ids:
+            continue
+        w_id = roster.worker_ids[i]
+        worker_load = model.NewIntVar(0, 10000, f"load_w{w_id}")
+        frozen_units = frozen.worker_units.get(w_id, 0) if frozen is not None else 0
+        model.Add(worker_load == cp_model.LinearExpr.Sum([split_unit_vars[(t_id, w_id)] for t_id in task_ids]) + frozen_units)
+        worker_loads[w_id] = worker_load
+        # Simple linear penalty for high loads (CP-SAT doesn't support quadratic directly)
+        # Penalize loads above a threshold to encourage distribution
+        high_load_penalty = model.NewIntVar(0, 10000, f"penalty_w{w_id}")
+        model.AddMaxEquality(high_load_penalty, [0, worker_load - 500])  # Penalty starts after 500 units
+        objective_vars.append(high_load_penalty)
+        objective_coeffs.append(-2)  # Linear penalty for high loads
+
+    # Warm start: hint the previous plan (by default the not-yet-started part of
+    # a re-plan's committed plan) and optionally reward keeping its pairs
+    previous = req.previous_assignments or (frozen.pending if frozen is not None else None)
+    if previous:
+        plan = previous_plan(req.date, previous, shift_bounds)
+        add_solution_hints(model, plan, presences, start_vars, end_vars, split_unit_vars, unit_caps, g)
+        if req.stability_weight > 0:
+            # +w per kept pair / -w per new pair equals -w per changed pair up to a constant
+            for key, presence in presences.items():
+                objective_vars.append(presence)
+                objective_coeffs.append(req.stability_weight if key in plan else -req.stability_weight)
+
+    model.Maximize(cp_model.LinearExpr.WeightedSum(objective_vars, objective_coeffs))
+
+    # Symmetry breaking: interchangeable workers in load order, interchangeable
+    # tasks in assigned-unit order. A previous plan names specific workers, so
+    # warm-started models keep every permutation available.
+    classes = find_classes(req, roster, frozen)
+    symmetry_broken = req.symmetry_breaking and not previous
+    if symmetry_broken:
+        for members in classes.workers:
+            loads = [worker_loads[w_id] for w_id in members if w_id in worker_loads]
+            for heavier, lighter in zip(loads, loads[1:]):
+                model.Add(heavier >= lighter)
+        for members in classes.tasks:
+            totals = [
+                cp_model.LinearExpr.Sum([split_unit_vars[(t_id, w_id)] for w_id in task_pieces[t_id]])
+                for t_id in members if t_id in task_pieces
+            ]
+            for larger, smaller in zip(totals, totals[1:]):
+                model.Add(larger >= smaller)
+
+    return BuiltModel(
+        model=model,
+        task_map=task_map,
+        shift_bounds=shift_bounds,
+        breaks=roster.break_windows(),
+        intervals=intervals,
+        presences=presences,
+        start_vars=start_vars,
+        end_vars=end_vars,
+        split_unit_vars=split_unit_vars,
+        quality_scores=quality_scores,
+        unit_caps=unit_caps,
+        roster=roster,
+        eligibility=eligibility,
+        classes=classes,
+        pair_keys=list(intervals),
+        var_index=np.array(var_rows, dtype=np.int64),
+        productivity=np.array(pair_productivity, dtype=np.int64),
+        granularity=g,
+        break_intervals=break_intervals,
+        frozen=frozen,
+        worker_loads=worker_loads,
+        hinted=bool(previous),
+        symmetry_broken=symmetry_broken,
+    )
+
+
+def shift_timestamps(date: str, shift_bounds: Tuple[int, int], start_min: int, end_min: int):
+    """Convert shift-relative minutes into datetimes on the 08:00-08:00+1 Gantt timeline."""
+    # Handle cross-midnight assignments properly
+    base_dt = datetime.datetime.fromisoformat(f"{date}T00:00")
+    worker_shift_start, worker_shift_end = shift_bounds
+
+    # For our 08:00-08:00+1 Gantt Chart timeline, night shift work (00:00-08:00)
+    # should appear as NEXT DAY times to be visible in the chart
+    if worker_shift_start == 0 and worker_shift_end <= 8 * 60:  # Night shift 00:00-08:00
+        return (base_dt + datetime.timedelta(days=1, minutes=start_min),
+                base_dt + datetime.timedelta(days=1, minutes=end_min))
+    if worker_shift_end > 24 * 60 and start_min < 16 * 60:
+        # Evening shifts crossing midnight: before 16:00 must be the next day portion
+        return (base_dt + datetime.timedelta(days=1, minutes=start_min),
+                base_dt + datetime.timedelta(days=1, minutes=end_min))
+    # Regular shift, or the same-day part of an overnight shift
+    return (base_dt + datetime.timedelta(minutes=start_min),
+            base_dt + datetime.timedelta(minutes=end_min))
+
+
+def shift_timestamp_strings(date: str, shift_start: np.ndarray, shift_end: np.ndarray,
+                            start_min: np.ndarray, end_min: np.ndarray) -> Tuple[List[str], List[str]]:
+    """Vectorized ``shift_timestamps``, as ISO strings."""
+    next_day = (((shift_start == 0) & (shift_end <= 8 * 60)) | ((shift_end > 24 * 60) & (start_min < 16 * 60)))
+    offset = np.where(next_day, 24 * 60, 0)
+    base = np.datetime64(date, "m")
+    starts = base + (start_min + offset).astype("timedelta64[m]")
+    ends = base + (end_min + offset).astype("timedelta64[m]")
+    return np.datetime_as_string(starts, unit="s").tolist(), np.datetime_as_string(ends, unit="s").tolist()
+
+
+def work_assignments(req: OptimizeRequest, task_map: Dict[str, Task], shift_bounds: Dict[str, Tuple[int, int]],
+                     keys: List[Tuple[str, str]], pieces: np.ndarray) -> List[Assignment]:
+    """Assignments for (task, worker) ``keys`` with ``pieces`` rows of (start, end, units)."""
+    if not keys:
+        return []
+    bounds = np.array([shift_bounds[w_id] for _, w_id in keys], dtype=np.int64)
+    starts, ends = shift_timestamp_strings(req.date, bounds[:, 0], bounds[:, 1], pieces[:, 0], pieces[:, 1])
+    # Values are built here from validated inputs, so skip per-row validation
+    return [
+        Assignment.model_construct(worker_id=w_id, task_id=t_id, task_name=task_map[t_id].name, start=start, end=end,
+                                   units=units, is_break=False, task_type=task_map[t_id].type)
+        for (t_id, w_id), start, end, units in zip(keys, starts, ends, pieces[:, 2].tolist())
+    ]
+
+
+def solution_values(built: BuiltModel, response) -> np.ndarray:
+    """Presence, units, start and end of every pair, read from a solver response in one pass."""
+    return np.asarray(response.solution, dtype=np.int64)[built.var_index]
+
+
+def extract_assignments(req: OptimizeRequest, built: BuiltModel, values: np.ndarray) -> Tuple[List[Assignment], Dict[str, int]]:
+    """Read task assignments from ``solution_values`` of a solver or callback response."""
+    assigned_units = {t.id: 0 for t in req.tasks}
+    if len(built.pair_keys) == 0:
+        return [], assigned_units
+    chosen = np.flatnonzero((values[:, 0] == 1) & (values[:, 1] > 0))
+    keys = [built.pair_keys[k] for k in chosen.tolist()]
+    pieces = values[chosen][:, [2, 3, 1]]
+    if built.granularity > 1:
+        # Steps back to minutes; the piece ends when its work is done, inside its last step
+        pieces[:, 0] *= built.granularity
+        pieces[:, 1] = pieces[:, 0] - (-UNIT_MINUTES * pieces[:, 2] // built.productivity[chosen])
+    for (t_id, _), units in zip(keys, pieces[:, 2].tolist()):
+        assigned_units[t_id] += units
+    return work_assignments(req, built.task_map, built.shift_bounds, keys, pieces), assigned_units
+
+
+def plan_assignments(req: OptimizeRequest, shift_bounds: Dict[str, Tuple[int, int]],
+                     plan: Dict[Tuple[str, str], Tuple[int, int, int]]) -> Tuple[List[Assignment], Dict[str, int]]:
+    """``extract_assignments`` for a plan given as (task, worker) -> (start, end, units)."""
+    task_map = {t.id: t for t in req.tasks}
+    assigned_units = {t.id: 0 for t in req.tasks}
+    for (t_id, _), (_, _, units) in plan.items():
+        assigned_units[t_id] += units
+    pieces = np.array(list(plan.values()), dtype=np.int64).reshape(-1, 3)
+    return work_assignments(req, task_map, shift_bounds, list(plan), pieces), assigned_units
+
+
+def break_assignments(req: OptimizeRequest, shift_bounds: Dict[str, Tuple[int, int]],
+                      breaks: Dict[str, List[Tuple[int, int]]]) -> List[Assignment]:
+    """Every worker's fixed breaks (by default one, 4 hours after shift start)."""
+    rows = [(w_id, *shift_bounds[w_id], start, end) for w_id, windows in breaks.items() for start, end in windows]
+    if not rows:
+        return []
+    columns = np.array([row[1:] for row in rows], dtype=np.int64)
+    starts, ends = shift_timestamp_strings(req.date, columns[:, 0], columns[:, 1], columns[:, 2], columns[:, 3])
+    return [
+        Assignment.model_construct(worker_id=row[0], task_id="0", task_name="Break", start=start, end=end,
+                                   units=0, is_break=True, task_type="BREAK")
+        for row, start, end in zip(rows, starts, ends)
+    ]
+
+
+def unassigned_remainder(req: OptimizeRequest, assigned_units: Dict[str, int]) -> List[UnassignedTask]:
+    """Any task not fully assigned is unassigned for its remaining units."""
+    return [
+        UnassignedTask(id=t.id, remaining_units=t.units - assigned_units.get(t.id, 0))
+        for t in req.tasks
+        if t.units - assigned_units.get(t.id, 0) > 0
+    ]
+
+
+def build_response(req: OptimizeRequest, built: BuiltModel, values: np.ndarray) -> OptimizeResponse:
+    assignments, assigned_units = extract_assignments(req, built, values)
+    if built.frozen is not None:
+        assignments = built.frozen.assignments + assignments
+    return OptimizeResponse(
+        assignments=assignments + break_assignments(req, built.shift_bounds, built.breaks),
+        unassigned_tasks=unassigned_remainder(req, assigned_units)
+    )
+
+
+def assignment_rate(req: OptimizeRequest, response: OptimizeResponse) -> float:
+    """Percentage of requested units that the plan assigns."""
+    total_task_units = sum(t.units for t in req.tasks)
+    if total_task_units <= 0:
+        return 0.0
+    remaining = sum(u.remaining_units for u in response.unassigned_tasks)
+    return (total_task_units - remaining) / total_task_units * 100
+
+
+def relative_gap(objective: float, bound: float) -> float:
+    return abs(bound - objective) / max(1.0, abs(objective))
+
+
+class _ProgressCallback(cp_model.CpSolverSolutionCallback):
+    """Reports every improving solution to ``on_solution`` as a plain dict.
+
+    With a capacity ``bound`` it also stops the search as soon as a solution
+    is within the requested gap of that bound.
+    """
+
+    def __init__(self, req: OptimizeRequest, built: BuiltModel, on_solution: Optional[Callable[[dict], None]],
+                 options: Optional[SolverOptions] = None, bound: Optional[float] = None):
+        super().__init__()
+        self._req = req
+        self._built = built
+        self._on_solution = on_solution
+        self._options = options
+        self._bound = bound
+        self.solution_count = 0
+        self.reached_bound = False
+
+    def on_solution_callback(self):
+        self.solution_count += 1
+        objective = self.ObjectiveValue()
+        if self._bound is not None and _meets_bound(objective, self._bound, self._options):
+            self.reached_bound = True
+            self.StopSearch()
+        if self._on_solution is None:
+            return
+        response = build_response(self._req, self._built, solution_values(self._built, self.response_proto))
+        bound = self.BestObjectiveBound()
+        self._on_solution({
+            "solution": self.solution_count,
+            "objective": objective,
+            "best_bound": bound,
+            "gap": relative_gap(objective, bound),
+            "assignment_rate": assignment_rate(self._req, response),
+            "wall_time": self.WallTime(),
+            "response": response.model_dump(),
+        })
+
+
+def _stop_when_set(solver: cp_model.CpSolver, stop_event, done: threading.Event):
+    # Manager events cannot wake a thread directly, so poll until the solve ends
+    try:
+        while not done.is_set():
+            if stop_event.wait(0.1):
+                solver.StopSearch()
+                return
+    except (EOFError, OSError):
+        # The manager went away (service shutdown); the solve ends on its own
+        return
+
+
+def _log_plan_metrics(req: OptimizeRequest, built: BuiltModel, values: np.ndarray, assigned_units: Dict[str, int]):
+    # Log assignment quality metrics
+    chosen = np.flatnonzero((values[:, 0] == 1) & (values[:, 1] > 0)).tolist() if len(values) else []
+    if chosen:
+        avg_quality = sum(built.quality_scores[built.pair_keys[k]] for k in chosen) / len(chosen)
+        logger.info(f"Average assignment quality score: {avg_quality:.3f} ({len(chosen)} assignments)")
+
+    # Log worker utilization
+    if chosen and logger.isEnabledFor(logging.DEBUG):
+        worker_utilizations = {}
+        for k in chosen:
+            w_id = built.pair_keys[k][1]
+            worker_utilizations[w_id] = worker_utilizations.get(w_id, 0) + int(values[k, 1])
+        logger.debug(f"Worker utilization: {worker_utilizations}")
+
+    # Log assignment success rate
+    total_task_units = sum(t.units for t in req.tasks)
+    assigned_task_units = sum(assigned_units.values())
+    rate = (assigned_task_units / total_task_units) * 100 if total_task_units > 0 else 0
+    logger.info(f"📈 Assignment rate: {rate:.1f}% ({assigned_task_units}/{total_task_units} units)")
+
+    tasks_fully_assigned = sum(1 for t in req.tasks if assigned_units[t.id] == t.units)
+    tasks_partially_assigned = sum(1 for t in req.tasks if 0 < assigned_units[t.id] < t.units)
+    tasks_unassigned = sum(1 for t in req.tasks if assigned_units[t.id] == 0)
+    logger.info(f"📋 Task status: {tasks_fully_assigned} fully assigned, {tasks_partially_assigned} partial, {tasks_unassigned} unassigned")
+
+
+def component_threads() -> int:
+    """Components solved at once inside one pool process (CP-SAT releases the GIL)."""
+    return max(1, int(os.getenv("OPTIMIZER_COMPONENT_THREADS", os.cpu_count() or 1)))
+
+
+def _run_solver(model: cp_model.CpModel, options: SolverOptions, time_limit: float,
+                callback: Optional[cp_model.CpSolverSolutionCallback] = None, stop_event=None):
+    """Solve ``model`` once; returns (solver, status). ``stop_event`` being set stops the search."""
+    solver = cp_model.CpSolver()
+    apply_options(solver, options, time_limit)
+    done = threading.Event()
+    if stop_event is not None:
+        threading.Thread(target=_stop_when_set, args=(solver, stop_event, done), daemon=True).start()
+    try:
+        with phase(SOLVE):
+            status = solver.Solve(model, callback)
+    finally:
+        done.set()
+    return solver, status
+
+
+def _component_result(req: OptimizeRequest, built: BuiltModel, greedy: GreedyPlan, bound: Optional[float],
+                      **solve) -> ComponentResult:
+    proto = built.model.Proto()
+    return ComponentResult(
+        tasks=len(req.tasks),
+        workers=len(req.workers),
+        variables=len(proto.variables),
+        constraints=len(proto.constraints),
+        intervals=len(built.intervals) + built.break_intervals,
+        worker_classes=built.classes.worker_count,
+        task_classes=built.classes.task_count,
+        heuristic_objective=greedy.objective,
+        capacity_bound=bound,
+        **solve,
+    )
+
+
+def _solve_staged(req: OptimizeRequest, built: BuiltModel, options: SolverOptions, time_limit: float,
+                  on_solution: Optional[Callable[[dict], None]], stop_event, greedy: GreedyPlan,
+                  bound: Optional[float]):
+    """``_solve_model`` for ``req.lexicographic``: one CP-SAT solve per stage (see lexicographic.py).
+
+    Progress events carry the running stage's own objective. The capacity bound
+    applies to the weighted objective only, so it is reported but ends no stage.
+    """
+    callback = _ProgressCallback(req, built, on_solution) if on_solution is not None else None
+    staged = solve_lexicographic(
+        built, req.lexicographic, time_limit,
+        lambda limit: _run_solver(built.model, options, limit, callback, stop_event),
+        stopped=lambda: stop_event is not None and stop_event.is_set(),
+    )
+    result = _component_result(req, built, greedy, bound, status=staged.status, solve_time=staged.wall_time,
+                               branches=staged.branches, conflicts=staged.conflicts, stages=staged.stages)
+    if staged.response is None:
+        logger.warning(f"Optimization failed with status: {result.status}, falling back to the greedy plan")
+        result.engine = "greedy"
+        result.objective = greedy.objective
+        with phase(EXTRACTION):
+            return (*plan_assignments(req, built.shift_bounds, greedy.plan), result)
+    result.objective = staged.objective
+    logger.info(f"Staged optimization completed with status: {result.status} after "
+                f"{', '.join(stage.name for stage in staged.stages)}")
+    logger.info(f"Objective value: {result.objective} (greedy: {greedy.objective})")
+
+    with phase(EXTRACTION):
+        values = solution_values(built, staged.response)
+        assignments, assigned_units = extract_assignments(req, built, values)
+        _log_plan_metrics(req, built, values, assigned_units)
+    return assignments, assigned_units, result
+
+
+def _solve_model(req: OptimizeRequest, built: BuiltModel, options: SolverOptions, time_limit: float,
+                 on_solution: Optional[Callable[[dict], None]] = None, stop_event=None,
+                 greedy: Optional[GreedyPlan] = None, bound: Optional[float] = None):
+    """Solve one built model; returns (task assignments, assigned units, component result).
+
+    The greedy plan (computed here unless passed in) is reported for comparison,
+    seeds the search unless the model is warm-started or ``options.greedy_hint``
+    is False, and is returned instead when CP-SAT finds no solution (timeout,
+    infeasible or stopped early). ``bound``, the capacity LP bound, ends the
+    search once a solution reaches it (or comes within the requested gap).
+    """
+    if greedy is None:
+        with phase(PRESOLVE):
+            greedy = greedy_plan(req, built.roster, built.eligibility, built.frozen)
+    with phase(BUILD):
+        if built.symmetry_broken:
+            greedy.plan = canonical_plan(greedy.plan, built.classes)
+        if options.greedy_hint is not False and not built.hinted:
+            add_solution_hints(built.model, greedy.plan, built.presences, built.start_vars, built.end_vars,
+                               built.split_unit_vars, built.unit_caps, built.granularity)
+
+    if req.lexicographic is not None:
+        return _solve_staged(req, built, options, time_limit, on_solution, stop_event, greedy, bound)
+
+    callback = None
+    if on_solution is not None or bound is not None:
+        callback = _ProgressCallback(req, built, on_solution, options, bound)
+    solver, status = _run_solver(built.model, options, time_limit, callback, stop_event)
+
+    result = _component_result(req, built, greedy, bound, status=solver.StatusName(status),
+                               solve_time=solver.WallTime(), branches=solver.NumBranches(),
+                               conflicts=solver.NumConflicts())
+    # Log optimization results
+    if status not in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+        logger.warning(f"Optimization failed with status: {result.status}, falling back to the greedy plan")
+        result.engine = "greedy"
+        result.objective = greedy.objective
+        with phase(EXTRACTION):
+            return (*plan_assignments(req, built.shift_bounds, greedy.plan), result)
+    result.objective = solver.ObjectiveValue()
+    result.best_bound = solver.BestObjectiveBound()
+    if callback is not None and callback.reached_bound:
+        # Stopped by the capacity bound, which is tighter than CP-SAT's own so far
+        result.best_bound = min(result.best_bound, bound)
+        if result.objective >= _integral_bound(bound):
+            result.status = "OPTIMAL"
+    result.gap = relative_gap(result.objective, result.best_bound)
+    logger.info(f"Optimization completed with status: {result.status}")
+    logger.info(f"Objective value: {result.objective} (greedy: {greedy.objective})")
+    logger.info(f"Solve time: {result.solve_time:.2f} seconds")
+
+    with phase(EXTRACTION):
+        values = solution_values(built, solver.response_proto)
+        assignments, assigned_units = extract_assignments(req, built, values)
+        _log_plan_metrics(req, built, values, assigned_units)
+    return assignments, assigned_units, result
+
+
+def _integral_bound(bound: float) -> int:
+    # The objective is integral; the tolerance absorbs LP round-off
+    return math.floor(bound + 1e-6 * max(1.0, abs(bound)))
+
+
+def _meets_bound(objective: int, bound: float, options: SolverOptions) -> bool:
+    """Whether ``objective`` is within the requested gap limits of ``bound``."""
+    bound = _integral_bound(bound)
+    if objective >= bound:
+        return True
+    if options.absolute_gap_limit is not None and bound - objective <= options.absolute_gap_limit:
+        return True
+    return options.relative_gap_limit is not None and relative_gap(objective, bound) <= options.relative_gap_limit
+
+
+def _solve_presolved(req: OptimizeRequest, roster: Roster, options: SolverOptions, deadline: float,
+                     on_solution: Optional[Callable[[dict], None]] = None, stop_event=None,
+                     frozen: Optional[FrozenWork] = None, eligibility: Optional[Dict[str, TaskEligibility]] = None,
+                     pairs: Optional[PairCapacity] = None):
+    """Capacity presolve, then CP-SAT; None when no task/worker pair is feasible.
+
+    When the greedy plan already reaches the capacity LP bound (or is within
+    the requested gap of it) it is returned without building a model, unless
+    the request asks for a lexicographic solve.
+    """
+    started = time.perf_counter()
+    if eligibility is None:
+        with phase(ELIGIBILITY):
+            eligibility = compute_eligibility(req.tasks, roster)
+    with phase(PRESOLVE):
+        if pairs is None:
+            pairs = pair_capacity(req, roster, eligibility, frozen)
+        if len(pairs) == 0:
+            return None
+        # Model variables and greedy pieces only for pairs the LP can use, capped like there
+        eligibility = prune_eligibility(req, eligibility, pairs)
+        bound = objective_bound(req, pairs) if options.capacity_presolve is not False else None
+        greedy = greedy_plan(req, roster, eligibility, frozen)
+    # The bound is on the weighted objective, which says nothing about a staged solve's later stages
+    if bound is not None and req.lexicographic is None and _meets_bound(greedy.objective, bound, options):
+        status = "OPTIMAL" if greedy.objective >= _integral_bound(bound) else "FEASIBLE"
+        logger.info(f"Greedy plan {greedy.objective} meets the capacity bound {bound:.0f}, skipping CP-SAT")
+        solved = _greedy_result(req, roster, greedy, started, status, bound)
+        if on_solution is not None:
+            _report_greedy(req, roster, frozen, solved, on_solution)
+        return solved
+    with phase(BUILD):
+        built = build_model(req, roster, frozen, eligibility)
+    if built is None:
+        return None
+    return _solve_model(req, built, options, max(0.1, deadline - time.monotonic()), on_solution, stop_event,
+                        greedy, bound)
+
+
+def _report_greedy(req: OptimizeRequest, roster: Roster, frozen: Optional[FrozenWork], solved, on_solution: Callable[[dict], None]):
+    """Report a plan that skipped CP-SAT as the one and only solution."""
+    assignments, assigned_units, result = solved
+    response = OptimizeResponse(
+        assignments=(frozen.assignments if frozen is not None else []) + assignments
+        + break_assignments(req, roster.shift_bounds(), roster.break_windows()),
+        unassigned_tasks=unassigned_remainder(req, assigned_units),
+    )
+    on_solution({
+        "solution": 1,
+        "objective": result.objective,
+        "best_bound": result.best_bound,
+        "gap": result.gap,
+        "assignment_rate": assignment_rate(req, response),
+        "wall_time": result.solve_time,
+        "response": response.model_dump(),
+    })
+
+
+def _solve_component(req: OptimizeRequest, options: SolverOptions, deadline: float, stop_event=None,
+                     frozen: Optional[FrozenWork] = None):
+    with phase(ROSTER):
+        roster = request_roster(req)
+    solved = _solve_presolved(req, roster, options, deadline, stop_event=stop_event, frozen=frozen)
+    if solved is None:
+        return [], {}, ComponentResult(tasks=len(req.tasks), workers=len(req.workers), status="MODEL_INVALID", solve_time=0.0)
+    return solved
+
+
+def _greedy_result(req: OptimizeRequest, roster: Roster, greedy: GreedyPlan, started: float,
+                   status: str = "FEASIBLE", bound: Optional[float] = None):
+    with phase(EXTRACTION):
+        assignments, assigned_units = plan_assignments(req, roster.shift_bounds(), greedy.plan)
+    result = ComponentResult(
+        tasks=len(req.tasks),
+        workers=len(req.workers),
+        status=status,
+        engine="greedy",
+        objective=greedy.objective,
+        heuristic_objective=greedy.objective,
+        best_bound=bound,
+        gap=relative_gap(greedy.objective, bound) if bound is not None else None,
+        capacity_bound=bound,
+        solve_time=time.perf_counter() - started,
+    )
+    logger.info(f"Greedy plan: objective {greedy.objective}, {len(assignments)} assignments in {result.solve_time:.3f} seconds")
+    return assignments, assigned_units, result
+
+
+def _solve_greedy(req: OptimizeRequest, roster: Roster, frozen: Optional[FrozenWork] = None,
+                  eligibility: Optional[Dict[str, TaskEligibility]] = None):
+    """``mode="fast"``: the greedy plan alone, without building a CP-SAT model."""
+    started = time.perf_counter()
+    if eligibility is None:
+        with phase(ELIGIBILITY):
+            eligibility = compute_eligibility(req.tasks, roster)
+    with phase(SOLVE):
+        greedy = greedy_plan(req, roster, eligibility, frozen)
+    return _greedy_result(req, roster, greedy, started)
+
+
+def solve(req: OptimizeRequest, on_solution: Optional[Callable[[dict], None]] = None, stop_event=None,
+          roster: Optional[Roster] = None) -> OptimizeResponse:
+    """Build and solve the assignment model for ``req``.
+
+    Runs inside a solver pool process; callers must validate that the request
+    has tasks and workers before submitting it. Independent components of the
+    task-worker graph are solved as separate models in parallel threads.
+    ``on_solution`` receives each improving solution while the search runs
+    (this keeps the request as one model), and setting ``stop_event`` ends the
+    search early with the best plan found so far. With ``req.now`` set, work
+    committed before then is frozen and only the rest of the day is re-planned.
+    ``roster`` may be passed in when the same workers are solved for several dates.
+    ``req.solver_options`` tunes CP-SAT; its time limit covers the whole request.
+    ``req.mode == "fast"`` skips CP-SAT and returns the greedy plan, as does a
+    request whose greedy plan already meets the capacity presolve's bound.
+    """
+    unassigned_all = [UnassignedTask(id=t.id, remaining_units=t.units) for t in req.tasks]
+    if stop_event is not None and stop_event.is_set():
+        return OptimizeResponse(assignments=[], unassigned_tasks=unassigned_all)
+    started = time.monotonic()
+    options = resolve_options(req.solver_options)
+    deadline = started + options.time_limit
+    if roster is None:
+        with phase(ROSTER):
+            roster = request_roster(req)
+    if logger.isEnabledFor(logging.DEBUG):
+        with phase(DIAGNOSTICS):
+            _log_assignment_analysis(req, roster)
+
+    frozen = None
+    planned = req
+    if req.now:
+        frozen = freeze_committed(req, roster.shift_bounds())
+        planned = remaining_request(req, frozen)
+
+    with phase(ELIGIBILITY):
+        eligibility = compute_eligibility(planned.tasks, roster)
+    with phase(PRESOLVE):
+        pairs = pair_capacity(planned, roster, eligibility, frozen)
+        capacity = skill_capacity(planned, pairs)
+        eligibility = prune_eligibility(planned, eligibility, pairs)
+        components = []
+        if req.mode != "fast" and on_solution is None:
+            components = find_components(planned, roster, eligibility)
+    if req.mode == "fast":
+        results = [_solve_greedy(planned, roster, frozen, eligibility)]
+    elif len(components) > 1:
+        logger.info(f"Solving {len(components)} independent components")
+        threads = min(len(components), component_threads())
+        # Concurrent components split one solve's search workers rather than each taking every core
+        shared = share_search_workers(options, threads)
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            # Each thread runs in a copy of this context, so the phase timer follows it
+            futures = [executor.submit(contextvars.copy_context().run, _solve_component, sub, shared, deadline,
+                                       stop_event, frozen) for sub in components]
+            results = [future.result() for future in futures]
+    else:
+        solved = _solve_presolved(planned, roster, options, deadline, on_solution, stop_event, frozen,
+                                  eligibility, pairs) if planned.tasks else None
+        if solved is None and frozen is None:
+            return OptimizeResponse(assignments=[], unassigned_tasks=unassigned_all, capacity=capacity)
+        results = [solved] if solved is not None else []
+
+    with phase(EXTRACTION):
+        assignments = list(frozen.assignments) if frozen is not None else []
+        assigned_units = dict(frozen.task_units) if frozen is not None else {}
+        for component_assignments, component_units, _ in results:
+            assignments.extend(component_assignments)
+            for t_id, units in component_units.items():
+                assigned_units[t_id] = assigned_units.get(t_id, 0) + units
+        assignments += break_assignments(req, roster.shift_bounds(), roster.break_windows())
+        unassigned = unassigned_remainder(req, assigned_units)
+    return OptimizeResponse(
+        assignments=assignments,
+        unassigned_tasks=unassigned,
+        components=[result for _, _, result in results],
+        solver_stats=aggregate_stats([result for _, _, result in results], time.monotonic() - started),
+        capacity=capacity,
+    )
@@ -0,0 +1,91 @@
+"""Incremental intraday re-planning.
+
+A request with ``now`` re-plans only the rest of the day. Committed assignments
+that started before ``now`` are frozen: they are echoed back unchanged, their
+units no longer need planning, and new work on their worker starts after they
+end. New pieces of a task also end before any frozen piece of a task depending
+on it starts. Decision variables only cover each task's remaining units inside each
+worker's remaining shift window; committed work that has not started yet is
+re-planned, using the committed plan as a warm-start hint.
+"""
+import datetime
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from models import Assignment, OptimizeRequest, Task
+from warm_start import to_model_minutes
+
+logger = logging.getLogger("optimizer")
+
+
+def now_on_shift_axis(date: str, shift_bounds: Tuple[int, int], now: str) -> int:
+    """Minutes of ``now`` on the worker's shift axis (may lie outside the shift)."""
+    base_dt = datetime.datetime.fromisoformat(f"{date}T00:00")
+    minutes = int((datetime.datetime.fromisoformat(now) - base_dt).total_seconds() // 60)
+    shift_start, shift_end = shift_bounds
+    # 00:00-08:00 night shifts are placed on the next day of the Gantt timeline
+    if shift_start == 0 and shift_end <= 8 * 60:
+        minutes -= 24 * 60
+    return minutes
+
+
+@dataclass
+class FrozenWork:
+    """Committed work that started before ``now`` on the request's workers."""
+    window_start: Dict[str, int] = field(default_factory=dict)  # worker id -> earliest start for new work
+    task_units: Dict[str, int] = field(default_factory=dict)  # task id -> units done or in progress
+    worker_units: Dict[str, int] = field(default_factory=dict)
+    task_ends: Dict[str, int] = field(default_factory=dict)  # task id -> latest frozen end
+    task_starts: Dict[str, int] = field(default_factory=dict)  # task id -> earliest frozen start
+    deadlines: Dict[str, int] = field(default_factory=dict)  # task id -> earliest frozen start of its dependents
+    assignments: List[Assignment] = field(default_factory=list)  # frozen rows, echoed in the response
+    pending: List[Assignment] = field(default_factory=list)  # committed rows not started yet
+
+    def remaining_units(self, task_id: str, units: int) -> int:
+        return max(0, units - self.task_units.get(task_id, 0))
+
+
+def freeze_committed(req: OptimizeRequest, shift_bounds: Dict[str, Tuple[int, int]]) -> FrozenWork:
+    """Split ``req.committed_assignments`` at ``req.now`` for the workers in ``shift_bounds``."""
+    frozen = FrozenWork()
+    for w_id, bounds in shift_bounds.items():
+        frozen.window_start[w_id] = max(bounds[0], now_on_shift_axis(req.date, bounds, req.now))
+
+    for a in req.committed_assignments or []:
+        bounds = shift_bounds.get(a.worker_id)
+        if bounds is None or a.is_break:
+            continue
+        start = to_model_minutes(req.date, bounds, a.start)
+        end = to_model_minutes(req.date, bounds, a.end)
+        if start is None or end is None:
+            logger.warning(f"Committed assignment of task {a.task_id} to worker {a.worker_id} lies outside their shift, ignoring it")
+            continue
+        if start >= now_on_shift_axis(req.date, bounds, req.now):
+            frozen.pending.append(a)
+            continue
+        frozen.assignments.append(a)
+        frozen.task_units[a.task_id] = frozen.task_units.get(a.task_id, 0) + a.units
+        frozen.worker_units[a.worker_id] = frozen.worker_units.get(a.worker_id, 0) + a.units
+        frozen.task_ends[a.task_id] = max(end, frozen.task_ends.get(a.task_id, end))
+        frozen.task_starts[a.task_id] = min(start, frozen.task_starts.get(a.task_id, start))
+        # New work on this worker starts once the in-progress piece ends
+        frozen.window_start[a.worker_id] = max(frozen.window_start[a.worker_id], end)
+    # A dependent already under way must not see new work on its dependencies end after it started
+    for t in req.tasks:
+        if t.id in frozen.task_starts:
+            for dep in t.dependencies or []:
+                frozen.deadlines[dep] = min(frozen.task_starts[t.id], frozen.deadlines.get(dep, frozen.task_starts[t.id]))
+    return frozen
+
+
+def remaining_request(req: OptimizeRequest, frozen: FrozenWork) -> OptimizeRequest:
+    """``req`` reduced to the units still to plan; fully frozen tasks are dropped."""
+    tasks: List[Task] = []
+    for t in req.tasks:
+        units = frozen.remaining_units(t.id, t.units)
+        if units > 0:
+            tasks.append(t if units == t.units else t.model_copy(update={"units": units}))
+    logger.info(f"Re-plan at {req.now}: {len(frozen.assignments)} frozen assignments, "
+                f"{len(tasks)}/{len(req.tasks)} tasks with units left to plan")
+    return req.model_copy(update={"tasks": tasks})
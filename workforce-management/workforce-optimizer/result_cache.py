@@ -0,0 +1,273 @@
+"""Content-addressed cache of ``/optimize`` results.
+
+The backend re-sends identical requests (e.g. a Gantt refresh right after the
+first load), and each would otherwise repeat a full solve. Results are keyed by
+a SHA-256 of the canonical request: every field, with dict keys stringified and
+sorted, so ``{100: 80}`` and ``{"100": 80}`` hit the same entry. Identical
+requests that arrive while the first is still solving wait for that solve
+instead of starting their own.
+
+Values are the response's JSON bytes. ``MemoryCache`` (default) keeps them in
+process; ``DiskCache`` keeps them in a directory, which several API processes
+on a host can share. Both evict least recently used entries beyond their entry
+and byte limits, and drop entries older than the TTL. A plan that a re-solve
+could improve on (stopped by a time limit, or a greedy fallback) is only kept
+for the shorter provisional TTL; proven optimal or infeasible results for the
+full one.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from models import OptimizeRequest, SolverStats
+
+logger = logging.getLogger("optimizer")
+
+# Bump when solver changes make cached plans stale
+CACHE_VERSION = 1
+
+HIT = "hit"
+MISS = "miss"
+COALESCED = "coalesced"
+
+FINAL_STATUSES = ("OPTIMAL", "INFEASIBLE")
+
+
+def request_key(req: OptimizeRequest) -> str:
+    """Canonical hash of ``req``; equal for requests that only differ in dict key types or order."""
+    data = {"version": CACHE_VERSION, "type": type(req).__name__, "request": req.model_dump(mode="json")}
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def is_final(stats: Optional[SolverStats]) -> bool:
+    """Whether solving again would not do better: every component proven optimal or infeasible."""
+    return stats is not None and stats.status in FINAL_STATUSES
+
+
+class MemoryCache:
+    """In-process LRU with a TTL, bounded by entry count and total bytes."""
+
+    blocking = False
+
+    def __init__(self, ttl_seconds: float, max_entries: int, max_bytes: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: bytes, ttl_seconds: Optional[float] = None):
+        """Store ``value`` for ``ttl_seconds`` (default and at most the cache's TTL)."""
+        if len(value) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (_stored_at(self, time.monotonic(), ttl_seconds), value)
+        self._bytes += len(value)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "entries": len(self._entries), "bytes": self._bytes, "evictions": self.evictions}
+
+    def _remove(self, key: str):
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+
+
+class DiskCache:
+    """One file per entry in ``directory``; mtime is when it was stored (TTL), atime its last use (LRU).
+
+    Writes are atomic renames, so processes sharing the directory never read a
+    partial entry.
+    """
+
+    blocking = True
+
+    def __init__(self, directory: str, ttl_seconds: float, max_entries: int, max_bytes: int):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            stored_at = os.stat(path).st_mtime
+            if time.time() - stored_at > self.ttl_seconds:
+                os.remove(path)
+                return None
+            with open(path, "rb") as f:
+                value = f.read()
+            os.utime(path, (time.time(), stored_at))
+            return value
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, value: bytes, ttl_seconds: Optional[float] = None):
+        """Store ``value`` for ``ttl_seconds`` (default and at most the cache's TTL)."""
+        if len(value) > self.max_bytes:
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(value)
+        if ttl_seconds is not None:
+            now = time.time()
+            os.utime(tmp, (now, _stored_at(self, now, ttl_seconds)))
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def clear(self):
+        for name, _, _ in self._entries():
+            self._discard(name)
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {"backend": "disk", "entries": len(entries), "bytes": sum(size for _, _, size in entries),
+                "evictions": self.evictions}
+
+    def _entries(self):
+        """(name, last use, size) of every entry, least recently used first."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.name, st.st_atime, st.st_size))
+        return sorted(entries, key=lambda e: e[1])
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, _, size in entries)
+        for name, _, size in entries:
+            if len(entries) <= self.max_entries and total <= self.max_bytes:
+                break
+            self._discard(name)
+            entries = entries[1:]
+            total -= size
+            self.evictions += 1
+
+    def _discard(self, name: str):
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass
+
+
+def _stored_at(backend, now: float, ttl_seconds: Optional[float]) -> float:
+    """``now``, back-dated so that an entry with a shorter ``ttl_seconds`` expires under the backend's TTL."""
+    if ttl_seconds is None:
+        return now
+    return now - max(0.0, backend.ttl_seconds - ttl_seconds)
+
+
+class ResultCache:
+    """Looks results up in a backend and runs each missing key's computation once.
+
+    Counters are per API process. With no backend (``OPTIMIZER_CACHE=off``)
+    concurrent identical requests are still coalesced, but nothing is stored.
+    Values ``compute`` marks as not final are stored for ``provisional_ttl``
+    seconds (0: not at all).
+    """
+
+    def __init__(self, backend=None, provisional_ttl: float = 60.0):
+        self.backend = backend
+        self.provisional_ttl = provisional_ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        """Configure from ``OPTIMIZER_CACHE`` (memory, disk or off) and the ``OPTIMIZER_CACHE_*`` limits."""
+        kind = os.getenv("OPTIMIZER_CACHE", "memory").lower()
+        ttl_seconds = float(os.getenv("OPTIMIZER_CACHE_TTL", 900))
+        max_entries = int(os.getenv("OPTIMIZER_CACHE_MAX_ENTRIES", 128))
+        max_bytes = int(os.getenv("OPTIMIZER_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+        provisional_ttl = float(os.getenv("OPTIMIZER_CACHE_PROVISIONAL_TTL", 60))
+        if kind == "off":
+            return cls()
+        if kind == "disk":
+            directory = os.getenv("OPTIMIZER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "workforce-optimizer-cache"))
+            return cls(DiskCache(directory, ttl_seconds, max_entries, max_bytes), provisional_ttl)
+        return cls(MemoryCache(ttl_seconds, max_entries, max_bytes), provisional_ttl)
+
+    def stats(self) -> dict:
+        stats = self.backend.stats() if self.backend is not None else {"backend": "off"}
+        return {**stats, "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight)}
+
+    async def get(self, key: str, compute: Callable[[], Awaitable[Tuple[bytes, object]]],
+                  refresh: bool = False, final: Optional[Callable[[object], bool]] = None) -> Tuple[bytes, object, str]:
+        """The cached value for ``key``, computing it on a miss.
+
+        ``compute`` returns ``(value, extra)``; only ``value`` is cached, for the
+        full TTL unless ``final(extra)`` is False. Returns
+        ``(value, extra, outcome)`` where ``extra`` is None unless this call ran
+        ``compute``, and ``outcome`` is ``hit``, ``miss`` or ``coalesced``.
+        ``refresh`` skips the lookup (but still joins a running computation).
+        """
+        if key not in self._in_flight and not refresh and self.backend is not None:
+            value = await self._call(self.backend.get, key)
+            if value is not None:
+                self.hits += 1
+                return value, None, HIT
+        if key in self._in_flight:
+            self.coalesced += 1
+            value, _ = await asyncio.shield(self._in_flight[key])
+            return value, None, COALESCED
+        self.misses += 1
+        # A task of its own, so a disconnecting first caller does not cancel the others' result
+        task = asyncio.ensure_future(self._compute(key, compute, final))
+        self._in_flight[key] = task
+        value, extra = await asyncio.shield(task)
+        return value, extra, MISS
+
+    async def _compute(self, key: str, compute, final):
+        try:
+            value, extra = await compute()
+            ttl_seconds = None if final is None or final(extra) else self.provisional_ttl
+            if self.backend is not None and ttl_seconds != 0:
+                try:
+                    await self._call(self.backend.put, key, value, ttl_seconds)
+                except OSError as e:
+                    logger.warning(f"Could not store result {key[:12]} in the cache: {e}")
+            return value, extra
+        finally:
+            del self._in_flight[key]
+
+    async def _call(self, fn, *args):
+        if self.backend.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
@@ -0,0 +1,420 @@
+"""Array-backed view of the roster used for model construction.
+
+Worker payloads carry ``skills`` lists and ``productivity`` / ``skill_levels``
+dicts with mixed str/int keys. ``normalize_workers`` resolves them once into
+NumPy arrays plus a skill -> worker-index inverted index (``normalize_columns``
+loads a columnar roster straight into the same arrays), and
+``compute_eligibility`` then derives every eligible (task, worker) pair with its
+productivity, quality score and unit capacity in vectorized passes, so model
+construction only ever visits eligible pairs.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models import BreakWindow, ColumnarRoster, OptimizeRequest, SkillMatrix, Task, Worker
+
+logger = logging.getLogger("optimizer")
+
+
+def time_to_min(tstr: str) -> int:
+    """Parse 'HH:MM' or 'HH:MM:SS' into minutes after midnight."""
+    if not tstr:
+        raise ValueError("Empty time string")
+    parts = tstr.strip().split(":")
+    if len(parts) == 2:
+        h, m = map(int, parts)
+    elif len(parts) == 3:
+        h, m, _ = map(int, parts)
+    else:
+        raise ValueError(f"Invalid time format: {tstr}")
+    return h * 60 + m
+
+
+RATE_SCALE = 100  # productivity is applied in whole hundredths of a unit per hour
+UNIT_MINUTES = 60 * RATE_SCALE  # minutes of one unit at a rate of 1 (hundredth of a unit per hour)
+
+
+def unit_rates(productivity) -> np.ndarray:
+    """Productivity (units per hour, possibly fractional) as integer hundredths of a unit per hour.
+
+    The model, the greedy engine and the capacity bounds all work with this
+    rate: a piece of ``u`` units takes ``ceil(UNIT_MINUTES * u / rate)`` minutes
+    and ``m`` minutes hold ``rate * m // UNIT_MINUTES`` units.
+    """
+    return np.rint(np.asarray(productivity, dtype=np.float64) * RATE_SCALE).astype(np.int64)
+
+
+def minimum_skill_levels(priorities: np.ndarray) -> np.ndarray:
+    """Vectorized ``get_minimum_skill_level_required``."""
+    return np.where(priorities >= 9, 3, np.where(priorities >= 7, 2, 1))
+
+
+def skill_quality_scores(levels: np.ndarray, productivity: np.ndarray) -> np.ndarray:
+    """Vectorized ``get_skill_quality_score``: 60% skill level (1-4), 40% productivity (0-100)."""
+    # A zero/missing productivity counts as 1, like the dict-based lookup
+    productivity = np.where(productivity > 0, productivity, 1)
+    return (0.6 * (levels / 4.0)) + (0.4 * (productivity / 100.0))
+
+
+def _skill_value(values: dict, skill_id: int):
+    for key in (str(skill_id), skill_id):
+        if key in values:
+            return values[key]
+    return None
+
+
+@dataclass
+class Roster:
+    """Workers as parallel arrays; skill columns are looked up through ``skill_col``."""
+    worker_ids: List[str]
+    worker_names: List[str]
+    skill_col: Dict[int, int]
+    skill_workers: Dict[int, np.ndarray]  # skill_id -> indices of workers holding it
+    productivity: np.ndarray  # (workers, skills) units/hour, 1 where missing
+    has_productivity: np.ndarray  # (workers, skills) bool
+    skill_level: np.ndarray  # (workers, skills) level 1-4
+    shift_start: np.ndarray  # minutes after midnight
+    shift_end: np.ndarray  # minutes, +24h for overnight shifts
+    break_minutes: np.ndarray  # total break minutes per shift
+    breaks: List[List[Tuple[int, int]]]  # per worker, fixed (start, end) break windows in shift minutes
+    longest_window: np.ndarray  # longest break-free stretch of the shift, in minutes
+
+    def __len__(self) -> int:
+        return len(self.worker_ids)
+
+    @property
+    def available_minutes(self) -> np.ndarray:
+        return self.shift_end - self.shift_start - self.break_minutes
+
+    def break_windows(self) -> Dict[str, List[Tuple[int, int]]]:
+        return dict(zip(self.worker_ids, self.breaks))
+
+    def shift_bounds(self) -> Dict[str, Tuple[int, int]]:
+        return {
+            w_id: (int(s), int(e))
+            for w_id, s, e in zip(self.worker_ids, self.shift_start, self.shift_end)
+        }
+
+
+def break_windows(w: Worker, shift_start: int, shift_end: int) -> List[Tuple[int, int]]:
+    """``w``'s breaks as (start, end) minutes on its shift axis, in order."""
+    return resolve_breaks(w.id, w.name, w.breaks, w.break_minutes, shift_start, shift_end)
+
+
+def resolve_breaks(worker_id: str, name: str, configured: Optional[List[BreakWindow]], break_minutes: int,
+                   shift_start: int, shift_end: int) -> List[Tuple[int, int]]:
+    """``break_windows`` for a worker given field by field; ``configured`` None means the default break.
+
+    Configured breaks outside the shift are ignored, and overlapping ones are
+    merged into one (fixed breaks share the worker's no-overlap constraint, so
+    two overlapping ones could never both be placed). The default break is
+    moved to the end of a shift too short to hold it 4 hours in (and cut to
+    the shift), so every worker keeps their break.
+    """
+    if configured is None:
+        wanted = shift_start + BreakWindow(minutes=break_minutes).after_minutes
+        start = max(shift_start, min(wanted, shift_end - break_minutes))
+        if start != wanted:
+            logger.info(f"Default break for worker {worker_id} ('{name}') does not fit 4 hours into their shift, "
+                        f"placing it at {start} min.")
+        return [(start, min(start + break_minutes, shift_end))]
+    windows = []
+    for b in configured:
+        if b.start is not None:
+            start = time_to_min(b.start)
+            # Clock times before the shift start belong to the post-midnight part
+            if start < shift_start:
+                start += 24 * 60
+        else:
+            start = shift_start + b.after_minutes
+        if start < shift_start or start + b.minutes > shift_end:
+            logger.warning(f"Break at {start} min for worker {worker_id} ('{name}') lies outside their shift, ignoring it.")
+            continue
+        windows.append((start, start + b.minutes))
+    merged = merge_windows(windows)
+    if len(merged) < len(windows):
+        logger.warning(f"Overlapping breaks for worker {worker_id} ('{name}'), merging them into {merged}.")
+    return merged
+
+
+def merge_windows(windows: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Sorted ``windows`` with overlapping ones joined; windows that only touch stay apart."""
+    merged = []
+    for start, end in sorted(windows):
+        if merged and start < merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def free_windows(window_start: int, window_end: int, breaks: List[Tuple[int, int]]) -> List[List[int]]:
+    """[start, end) stretches of ``window_start``..``window_end`` between ``breaks``."""
+    windows = []
+    cursor = window_start
+    for break_start, break_end in breaks:
+        if break_end <= cursor or break_end == break_start:
+            continue
+        if break_start > cursor:
+            windows.append([cursor, min(break_start, window_end)])
+        cursor = max(cursor, break_end)
+    if cursor < window_end:
+        windows.append([cursor, window_end])
+    return windows
+
+
+def grid_windows(windows: List[List[int]], step: int) -> List[List[int]]:
+    """``free_windows`` shrunk to whole ``step``-minute steps (boundaries on multiples of ``step``)."""
+    if step == 1:
+        return windows
+    aligned = [[-(-start // step) * step, end // step * step] for start, end in windows]
+    return [window for window in aligned if window[1] > window[0]]
+
+
+def longest_window(window_start: int, window_end: int, breaks: List[Tuple[int, int]]) -> int:
+    return max((end - start for start, end in free_windows(window_start, window_end, breaks)), default=0)
+
+
+def normalize_workers(workers: List[Worker]) -> Roster:
+    """Resolve worker dicts into a ``Roster``; costs O(total skills held)."""
+    skill_ids = sorted({s for w in workers for s in w.skills})
+    skill_col = {s: i for i, s in enumerate(skill_ids)}
+    n, k = len(workers), len(skill_ids)
+    held = np.zeros((n, k), dtype=bool)
+    productivity = np.ones((n, k), dtype=np.float64)
+    has_productivity = np.zeros((n, k), dtype=bool)
+    skill_level = np.ones((n, k), dtype=np.int64)
+    shift_start = np.empty(n, dtype=np.int64)
+    shift_end = np.empty(n, dtype=np.int64)
+    break_minutes = np.empty(n, dtype=np.int64)
+    breaks = []
+    longest = np.empty(n, dtype=np.int64)
+
+    for i, w in enumerate(workers):
+        start_min = time_to_min(w.shift_start)
+        end_min = time_to_min(w.shift_end)
+        # If end time is less than or equal to start time, the shift crosses midnight
+        if end_min <= start_min:
+            end_min += 24 * 60
+        shift_start[i] = start_min
+        shift_end[i] = end_min
+        breaks.append(break_windows(w, start_min, end_min))
+        break_minutes[i] = sum(end - start for start, end in breaks[i])
+        longest[i] = longest_window(start_min, end_min, breaks[i])
+        for s in w.skills:
+            col = skill_col[s]
+            held[i, col] = True
+            prod = _skill_value(w.productivity, s)
+            if prod is None:
+                logger.warning(f"Productivity for worker {w.id} ('{w.name}') and skill {s} not found, defaulting to 1.")
+            else:
+                productivity[i, col] = prod
+                has_productivity[i, col] = True
+            skill_level[i, col] = (w.skill_levels or {}).get(str(s)) or (w.skill_levels or {}).get(s) or 1
+
+    return Roster(
+        worker_ids=[w.id for w in workers],
+        worker_names=[w.name for w in workers],
+        skill_col=skill_col,
+        skill_workers={s: np.flatnonzero(held[:, col]) for s, col in skill_col.items()},
+        productivity=productivity,
+        has_productivity=has_productivity,
+        skill_level=skill_level,
+        shift_start=shift_start,
+        shift_end=shift_end,
+        break_minutes=break_minutes,
+        breaks=breaks,
+        longest_window=longest,
+    )
+
+
+def normalize_columns(columns: ColumnarRoster) -> Roster:
+    """``normalize_workers`` for a ``ColumnarRoster``, without per-worker model instances.
+
+    The skill matrix is scattered into the (workers, skills) arrays in one pass;
+    shift times and default breaks are resolved once per distinct value.
+    """
+    n = len(columns)
+    minutes = {t: time_to_min(t) for t in set(columns.shift_start) | set(columns.shift_end)}
+    shift_start = np.array([minutes[t] for t in columns.shift_start], dtype=np.int64)
+    shift_end = np.array([minutes[t] for t in columns.shift_end], dtype=np.int64)
+    # If end time is less than or equal to start time, the shift crosses midnight
+    shift_end = np.where(shift_end <= shift_start, shift_end + 24 * 60, shift_end)
+    configured = columns.breaks or {}
+    break_lengths = columns.break_minutes if columns.break_minutes is not None else [60] * n
+    breaks = []
+    break_minutes = np.empty(n, dtype=np.int64)
+    longest = np.empty(n, dtype=np.int64)
+    defaults = {}  # (shift start, shift end, break minutes) -> (windows, longest window)
+    for i, (start_min, end_min, length) in enumerate(zip(shift_start.tolist(), shift_end.tolist(), break_lengths)):
+        if i in configured:
+            windows = resolve_breaks(columns.id[i], columns.name[i], configured[i], length, start_min, end_min)
+            window = longest_window(start_min, end_min, windows)
+        else:
+            key = (start_min, end_min, length)
+            if key not in defaults:
+                windows = resolve_breaks(columns.id[i], columns.name[i], None, length, start_min, end_min)
+                defaults[key] = (windows, longest_window(start_min, end_min, windows))
+            windows, window = defaults[key]
+        breaks.append(windows)
+        break_minutes[i] = sum(end - start for start, end in windows)
+        longest[i] = window
+
+    matrix = columns.skills
+    entry_skills = np.array(matrix.skill_id, dtype=np.int64)
+    skill_ids = np.unique(entry_skills)
+    rows = np.array(matrix.worker, dtype=np.int64)
+    cols = np.searchsorted(skill_ids, entry_skills)
+    k = len(skill_ids)
+    held = np.zeros((n, k), dtype=bool)
+    held[rows, cols] = True
+    # null productivities become NaN
+    entry_productivity = np.array(matrix.productivity, dtype=np.float64)
+    known = ~np.isnan(entry_productivity)
+    productivity = np.ones((n, k), dtype=np.float64)
+    productivity[rows[known], cols[known]] = entry_productivity[known]
+    has_productivity = np.zeros((n, k), dtype=bool)
+    has_productivity[rows[known], cols[known]] = True
+    if not known.all():
+        logger.warning(f"Productivity missing for {int((~known).sum())} worker skills, defaulting to 1.")
+    skill_level = np.ones((n, k), dtype=np.int64)
+    if matrix.level is not None:
+        levels = np.array(matrix.level, dtype=np.int64)
+        # A zero level counts as 1, like a missing one
+        skill_level[rows, cols] = np.where(levels != 0, levels, 1)
+
+    return Roster(
+        worker_ids=list(columns.id),
+        worker_names=list(columns.name),
+        skill_col={s: col for col, s in enumerate(skill_ids.tolist())},
+        skill_workers={s: np.flatnonzero(held[:, col]) for col, s in enumerate(skill_ids.tolist())},
+        productivity=productivity,
+        has_productivity=has_productivity,
+        skill_level=skill_level,
+        shift_start=shift_start,
+        shift_end=shift_end,
+        break_minutes=break_minutes,
+        breaks=breaks,
+        longest_window=longest,
+    )
+
+
+def request_roster(req: OptimizeRequest) -> Roster:
+    """The normalized roster of ``req``, whether its workers are objects or columns."""
+    if isinstance(req.workers, ColumnarRoster):
+        return normalize_columns(req.workers)
+    return normalize_workers(req.workers)
+
+
+def columnar_roster(workers: List[Worker]) -> ColumnarRoster:
+    """``workers`` as a ``ColumnarRoster``, e.g. to build a columnar payload."""
+    entries = [(i, s, _skill_value(w.productivity, s), _skill_value(w.skill_levels or {}, s) or 1)
+               for i, w in enumerate(workers) for s in w.skills]
+    return ColumnarRoster(
+        id=[w.id for w in workers],
+        name=[w.name for w in workers],
+        shift_start=[w.shift_start for w in workers],
+        shift_end=[w.shift_end for w in workers],
+        break_minutes=[w.break_minutes for w in workers],
+        breaks={i: w.breaks for i, w in enumerate(workers) if w.breaks is not None} or None,
+        skills=SkillMatrix(
+            worker=[e[0] for e in entries],
+            skill_id=[e[1] for e in entries],
+            productivity=[e[2] for e in entries],
+            level=[e[3] for e in entries],
+        ),
+    )
+
+
+def take_workers(workers, indices: List[int]):
+    """The workers at roster ``indices``, in the same form (list or ``ColumnarRoster``) as ``workers``."""
+    if not isinstance(workers, ColumnarRoster):
+        return [workers[i] for i in indices]
+    position = {i: k for k, i in enumerate(indices)}
+    matrix = workers.skills
+    entries = [e for e, i in enumerate(matrix.worker) if i in position]
+    # Both sides were validated with the original payload
+    return ColumnarRoster.model_construct(
+        id=[workers.id[i] for i in indices],
+        name=[workers.name[i] for i in indices],
+        shift_start=[workers.shift_start[i] for i in indices],
+        shift_end=[workers.shift_end[i] for i in indices],
+        break_minutes=None if workers.break_minutes is None else [workers.break_minutes[i] for i in indices],
+        breaks={position[i]: b for i, b in (workers.breaks or {}).items() if i in position} or None,
+        skills=SkillMatrix.model_construct(
+            worker=[position[matrix.worker[e]] for e in entries],
+            skill_id=[matrix.skill_id[e] for e in entries],
+            productivity=[matrix.productivity[e] for e in entries],
+            level=None if matrix.level is None else [matrix.level[e] for e in entries],
+        ),
+    )
+
+
+@dataclass
+class TaskEligibility:
+    """Eligible workers for one task, with per-pair attributes aligned to ``workers``."""
+    workers: np.ndarray  # roster indices
+    productivity: np.ndarray
+    quality: np.ndarray
+    max_units: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.workers)
+
+
+_EMPTY = TaskEligibility(
+    workers=np.empty(0, dtype=np.int64),
+    productivity=np.empty(0),
+    quality=np.empty(0),
+    max_units=np.empty(0, dtype=np.int64),
+)
+
+
+def compute_eligibility(tasks: List[Task], roster: Roster) -> Dict[str, TaskEligibility]:
+    """Eligible (task, worker) pairs, computed once per (skill, priority) class.
+
+    A worker is eligible when they hold the task's skill, meet the minimum level
+    for its priority (priority >= 8 tasks also accept under-skilled workers, with
+    a quality penalty) and can fit at least one unit into their shift. A pair
+    is one contiguous piece of work, so its unit cap comes from the worker's
+    longest stretch between breaks.
+    """
+    min_levels = minimum_skill_levels(np.array([t.priority for t in tasks], dtype=np.int64))
+    by_skill = {}
+    by_class = {}
+    result = {}
+    for t, min_level in zip(tasks, min_levels.tolist()):
+        workers = roster.skill_workers.get(t.skill_id)
+        if workers is None or len(workers) == 0:
+            result[t.id] = _EMPTY
+            continue
+        key = (t.skill_id, t.priority)
+        if key not in by_class:
+            if t.skill_id not in by_skill:
+                col = roster.skill_col[t.skill_id]
+                prod = roster.productivity[workers, col]
+                level = roster.skill_level[workers, col]
+                max_units = unit_rates(prod) * roster.longest_window[workers] // UNIT_MINUTES
+                by_skill[t.skill_id] = (prod, level, max_units, skill_quality_scores(level, prod))
+            prod, level, max_units, quality = by_skill[t.skill_id]
+            under_skilled = level < min_level
+            if t.priority >= 8 and min_level > 1:
+                # Critical tasks allow reduced-skill assignment rather than leaving work unassigned
+                qualified = np.ones(len(workers), dtype=bool)
+            else:
+                qualified = ~under_skilled
+            if t.priority >= 8:
+                penalty = (min_level - level) * 0.2
+                quality = np.where(under_skilled, np.maximum(0.1, quality - penalty), quality)
+            mask = qualified & (max_units > 0)
+            by_class[key] = TaskEligibility(
+                workers=workers[mask],
+                productivity=prod[mask],
+                quality=quality[mask],
+                max_units=max_units[mask],
+            )
+        result[t.id] = by_class[key]
+    return result
@@ -0,0 +1,139 @@
+"""Request decoding and response encoding for large rosters and plans.
+
+Plans with tens of thousands of assignments cost as much to serialize as to
+solve when FastAPI walks them through ``jsonable_encoder``. Responses are
+instead encoded to bytes by pydantic-core's serializer, inside the solver pool
+process for ``/optimize``, so the event loop only forwards the bytes.
+
+``POST /optimize/columnar`` takes a ``ColumnarOptimizeRequest`` as JSON or,
+when ``msgpack`` is installed, as MessagePack (``Content-Type:
+application/msgpack``); either is validated straight from the raw body.
+
+Clients choose the body with the usual headers:
+
+- ``Accept: application/x-ndjson`` gives one ``{"assignment": ...}`` line per
+  assignment followed by a ``{"result": ...}`` line holding the rest of the
+  response, which can be parsed as it arrives;
+- ``Accept-Encoding: gzip`` compresses bodies of at least ``GZIP_MIN_BYTES``.
+"""
+import gzip
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from pydantic import BaseModel
+
+from models import Assignment, ColumnarOptimizeRequest, OptimizeRequest, OptimizeResponse, RequestTrace
+from timing import PARSE, QUEUE, SERIALIZATION, PhaseTimer, SolveTrace, TraceRequest, phase, profile_dir, profiled
+
+try:
+    import msgpack
+except ImportError:  # optional: only needed for MessagePack request bodies
+    msgpack = None
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+MSGPACK = ("application/msgpack", "application/x-msgpack")
+GZIP_MIN_BYTES = 64 * 1024
+
+
+@dataclass
+class Encoding:
+    media_type: str = JSON
+    gzip: bool = False
+
+
+@dataclass
+class EncodedBody:
+    content: bytes
+    media_type: str
+    gzipped: bool = False
+
+    def headers(self) -> dict:
+        return {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"} if self.gzipped else {}
+
+
+class UnsupportedMediaTypeError(Exception):
+    """Raised for a request body in a format this service cannot decode."""
+
+
+def decode_columnar(body: bytes, content_type: str) -> ColumnarOptimizeRequest:
+    """Validate a columnar request body.
+
+    Raises ``UnsupportedMediaTypeError`` for other body types, ``ValueError`` for
+    undecodable MessagePack and ``pydantic.ValidationError`` for invalid fields.
+    """
+    media_type = (content_type or JSON).split(";")[0].strip().lower()
+    if media_type in MSGPACK:
+        if msgpack is None:
+            raise UnsupportedMediaTypeError("MessagePack bodies need the msgpack package.")
+        try:
+            data = msgpack.unpackb(body, strict_map_key=False)
+        except (ValueError, msgpack.UnpackException) as e:
+            raise ValueError(f"Invalid MessagePack body: {e}") from e
+        return ColumnarOptimizeRequest.model_validate(data)
+    if media_type != JSON:
+        raise UnsupportedMediaTypeError(f"Unsupported request body type {media_type}.")
+    return ColumnarOptimizeRequest.model_validate_json(body)
+
+
+def negotiate(accept: str = "", accept_encoding: str = "") -> Encoding:
+    """Pick the body format from the ``Accept`` and ``Accept-Encoding`` headers."""
+    media_types = {part.split(";")[0].strip().lower() for part in (accept or "").split(",")}
+    codings = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+    return Encoding(media_type=NDJSON if NDJSON in media_types else JSON, gzip="gzip" in codings)
+
+
+def _ndjson(response: OptimizeResponse) -> bytes:
+    to_json = Assignment.__pydantic_serializer__.to_json
+    lines = [b'{"assignment":' + to_json(a) + b"}" for a in response.assignments]
+    lines.append(b'{"result":' + response.model_dump_json(exclude={"assignments"}).encode() + b"}")
+    return b"\n".join(lines) + b"\n"
+
+
+def encode(model: BaseModel, encoding: Encoding = Encoding()) -> EncodedBody:
+    """Serialize ``model``; only an ``OptimizeResponse`` can be sent as NDJSON."""
+    if encoding.media_type == NDJSON and isinstance(model, OptimizeResponse):
+        body = EncodedBody(_ndjson(model), NDJSON)
+    else:
+        body = EncodedBody(model.model_dump_json().encode(), JSON)
+    return _compress(body, encoding)
+
+
+def reencode(content: bytes, encoding: Encoding) -> EncodedBody:
+    """``encode`` for an ``OptimizeResponse`` already serialized as JSON, e.g. by the result cache."""
+    if encoding.media_type == NDJSON:
+        return encode(OptimizeResponse.model_validate_json(content), encoding)
+    return _compress(EncodedBody(content, JSON), encoding)
+
+
+def _compress(body: EncodedBody, encoding: Encoding) -> EncodedBody:
+    if encoding.gzip and len(body.content) >= GZIP_MIN_BYTES:
+        body.content = gzip.compress(body.content, compresslevel=5)
+        body.gzipped = True
+    return body
+
+
+def solve_cacheable(req: OptimizeRequest, encoding: Encoding,
+                    trace: Optional[TraceRequest] = None) -> Tuple[bytes, EncodedBody, SolveTrace]:
+    """Pool entry point: the response as plain JSON (to cache), in ``encoding``, and how the time was spent.
+
+    With ``trace`` the response carries its ``RequestTrace`` (timed up to the end
+    of extraction), and is profiled when the trace asks for it.
+    """
+    from optimizer import solve  # only pool processes import the solver (see solver_pool.warm_up)
+    timer = PhaseTimer()
+    queue_wait = time.time() - trace.submitted_at if trace is not None else 0.0
+    directory = profile_dir() if trace is not None and trace.profile else None
+    with timer.active(), (profiled(directory) if directory is not None else nullcontext()) as profile:
+        response = solve(req)
+    if trace is not None:
+        phases = {PARSE: trace.parse_seconds, QUEUE: max(0.0, queue_wait), **timer.phases}
+        response.trace = RequestTrace(phases=phases, wall_time=trace.parse_seconds + time.time() - trace.submitted_at,
+                                      profile=profile)
+    with timer.active():
+        with phase(SERIALIZATION):
+            content = response.model_dump_json().encode()
+            body = EncodedBody(content, JSON) if encoding == Encoding() else encode(response, encoding)
+    return content, body, SolveTrace(len(req.workers), len(req.tasks), timer.phases, response.solver_stats)
@@ -0,0 +1,93 @@
+"""Per-request CP-SAT parameters and solve statistics.
+
+Interactive previews want a plan within seconds and accept a small optimality
+gap; overnight batch plans can search much longer. ``solver_options`` picks a
+named preset and/or sets individual parameters (explicit fields win over the
+preset), and every solve reports its statistics so limits can be tuned.
+"""
+import os
+from typing import List, Optional
+
+from ortools.sat.python import cp_model
+
+from models import ComponentResult, SolverOptions, SolverStats
+
+DEFAULT_TIME_LIMIT = 30.0  # seconds per request
+
+PRESETS = {
+    "interactive": SolverOptions(time_limit=5.0, relative_gap_limit=0.02),
+    "thorough": SolverOptions(time_limit=120.0, relative_gap_limit=0.0),
+}
+
+# Worst first: the aggregate status of a request is that of its worst component
+_STATUS_ORDER = ["MODEL_INVALID", "INFEASIBLE", "UNKNOWN", "FEASIBLE", "OPTIMAL"]
+
+
+def resolve_options(options: Optional[SolverOptions]) -> SolverOptions:
+    """Merge the preset with explicitly set fields and fill in the default time limit."""
+    if options is None:
+        return SolverOptions(time_limit=DEFAULT_TIME_LIMIT)
+    merged = PRESETS[options.preset].model_dump(exclude_unset=True) if options.preset else {}
+    merged.update(options.model_dump(exclude_unset=True, exclude={"preset"}))
+    merged.setdefault("time_limit", DEFAULT_TIME_LIMIT)
+    return SolverOptions(preset=options.preset, **merged)
+
+
+def share_search_workers(options: SolverOptions, solves: int) -> SolverOptions:
+    """``options`` for one of ``solves`` CP-SAT solves running at once in a process.
+
+    They share the search workers of a single solve (an unset
+    ``num_search_workers`` means one per core, as in CP-SAT), at least one each,
+    instead of each starting its own full set.
+    """
+    if solves <= 1:
+        return options
+    total = options.num_search_workers or os.cpu_count() or 1
+    return options.model_copy(update={"num_search_workers": max(1, total // solves)})
+
+
+def apply_options(solver: cp_model.CpSolver, options: SolverOptions, time_limit: float):
+    """Set ``solver.parameters``; ``time_limit`` is what is left of the request's budget."""
+    parameters = solver.parameters
+    parameters.max_time_in_seconds = time_limit
+    if options.num_search_workers is not None:
+        parameters.num_search_workers = options.num_search_workers
+    if options.relative_gap_limit is not None:
+        parameters.relative_gap_limit = options.relative_gap_limit
+    if options.absolute_gap_limit is not None:
+        parameters.absolute_gap_limit = options.absolute_gap_limit
+    if options.max_deterministic_time is not None:
+        parameters.max_deterministic_time = options.max_deterministic_time
+    if options.random_seed is not None:
+        parameters.random_seed = options.random_seed
+
+
+def aggregate_stats(components: List[ComponentResult], wall_time: float) -> SolverStats:
+    """Request-level statistics: sums over components, worst status, gap of the sums."""
+    solved = [c for c in components if c.best_bound is not None]
+    objective = sum(c.objective for c in components if c.objective is not None) if components else None
+    best_bound = sum(c.best_bound for c in solved) if solved and len(solved) == len(components) else None
+    engines = {c.engine for c in components}
+    heuristic = [c.heuristic_objective for c in components]
+    # Components that skipped CP-SAT built no model to compress, so they count on neither side
+    modeled = [c for c in components if c.worker_classes + c.task_classes > 0]
+    classes = sum(c.worker_classes + c.task_classes for c in modeled)
+    return SolverStats(
+        status=min((c.status for c in components), key=_status_rank, default="UNKNOWN"),
+        engine=engines.pop() if len(engines) == 1 else ("mixed" if engines else "cp-sat"),
+        objective=objective,
+        heuristic_objective=sum(heuristic) if heuristic and None not in heuristic else None,
+        best_bound=best_bound,
+        gap=abs(best_bound - objective) / max(1.0, abs(objective)) if best_bound is not None else None,
+        wall_time=wall_time,
+        branches=sum(c.branches for c in components),
+        conflicts=sum(c.conflicts for c in components),
+        variables=sum(c.variables for c in components),
+        constraints=sum(c.constraints for c in components),
+        intervals=sum(c.intervals for c in components),
+        compression_ratio=sum(c.workers + c.tasks for c in modeled) / classes if classes else None,
+    )
+
+
+def _status_rank(status: str) -> int:
+    return _STATUS_ORDER.index(status) if status in _STATUS_ORDER else 0
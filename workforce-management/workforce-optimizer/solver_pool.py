@@ -0,0 +1,233 @@
+"""Bounded process pool for CP-SAT solves.
+
+The FastAPI event loop only parses requests and serializes responses; model
+build and ``solver.Solve`` run here, one solve per pool process, so several
+``/optimize`` calls can use separate cores at once. Admission control keeps the
+number of waiting solves bounded instead of letting requests pile up.
+
+Pool processes are started with the pool and live as long as it does. Each one
+imports the solver stack (OR-Tools, the model builder, the pool entry points)
+and runs a tiny solve before taking work, so the API process itself never
+loads OR-Tools and the first real request in a process pays no cold start.
+``SolverPool.ready`` turns true once every process has finished its warm-up;
+one whose warm-up failed still serves (importing on its first call) and is
+counted in ``SolverPool.warm_up_failed`` so the failure stays visible.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger("optimizer")
+
+# One worker, one small task: enough to go through build, CP-SAT and response encoding
+WARMUP_REQUEST = {
+    "date": "2025-01-01",
+    "tasks": [{"id": "warmup", "name": "Warm-up", "skill_id": 1, "priority": 1, "units": 10}],
+    "workers": [{"id": "warmup", "name": "Warm-up", "skills": [1], "productivity": {"1": 60},
+                 "shift_start": "08:00", "shift_end": "10:00", "break_minutes": 0}],
+    "solver_options": {"time_limit": 5, "num_search_workers": 1, "capacity_presolve": False},
+}
+
+
+def configure_logging():
+    """Configure the optimizer log format and level (used by the API and pool processes)."""
+    logging.basicConfig(
+        level=os.getenv("OPTIMIZER_LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s %(message)s",
+        stream=sys.stdout,
+        force=True
+    )
+
+
+def warm_up():
+    """Import every pool entry point's dependencies and solve ``WARMUP_REQUEST`` once."""
+    import batch  # noqa: F401
+    import jobs  # noqa: F401
+    from models import OptimizeRequest
+    from serialization import Encoding, solve_cacheable
+
+    solve_cacheable(OptimizeRequest(**WARMUP_REQUEST), Encoding())
+
+
+def _initialize(warm, failed, run_warm_up: bool):
+    """Pool process initializer: logging, then the warm-up; ``warm`` and ``failed`` count the processes done."""
+    configure_logging()
+    if run_warm_up:
+        started = time.perf_counter()
+        try:
+            warm_up()
+        except Exception:
+            # The process still serves, just cold; counted so readiness does not wait on it forever
+            logger.exception("Solver process warm-up failed")
+            with failed.get_lock():
+                failed.value += 1
+            return
+        logger.info(f"Solver process {os.getpid()} warmed up in {time.perf_counter() - started:.2f}s")
+    with warm.get_lock():
+        warm.value += 1
+
+
+class PoolSaturatedError(Exception):
+    """Raised when every pool process is busy and the wait queue is full."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Solver pool is full, retry later.")
+        self.retry_after = retry_after
+
+
+class PoolUnavailableError(Exception):
+    """Raised when the pool is not running (startup, shutdown or crashed)."""
+
+
+class SolverPool:
+    """Runs picklable callables in worker processes with queue-depth backpressure.
+
+    ``size`` solves run concurrently and up to ``max_queue`` more may wait for a
+    free process; anything beyond that is rejected with ``PoolSaturatedError``.
+    With ``warm_up`` each process runs ``warm_up()`` when it starts.
+    """
+
+    def __init__(self, size: int, max_queue: int, retry_after: int = 5, warm_up: bool = True):
+        if size < 1:
+            raise ValueError("Solver pool size must be at least 1")
+        if max_queue < 0:
+            raise ValueError("Solver pool queue depth cannot be negative")
+        self.size = size
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self.warm_up = warm_up
+        self._executor = None
+        self._warm = None
+        self._failed = None
+        self._in_flight = 0
+
+    @classmethod
+    def from_env(cls) -> "SolverPool":
+        """Build a pool from ``OPTIMIZER_POOL_SIZE`` / ``OPTIMIZER_MAX_QUEUE`` / ``OPTIMIZER_POOL_WARMUP``."""
+        size = int(os.getenv("OPTIMIZER_POOL_SIZE", os.cpu_count() or 1))
+        max_queue = int(os.getenv("OPTIMIZER_MAX_QUEUE", size))
+        retry_after = int(os.getenv("OPTIMIZER_RETRY_AFTER", 5))
+        warm_up = os.getenv("OPTIMIZER_POOL_WARMUP", "on").lower() not in ("off", "0", "false")
+        return cls(size=size, max_queue=max_queue, retry_after=retry_after, warm_up=warm_up)
+
+    def start(self):
+        if self._executor is None:
+            # spawn keeps OR-Tools and uvicorn state out of the children
+            context = multiprocessing.get_context("spawn")
+            self._warm = context.Value("i", 0)
+            self._failed = context.Value("i", 0)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.size,
+                mp_context=context,
+                initializer=_initialize,
+                initargs=(self._warm, self._failed, self.warm_up),
+            )
+            # Processes are spawned on demand; one no-op per slot starts (and warms) them all now
+            for _ in range(self.size):
+                self._executor.submit(os.getpid)
+            logger.info(f"Solver pool started: size={self.size}, max_queue={self.max_queue}")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._warm = None
+            self._failed = None
+
+    @property
+    def warm(self) -> int:
+        """Processes that finished their warm-up."""
+        return self._warm.value if self._warm is not None else 0
+
+    @property
+    def warm_up_failed(self) -> int:
+        """Processes whose warm-up raised; they serve, but pay the cold start on their first call."""
+        return self._failed.value if self._failed is not None else 0
+
+    @property
+    def ready(self) -> bool:
+        return self._executor is not None and self.warm + self.warm_up_failed >= self.size
+
+    @property
+    def running(self) -> int:
+        return min(self._in_flight, self.size)
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._in_flight - self.size)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": self.queued,
+            "warm": self.warm,
+            "warm_up_failed": self.warm_up_failed,
+            "ready": self.ready,
+        }
+
+    def admit(self, count: int = 1):
+        """Raise unless ``count`` more calls can be submitted right now."""
+        if self._executor is None:
+            raise PoolUnavailableError("Solver pool is not running.")
+        if self._in_flight + count > self.size + self.max_queue:
+            raise PoolSaturatedError(self.retry_after)
+
+    def submit(self, fn, *args) -> asyncio.Future:
+        """Admit ``fn(*args)`` to the pool and return a future for its result.
+
+        Admission is decided synchronously, so callers can reject a request
+        before doing any other work.
+        """
+        self.admit()
+        executor = self._executor
+        try:
+            future = asyncio.wrap_future(executor.submit(fn, *args))
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise PoolUnavailableError("Solver process crashed, retry later.")
+        # Only the event loop thread touches the counter, so no lock is needed
+        self._in_flight += 1
+        future.add_done_callback(lambda f: self._release(f, executor))
+        return future
+
+    async def run(self, fn, *args):
+        """Run ``fn(*args)`` in a pool process and await its result."""
+        future = self.submit(fn, *args)
+        try:
+            # Shielded so a disconnecting client does not free a slot that is still solving
+            return await asyncio.shield(future)
+        except BrokenProcessPool:
+            raise PoolUnavailableError("Solver process crashed, retry later.")
+
+    async def run_all(self, fn, calls: list) -> list:
+        """Run ``fn(*args)`` for each ``args`` in ``calls`` and await every result, in order.
+
+        The calls are admitted together and submitted before the first await, so
+        no other coroutine can take their places in between: all of them run, or
+        none does.
+        """
+        self.admit(len(calls))
+        futures = [self.submit(fn, *args) for args in calls]
+        try:
+            return await asyncio.shield(asyncio.gather(*futures))
+        except BrokenProcessPool:
+            raise PoolUnavailableError("Solver process crashed, retry later.")
+
+    def _release(self, future: asyncio.Future, executor: ProcessPoolExecutor):
+        self._in_flight -= 1
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._restart(executor)
+
+    def _restart(self, executor: ProcessPoolExecutor):
+        # A worker died (e.g. OOM); replace the pool once so later calls recover
+        if self._executor is executor:
+            logger.error("Solver pool process died, restarting pool")
+            self.shutdown()
+            self.start()
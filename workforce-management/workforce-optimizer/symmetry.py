@@ -0,0 +1,85 @@
+"""Worker and task equivalence classes for symmetry breaking.
+
+Rosters often hold many interchangeable workers (same skills, productivity,
+levels, shift and breaks) and interchangeable small tasks (same skill, priority
+and units, with no dependencies either way). Any plan can be permuted within
+such a class without changing its objective, so CP-SAT wastes search on
+equivalent plans. Ordering each class (workers by load, tasks by assigned
+units) removes those duplicates while keeping one optimal plan of every kind.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models import OptimizeRequest
+from replan import FrozenWork
+from roster import Roster
+
+
+@dataclass
+class EquivalenceClasses:
+    workers: List[List[str]]  # worker ids per class with two or more members, in roster order
+    tasks: List[List[str]]  # task ids per class with two or more members, in request order
+    worker_count: int  # number of worker classes, singletons included
+    task_count: int
+
+    def compression_ratio(self, workers: int, tasks: int) -> float:
+        """(workers + tasks) per (worker class + task class)."""
+        return (workers + tasks) / max(1, self.worker_count + self.task_count)
+
+
+def find_classes(req: OptimizeRequest, roster: Roster, frozen: Optional[FrozenWork] = None) -> EquivalenceClasses:
+    held = np.zeros(roster.productivity.shape, dtype=bool)
+    for skill, workers in roster.skill_workers.items():
+        held[workers, roster.skill_col[skill]] = True
+    worker_groups: Dict[tuple, List[str]] = {}
+    for i, w_id in enumerate(roster.worker_ids):
+        key = (
+            held[i].tobytes(), roster.productivity[i].tobytes(), roster.skill_level[i].tobytes(),
+            int(roster.shift_start[i]), int(roster.shift_end[i]), tuple(roster.breaks[i]),
+        )
+        if frozen is not None:
+            key += (frozen.window_start.get(w_id), frozen.worker_units.get(w_id, 0))
+        worker_groups.setdefault(key, []).append(w_id)
+
+    depended_on = {dep for t in req.tasks for dep in t.dependencies or []}
+    task_groups: Dict[tuple, List[str]] = {}
+    for t in req.tasks:
+        key = (t.skill_id, t.priority, t.units)
+        if t.dependencies or t.id in depended_on:
+            key = ("unique", t.id)
+        task_groups.setdefault(key, []).append(t.id)
+
+    return EquivalenceClasses(
+        workers=[group for group in worker_groups.values() if len(group) > 1],
+        tasks=[group for group in task_groups.values() if len(group) > 1],
+        worker_count=len(worker_groups),
+        task_count=len(task_groups),
+    )
+
+
+def canonical_plan(plan: Dict[Tuple[str, str], Tuple[int, int, int]],
+                   classes: EquivalenceClasses) -> Dict[Tuple[str, str], Tuple[int, int, int]]:
+    """Permute ``plan`` within each class so it satisfies the symmetry-breaking order.
+
+    Interchangeable workers swap whole schedules so loads are non-increasing in
+    class order, and interchangeable tasks swap all their pieces likewise.
+    """
+    for members in classes.workers:
+        loads = {w_id: 0 for w_id in members}
+        for (_, w_id), (_, _, units) in plan.items():
+            if w_id in loads:
+                loads[w_id] += units
+        by_load = sorted(members, key=lambda w_id: -loads[w_id])
+        rename = dict(zip(by_load, members))
+        plan = {(t_id, rename.get(w_id, w_id)): piece for (t_id, w_id), piece in plan.items()}
+    for members in classes.tasks:
+        totals = {t_id: 0 for t_id in members}
+        for (t_id, _), (_, _, units) in plan.items():
+            if t_id in totals:
+                totals[t_id] += units
+        by_total = sorted(members, key=lambda t_id: -totals[t_id])
+        rename = dict(zip(by_total, members))
+        plan = {(rename.get(t_id, t_id), w_id): piece for (t_id, w_id), piece in plan.items()}
+    return plan
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for multi-day batch optimization
+"""
+
+import asyncio
+import logging
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from batch import day_requests, solve_day, summarize
+from models import BatchOptimizeRequest, OptimizeRequest
+from optimizer import solve
+from roster import normalize_workers
+from solver_pool import PoolSaturatedError, SolverPool
+from test_api_fix import test_payload
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def weekly_batch(days: int) -> BatchOptimizeRequest:
+    return BatchOptimizeRequest(
+        workers=test_payload["workers"],
+        days=[{"date": f"2025-07-{14 + d}", "tasks": test_payload["tasks"]} for d in range(days)],
+    )
+
+
+def test_day_requests_share_the_roster():
+    batch = weekly_batch(3)
+    requests = day_requests(batch)
+    assert [req.date for req in requests] == ["2025-07-14", "2025-07-15", "2025-07-16"]
+    assert all(req.workers is batch.workers for req in requests)
+
+
+def test_batch_days_match_single_day_solves():
+    """Each day of a batch, solved on the pool, equals the /optimize plan for that date"""
+    batch = weekly_batch(2)
+    requests = day_requests(batch)
+    pool = SolverPool(size=1, max_queue=1)
+
+    async def run():
+        pool.start()
+        try:
+            roster = normalize_workers(batch.workers)
+            return await asyncio.gather(*(pool.run(solve_day, req, roster) for req in requests))
+        finally:
+            pool.shutdown()
+
+    responses = asyncio.run(run())
+    results = {req.date: response for req, response in zip(requests, responses)}
+    for req in requests:
+        single = solve(OptimizeRequest(**{**test_payload, "date": req.date}))
+        assert results[req.date].assignments == single.assignments
+    summary = summarize(requests, results, wall_time=1.0)
+    assert summary.days == 2
+    assert summary.total_units == 2 * sum(t["units"] for t in test_payload["tasks"])
+    assert summary.assignment_rate == 100.0
+
+
+def test_batch_admission_is_all_or_nothing():
+    pool = SolverPool(size=1, max_queue=1)
+
+    async def run():
+        pool.start()
+        try:
+            pool.admit(2)
+            with pytest.raises(PoolSaturatedError):
+                pool.admit(3)
+        finally:
+            pool.shutdown()
+
+    asyncio.run(run())
+
+
+def test_batch_takes_its_pool_places_before_yielding():
+    """No other call can slip in between admitting a batch and submitting its days"""
+    pool = SolverPool(size=1, max_queue=1, warm_up=False)
+
+    async def run():
+        pool.start()
+        try:
+            batch = asyncio.ensure_future(pool.run_all(time.sleep, [(0.2,), (0.2,)]))
+            await asyncio.sleep(0)
+            with pytest.raises(PoolSaturatedError):
+                pool.admit()
+            assert await batch == [None, None]
+        finally:
+            pool.shutdown()
+
+    asyncio.run(run())
+
+
+def test_batch_endpoint_normalizes_the_roster_off_the_event_loop(monkeypatch):
+    loops = []
+
+    def record(workers):
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+        return normalize_workers(workers)
+
+    monkeypatch.setattr(main, "normalize_workers", record)
+    monkeypatch.setattr(main, "solver_pool", SolverPool(size=2, max_queue=0, warm_up=False))
+    with TestClient(main.app) as client:
+        response = client.post("/optimize/batch", json=weekly_batch(2).model_dump())
+    assert response.status_code == 200 and response.json()["summary"]["assignment_rate"] == 100.0
+    assert loops == [None]
+
+
+if __name__ == "__main__":
+    test_day_requests_share_the_roster()
+    test_batch_days_match_single_day_solves()
+    test_batch_admission_is_all_or_nothing()
+    test_batch_takes_its_pool_places_before_yielding()
+    print("✅ Batch tests passed")
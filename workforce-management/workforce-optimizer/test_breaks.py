@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for fixed break windows
+"""
+
+import logging
+
+from models import BreakWindow, OptimizeRequest, Worker
+from optimizer import solve
+from roster import break_windows, normalize_workers
+from test_api_fix import test_payload
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def worker(**fields) -> Worker:
+    return Worker(**{"id": "W", "name": "W", "skills": [100], "productivity": {"100": 60},
+                     "shift_start": "16:00", "shift_end": "00:00", **fields})
+
+
+def test_default_break_is_four_hours_into_the_shift():
+    assert break_windows(worker(), 960, 1440) == [(1200, 1260)]
+    assert break_windows(worker(break_minutes=30), 960, 1440) == [(1200, 1230)]
+
+
+def test_default_break_moves_into_a_short_shift():
+    # A 4-hour shift cannot hold the break 4 hours in; it ends the shift instead of vanishing
+    assert break_windows(worker(), 960, 1200) == [(1140, 1200)]
+    # and is cut to a shift shorter than the break
+    assert break_windows(worker(), 960, 1000) == [(960, 1000)]
+    payload = {**test_payload, "workers": [{**test_payload["workers"][0], "shift_end": "11:00"}]}
+    response = solve(OptimizeRequest(**payload))
+    breaks = [a for a in response.assignments if a.is_break]
+    assert [(b.start, b.end) for b in breaks] == [("2025-08-05T10:00:00", "2025-08-05T11:00:00")]
+    assert all(a.end <= breaks[0].start for a in response.assignments if not a.is_break)
+
+
+def test_zero_minute_break_does_not_split_the_shift():
+    roster = normalize_workers([worker(break_minutes=0)])
+    assert roster.break_windows()["W"] == [(1200, 1200)]
+    assert roster.longest_window.tolist() == [480]
+
+
+def test_configured_breaks_by_offset_and_clock_time():
+    w = worker(breaks=[BreakWindow(minutes=30, start="22:00"), BreakWindow(minutes=15, after_minutes=120)])
+    assert break_windows(w, 960, 1440) == [(1080, 1095), (1320, 1350)]
+    # Clock times after midnight belong to the end of an overnight shift
+    overnight = worker(shift_start="20:00", shift_end="04:00", breaks=[BreakWindow(minutes=20, start="01:00")])
+    assert break_windows(overnight, 1200, 1680) == [(1500, 1520)]
+    # Breaks outside the shift are dropped
+    assert break_windows(worker(breaks=[BreakWindow(minutes=30, start="10:00")]), 960, 1440) == []
+    roster = normalize_workers([w])
+    assert roster.break_minutes.tolist() == [45]
+
+
+def test_overlapping_breaks_are_merged():
+    assert break_windows(worker(breaks=[BreakWindow(minutes=30, start="18:00"), BreakWindow(minutes=30, start="18:15")]),
+                         960, 1440) == [(1080, 1125)]
+    # Breaks that only touch stay apart
+    assert break_windows(worker(breaks=[BreakWindow(minutes=30, start="18:00"), BreakWindow(minutes=30, start="18:30")]),
+                         960, 1440) == [(1080, 1110), (1110, 1140)]
+    payload = {**test_payload, "workers": [{**test_payload["workers"][0],
+                                           "breaks": [{"minutes": 30, "start": "10:00"}, {"minutes": 30, "start": "10:15"}]}],
+               # No greedy shortcut, so the CP-SAT model itself must be feasible
+               "solver_options": {"capacity_presolve": False}}
+    response = solve(OptimizeRequest(**payload))
+    assert response.solver_stats.status == "OPTIMAL" and response.solver_stats.engine == "cp-sat"
+    breaks = [a for a in response.assignments if a.is_break]
+    assert [(b.start, b.end) for b in breaks] == [("2025-08-05T10:00:00", "2025-08-05T10:45:00")]
+
+
+def test_work_never_overlaps_any_break():
+    payload = dict(test_payload)
+    payload["workers"] = [
+        {**w, "breaks": [{"minutes": 30, "after_minutes": 120}, {"minutes": 30, "after_minutes": 300}]}
+        for w in test_payload["workers"]
+    ]
+    response = solve(OptimizeRequest(**payload))
+    breaks = [a for a in response.assignments if a.is_break]
+    work = [a for a in response.assignments if not a.is_break]
+    assert len(breaks) == 2 * len(payload["workers"])
+    assert work
+    for a in work:
+        for b in breaks:
+            if b.worker_id == a.worker_id:
+                assert a.end <= b.start or a.start >= b.end
+
+
+if __name__ == "__main__":
+    test_default_break_is_four_hours_into_the_shift()
+    test_default_break_moves_into_a_short_shift()
+    test_zero_minute_break_does_not_split_the_shift()
+    test_configured_breaks_by_offset_and_clock_time()
+    test_overlapping_breaks_are_merged()
+    test_work_never_overlaps_any_break()
+    print("✅ Break tests passed")
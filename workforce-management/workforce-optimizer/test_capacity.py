@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the capacity presolve: pair pruning, skill capacity and the LP objective bound
+"""
+
+import logging
+
+from capacity import objective_bound, pair_capacity, prune_eligibility
+from instances import InstanceSpec, generate_instance
+from models import OptimizeRequest, SolverOptions, Task, Worker
+from optimizer import build_model, solve
+from replan import freeze_committed
+from roster import compute_eligibility, normalize_workers
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def worker(w_id: str, **fields) -> Worker:
+    base = dict(id=w_id, name=w_id, skills=[1], productivity={"1": 60}, skill_levels={"1": 2},
+                shift_start="08:00", shift_end="16:00")
+    base.update(fields)
+    return Worker(**base)
+
+
+def test_pairs_are_capped_by_the_longest_stretch_between_breaks():
+    # Breaks at 10:00 and 13:00 leave 2 h, 2.5 h and 2.5 h stretches
+    w = worker("W1", breaks=[{"minutes": 30, "start": "10:00"}, {"minutes": 30, "start": "13:00"}])
+    roster = normalize_workers([w])
+    tasks = [Task(id="t", name="t", skill_id=1, priority=5, units=100)]
+    eligibility = compute_eligibility(tasks, roster)
+    assert eligibility["t"].max_units.tolist() == [150]
+
+    # A worker whose longest stretch holds less than one unit is pruned
+    slow = worker("W2", productivity={"1": 1}, breaks=[{"minutes": 5, "after_minutes": 50 * k} for k in range(1, 10)])
+    assert len(compute_eligibility(tasks, normalize_workers([slow]))["t"]) == 0
+
+
+def test_pairs_without_capacity_get_no_model_variables():
+    """Re-planning at 15:30: W2's shift is over and W1 has 30 minutes left"""
+    req = OptimizeRequest(
+        tasks=[Task(id="t", name="t", skill_id=1, priority=5, units=100)],
+        workers=[worker("W1"), worker("W2", shift_end="15:00")],
+        date="2025-07-14",
+        now="2025-07-14T15:30:00",
+    )
+    roster = normalize_workers(req.workers)
+    frozen = freeze_committed(req, roster.shift_bounds())
+    eligibility = compute_eligibility(req.tasks, roster)
+    assert len(eligibility["t"]) == 2
+    pruned = prune_eligibility(req, eligibility, pair_capacity(req, roster, eligibility, frozen))
+    assert [roster.worker_ids[i] for i in pruned["t"].workers] == ["W1"]
+    assert pruned["t"].max_units.tolist() == [30]
+    built = build_model(req, roster, frozen, pruned)
+    assert list(built.split_unit_vars) == [("t", "W1")]
+    assert sum(a.units for a in solve(req).assignments if not a.is_break) == 30
+
+
+def test_skill_capacity_flags_overloaded_skills():
+    req = OptimizeRequest(
+        tasks=[Task(id="a", name="a", skill_id=1, priority=5, units=1000),
+               Task(id="b", name="b", skill_id=2, priority=5, units=10)],
+        workers=[worker("W1"), worker("W2", skills=[2], productivity={"2": 60}, skill_levels={"2": 2})],
+        date="2025-07-14",
+    )
+    capacity = {c.skill_id: c for c in solve(req).capacity}
+    # 8 h shift minus the default 1 h break at 60 units/h, in one 4 h stretch per piece
+    assert capacity[1].demand_units == 1000 and capacity[1].max_assignable_units == 240
+    assert capacity[2].demand_units == capacity[2].max_assignable_units == 10
+
+
+def test_lp_bound_is_an_upper_bound():
+    for seed in (1, 3):
+        req = generate_instance(InstanceSpec(workers=12, tasks=8, skills=4, dependency_density=0.4, load_factor=0.3, seed=seed))
+        roster = normalize_workers(req.workers)
+        bound = objective_bound(req, pair_capacity(req, roster, compute_eligibility(req.tasks, roster)))
+        exact = solve(req.model_copy(update={"solver_options": SolverOptions(capacity_presolve=False)}))
+        assert exact.solver_stats.status == "OPTIMAL"
+        assert exact.solver_stats.objective <= bound
+
+
+def test_underloaded_request_skips_cp_sat():
+    req = OptimizeRequest(
+        tasks=[Task(id=str(j), name=str(j), skill_id=1, priority=5, units=20) for j in range(3)],
+        workers=[worker(f"W{i}") for i in range(6)],
+        date="2025-07-14",
+    )
+    response = solve(req)
+    stats = response.solver_stats
+    assert stats.engine == "greedy" and stats.status == "OPTIMAL"
+    assert stats.variables == 0
+    assert stats.objective == stats.best_bound == response.components[0].capacity_bound
+    assert response.unassigned_tasks == []
+
+    exact = solve(req.model_copy(update={"solver_options": SolverOptions(capacity_presolve=False)}))
+    assert exact.solver_stats.engine == "cp-sat"
+    assert exact.solver_stats.objective == stats.objective
+
+
+if __name__ == "__main__":
+    test_pairs_are_capped_by_the_longest_stretch_between_breaks()
+    test_pairs_without_capacity_get_no_model_variables()
+    test_skill_capacity_flags_overloaded_skills()
+    test_lp_bound_is_an_upper_bound()
+    test_underloaded_request_skips_cp_sat()
+    print("✅ Capacity presolve tests passed")
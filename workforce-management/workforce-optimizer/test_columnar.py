@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar roster payload
+"""
+
+import logging
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from decomposition import find_components
+from instances import InstanceSpec, generate_instance
+from models import BreakWindow, ColumnarOptimizeRequest, OptimizeRequest, OptimizeResponse
+from optimizer import solve
+from roster import columnar_roster, compute_eligibility, normalize_columns, normalize_workers
+from test_api_fix import test_payload
+from test_decomposition import two_site_request
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def columnar(req: OptimizeRequest) -> ColumnarOptimizeRequest:
+    return ColumnarOptimizeRequest(**{**req.model_dump(exclude={"workers"}), "workers": columnar_roster(req.workers)})
+
+
+def mixed_request() -> OptimizeRequest:
+    """Generated roster with custom breaks, a short break and a missing productivity"""
+    req = generate_instance(InstanceSpec(workers=40, tasks=25, skills=6, dependency_density=0.2, seed=5))
+    req.workers[0].breaks = [BreakWindow(minutes=30, after_minutes=120), BreakWindow(minutes=15, start="03:00")]
+    req.workers[1].break_minutes = 30
+    req.workers[2].productivity.pop(str(req.workers[2].skills[0]))
+    return req
+
+
+def test_columns_normalize_like_worker_objects():
+    req = mixed_request()
+    expected = normalize_workers(req.workers)
+    roster = normalize_columns(columnar_roster(req.workers))
+
+    for field in ("worker_ids", "worker_names", "skill_col", "breaks"):
+        assert getattr(roster, field) == getattr(expected, field)
+    for field in ("productivity", "has_productivity", "skill_level", "shift_start", "shift_end", "break_minutes",
+                  "longest_window"):
+        assert np.array_equal(getattr(roster, field), getattr(expected, field))
+    assert roster.skill_workers.keys() == expected.skill_workers.keys()
+    assert all(np.array_equal(roster.skill_workers[s], expected.skill_workers[s]) for s in roster.skill_workers)
+
+
+def test_columnar_solve_matches_object_solve():
+    req = mixed_request()
+    fast = req.model_copy(update={"mode": "fast"})
+    assert solve(columnar(fast)).assignments == solve(fast).assignments
+
+    # Components carry their slice of the columns
+    req = two_site_request()
+    roster = normalize_workers(req.workers)
+    eligibility = compute_eligibility(req.tasks, roster)
+    expected = find_components(req, roster, eligibility)
+    components = find_components(columnar(req), roster, eligibility)
+    assert [c.workers.id for c in components] == [[w.id for w in c.workers] for c in expected]
+    assert [normalize_columns(c.workers).breaks for c in components] == [normalize_workers(c.workers).breaks for c in expected]
+    response = solve(columnar(req))
+    assert [c.status for c in response.components] == ["OPTIMAL", "OPTIMAL"]
+    assert sum(c.objective for c in response.components) == sum(c.objective for c in solve(req).components)
+
+
+def test_columnar_endpoint_accepts_json_and_msgpack():
+    from main import app
+
+    req = columnar(OptimizeRequest(**test_payload))
+    expected = solve(OptimizeRequest(**test_payload)).assignments
+    with TestClient(app) as client:
+        response = client.post("/optimize/columnar", content=req.model_dump_json(),
+                               headers={"Content-Type": "application/json"})
+        assert response.status_code == 200
+        assert OptimizeResponse.model_validate(response.json()).assignments == expected
+
+        bad = req.model_dump()
+        bad["workers"]["name"] = []
+        assert client.post("/optimize/columnar", json=bad).status_code == 422
+        assert client.post("/optimize/columnar", content=b"x", headers={"Content-Type": "text/csv"}).status_code == 415
+
+        msgpack = pytest.importorskip("msgpack")
+        response = client.post("/optimize/columnar", content=msgpack.packb(req.model_dump()),
+                               headers={"Content-Type": "application/msgpack"})
+        assert response.status_code == 200
+        assert OptimizeResponse.model_validate(response.json()).assignments == expected
+
+
+if __name__ == "__main__":
+    test_columns_normalize_like_worker_objects()
+    test_columnar_solve_matches_object_solve()
+    test_columnar_endpoint_accepts_json_and_msgpack()
+    print("✅ Columnar roster tests passed")
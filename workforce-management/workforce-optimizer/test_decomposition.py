@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for splitting requests into independent components
+"""
+
+import logging
+
+from ortools.sat.python import cp_model
+
+import optimizer
+from decomposition import find_components
+from instances import InstanceSpec, generate_instance
+from models import OptimizeRequest, SolverOptions
+from optimizer import build_model, solve
+from roster import compute_eligibility, normalize_workers
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def two_site_request() -> OptimizeRequest:
+    """Inbound and outbound blocks that share no skills, plus one task nobody can do"""
+    inbound = generate_instance(InstanceSpec(workers=5, tasks=4, skills=2, dependency_density=0.7, load_factor=0.3, seed=1))
+    outbound = generate_instance(InstanceSpec(workers=5, tasks=4, skills=2, dependency_density=0.7, load_factor=0.3, seed=2))
+    for w in outbound.workers:
+        w.id = f"O{w.id}"
+        w.skills = [s + 100 for s in w.skills]
+        w.productivity = {str(int(k) + 100): v for k, v in w.productivity.items()}
+        w.skill_levels = {str(int(k) + 100): v for k, v in w.skill_levels.items()}
+    for t in outbound.tasks:
+        t.id = f"O{t.id}"
+        t.skill_id += 100
+        t.dependencies = [f"O{d}" for d in t.dependencies]
+    orphan = inbound.tasks[0].model_copy(update={"id": "orphan", "skill_id": 999, "dependencies": []})
+    return OptimizeRequest(tasks=inbound.tasks + outbound.tasks + [orphan],
+                           workers=inbound.workers + outbound.workers, date="2025-07-16")
+
+
+def test_find_components_splits_disjoint_blocks():
+    req = two_site_request()
+    roster = normalize_workers(req.workers)
+    components = find_components(req, roster, compute_eligibility(req.tasks, roster))
+
+    assert len(components) == 2
+    task_sets = sorted(sorted(t.id for t in c.tasks) for c in components)
+    assert task_sets == [["0", "1", "2", "3"], ["O0", "O1", "O2", "O3"]]
+    assert sum(len(c.workers) for c in components) == 10
+
+
+def test_decomposed_solve_matches_monolithic_objective():
+    req = two_site_request()
+    response = solve(req)
+
+    assert [c.status for c in response.components] == ["OPTIMAL", "OPTIMAL"]
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = 30.0
+    assert solver.Solve(build_model(req).model) == cp_model.OPTIMAL
+    assert sum(c.objective for c in response.components) == solver.ObjectiveValue()
+    assert sum(1 for a in response.assignments if a.is_break) == len(req.workers)
+    assert any(u.id == "orphan" for u in response.unassigned_tasks)
+
+
+def test_concurrent_components_share_search_workers(monkeypatch):
+    seen = []
+    solve_component = optimizer._solve_component
+
+    def record(sub, options, *args):
+        seen.append(options.num_search_workers)
+        return solve_component(sub, options, *args)
+
+    monkeypatch.setattr(optimizer, "_solve_component", record)
+    monkeypatch.setenv("OPTIMIZER_COMPONENT_THREADS", "2")
+    req = two_site_request()
+    req.solver_options = SolverOptions(num_search_workers=4)
+    assert [c.status for c in solve(req).components] == ["OPTIMAL", "OPTIMAL"]
+    assert seen == [2, 2]
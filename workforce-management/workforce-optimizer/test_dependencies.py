@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Tests for the aggregate task-dependency formulation
+"""
+
+from ortools.sat.python import cp_model
+
+from benchmark_dependencies import build_pairwise, model_size
+from instances import InstanceSpec, generate_instance
+from optimizer import build_model
+
+
+def solve_objective(built):
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = 30.0
+    status = solver.Solve(built.model)
+    assert status == cp_model.OPTIMAL
+    return solver.ObjectiveValue()
+
+
+def test_aggregate_dependencies_match_pairwise_optimum():
+    """Both formulations describe the same plans, so their optima agree"""
+    req = generate_instance(InstanceSpec(workers=8, tasks=6, skills=3, dependency_density=0.8, load_factor=0.3, seed=0))
+    assert solve_objective(build_model(req)) == solve_objective(build_pairwise(req))
+
+
+def test_aggregate_dependencies_are_linear_in_workers():
+    req = generate_instance(InstanceSpec(workers=60, tasks=20, skills=3, dependency_density=0.5, seed=3))
+    _, pairwise_constraints = model_size(build_pairwise(req).model)
+    _, aggregate_constraints = model_size(build_model(req).model)
+    assert aggregate_constraints < pairwise_constraints / 2
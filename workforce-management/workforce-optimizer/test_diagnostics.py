@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the feasibility diagnostics behind POST /optimize/diagnose
+"""
+
+import asyncio
+import logging
+
+from fastapi.testclient import TestClient
+
+import main
+from diagnostics import diagnose
+from models import OptimizeRequest, Task, Worker
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def worker(w_id: str, level: int = 2, prod: int = 60, shift_end: str = "16:00") -> Worker:
+    return Worker(id=w_id, name=w_id, skills=[1], productivity={"1": prod}, skill_levels={"1": level},
+                  shift_start="08:00", shift_end=shift_end)
+
+
+def test_each_reason_is_reported():
+    req = OptimizeRequest(
+        tasks=[
+            Task(id="no-skill", name="a", skill_id=2, priority=5, units=10),
+            Task(id="too-senior", name="b", skill_id=1, priority=7, units=10),  # needs level 2
+            Task(id="too-long", name="c", skill_id=1, priority=5, units=500),
+            Task(id="no-unit-fits", name="d", skill_id=1, priority=1, units=1),
+        ],
+        workers=[worker("junior", level=1), worker("slow", level=1, prod=1, shift_end="08:30")],
+        date="2025-07-14",
+    )
+    by_task = {d.task_id: d for d in diagnose(req).tasks}
+
+    assert by_task["no-skill"].reason == "missing_skill"
+    assert by_task["no-skill"].skill_holders == 0
+
+    senior = by_task["too-senior"]
+    assert senior.min_skill_level == 2
+    assert senior.level_below_minimum == ["junior", "slow"]
+    assert senior.reason == "level_below_minimum"
+
+    long = by_task["too-long"]
+    # junior can take part of it; the whole task (500 min for junior) exceeds both shifts
+    assert long.reason is None and long.eligible_workers == 1
+    assert long.duration_exceeds_shift == ["junior", "slow"]
+
+    # A 30-minute shift at 1 unit/h cannot hold one unit
+    assert by_task["no-unit-fits"].eligible_workers == 1
+    assert by_task["no-unit-fits"].duration_exceeds_shift == ["slow"]
+
+
+def test_critical_tasks_accept_under_skilled_workers():
+    req = OptimizeRequest(tasks=[Task(id="t", name="t", skill_id=1, priority=9, units=10)],
+                          workers=[worker("junior", level=1)], date="2025-07-14")
+    response = diagnose(req)
+    assert response.unassignable_tasks == 0
+    assert response.tasks[0].level_below_minimum == []
+    assert response.capacity[0].max_assignable_units == 10
+
+
+def test_endpoint_diagnoses_off_the_event_loop(monkeypatch):
+    loops = []
+
+    def record(req):
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+        return diagnose(req)
+
+    monkeypatch.setattr(main, "diagnose", record)
+    req = OptimizeRequest(tasks=[Task(id="t", name="t", skill_id=1, priority=5, units=10)],
+                          workers=[worker("w")], date="2025-07-14")
+    with TestClient(main.app) as client:
+        response = client.post("/optimize/diagnose", json=req.model_dump())
+    assert response.status_code == 200 and response.json()["unassignable_tasks"] == 0
+    assert loops == [None]
+
+
+if __name__ == "__main__":
+    test_each_reason_is_reported()
+    test_critical_tasks_accept_under_skilled_workers()
+    print("✅ Diagnostics tests passed")
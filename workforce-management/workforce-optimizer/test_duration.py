@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for the duration encodings (duration_mode)
+"""
+
+import datetime
+import logging
+
+from benchmark_duration import check_durations
+from instances import InstanceSpec, generate_instance
+from models import OptimizeRequest
+from optimizer import build_model, solve
+from ortools.sat.python import cp_model
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def test_linear_mode_matches_division_mode():
+    req = generate_instance(InstanceSpec(workers=6, tasks=4, skills=2, dependency_density=0.3, load_factor=0.3, seed=4))
+    division = solve(req)
+    linear = solve(req.model_copy(update={"duration_mode": "linear"}))
+    assert division.solver_stats.status == linear.solver_stats.status == "OPTIMAL"
+    assert division.solver_stats.objective == linear.solver_stats.objective
+
+
+def test_linear_mode_durations_are_exact():
+    req = generate_instance(InstanceSpec(workers=6, tasks=4, skills=2, dependency_density=0.3, load_factor=0.3, seed=4)).model_copy(update={"duration_mode": "linear"})
+    built = build_model(req)
+    solver = cp_model.CpSolver()
+    assert solver.Solve(built.model) == cp_model.OPTIMAL
+    assert check_durations(req, built, solver) == 0
+
+
+def fractional_request(productivity: float, units: int) -> OptimizeRequest:
+    return OptimizeRequest(
+        date="2025-08-05",
+        tasks=[{"id": "1", "name": "Task", "skill_id": 100, "priority": 5, "units": units, "dependencies": []}],
+        workers=[{"id": "W1", "name": "Worker", "skills": [100], "productivity": {100: productivity},
+                  "skill_levels": {100: 3}, "shift_start": "08:00", "shift_end": "16:00", "breaks": []}],
+    )
+
+
+def test_fractional_productivity_is_not_truncated():
+    """Both engines plan at the float productivity that eligibility used"""
+    for productivity, units, expected in ((0.5, 10, 4), (1.5, 20, 12), (2.75, 30, 22)):
+        for mode in ("optimal", "fast"):
+            response = solve(fractional_request(productivity, units).model_copy(update={"mode": mode}))
+            work = [a for a in response.assignments if not a.is_break]
+            assert sum(a.units for a in work) == expected, (productivity, mode)
+            piece = work[0]
+            minutes = (datetime.datetime.fromisoformat(piece.end)
+                       - datetime.datetime.fromisoformat(piece.start)).total_seconds() / 60
+            assert minutes == -(-60 * piece.units // productivity)
+
+
+if __name__ == "__main__":
+    test_linear_mode_matches_division_mode()
+    test_linear_mode_durations_are_exact()
+    test_fractional_productivity_is_not_truncated()
+    print("✅ Duration mode tests passed")
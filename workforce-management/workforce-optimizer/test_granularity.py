@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for time_granularity_minutes: a coarser model grid with exact minute output
+"""
+
+import datetime
+import logging
+
+from ortools.sat.python import cp_model
+
+from heuristic import greedy_plan
+from instances import InstanceSpec, generate_instance
+from models import OptimizeRequest, SolverOptions
+from optimizer import build_model, solve
+from symmetry import canonical_plan
+from test_api_fix import test_payload
+from warm_start import add_solution_hints
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def grid_request(granularity: int, seed: int = 3):
+    req = generate_instance(InstanceSpec(workers=25, tasks=20, skills=5, dependency_density=0.3, seed=seed))
+    req.time_granularity_minutes = granularity
+    req.solver_options = SolverOptions(num_search_workers=1, max_deterministic_time=0.5, random_seed=0)
+    return req
+
+
+def minutes(iso: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(iso)
+
+
+def test_grid_plan_is_feasible_in_minutes():
+    req = grid_request(15)
+    response = solve(req)
+    assert response.solver_stats.engine == "cp-sat"
+    workers = {w.id: w for w in req.workers}
+    tasks = {t.id: t for t in req.tasks}
+    work = [a for a in response.assignments if not a.is_break]
+    assert work
+    by_worker = {}
+    for a in response.assignments:
+        by_worker.setdefault(a.worker_id, []).append(a)
+    for a in work:
+        start, end = minutes(a.start), minutes(a.end)
+        assert start.minute % 15 == 0
+        # Exact minute durations, not rounded up to the grid
+        prod = workers[a.worker_id].productivity[str(tasks[a.task_id].skill_id)]
+        assert (end - start).total_seconds() == 60 * -(-60 * a.units // prod)
+        for other in by_worker[a.worker_id]:
+            if other is not a:
+                assert end <= minutes(other.start) or start >= minutes(other.end)
+    ends = {}
+    for a in work:
+        ends[a.task_id] = max(minutes(a.end), ends.get(a.task_id, minutes(a.end)))
+    for a in work:
+        for dep in tasks[a.task_id].dependencies or []:
+            assert dep not in ends or minutes(a.start) >= ends[dep]
+
+
+def test_coarser_grid_shrinks_time_domains():
+    fine, coarse = build_model(grid_request(1)), build_model(grid_request(15))
+    key = next(iter(coarse.start_vars))
+    fine_domain = fine.model.Proto().variables[fine.start_vars[key].Index()].domain
+    coarse_domain = coarse.model.Proto().variables[coarse.start_vars[key].Index()].domain
+    assert coarse_domain[-1] - coarse_domain[0] <= (fine_domain[-1] - fine_domain[0]) // 15
+
+
+def test_breaks_rounded_onto_the_same_step_are_merged():
+    """10:00-10:07 and 10:10-10:20 do not overlap, but both cover the 10:00-10:15 step at g=15"""
+    worker = {**test_payload["workers"][0], "breaks": [{"minutes": 7, "start": "10:00"}, {"minutes": 10, "start": "10:10"}]}
+    req = OptimizeRequest(**{**test_payload, "workers": [worker]}, time_granularity_minutes=15,
+                          solver_options={"capacity_presolve": False})
+    assert build_model(req).break_intervals == 1
+    response = solve(req)
+    assert response.solver_stats.status == "OPTIMAL" and response.solver_stats.engine == "cp-sat"
+    # Both breaks are still reported as given
+    assert len([a for a in response.assignments if a.is_break]) == 2
+
+
+def test_greedy_plan_on_the_grid_is_a_feasible_model_solution():
+    """The greedy plan respects the grid, so fixing the grid model to it is feasible and scores the same"""
+    for granularity in (5, 15):
+        req = grid_request(granularity, seed=4)
+        built = build_model(req)
+        greedy = greedy_plan(req, built.roster, built.eligibility)
+        assert all(start % granularity == 0 for start, _, _ in greedy.plan.values())
+        greedy.plan = canonical_plan(greedy.plan, built.classes)
+        add_solution_hints(built.model, greedy.plan, built.presences, built.start_vars, built.end_vars,
+                           built.split_unit_vars, built.unit_caps, granularity)
+        solver = cp_model.CpSolver()
+        solver.parameters.fix_variables_to_their_hinted_value = True
+        solver.parameters.max_time_in_seconds = 20
+        assert solver.Solve(built.model) == cp_model.OPTIMAL
+        assert solver.ObjectiveValue() == greedy.objective
+
+
+if __name__ == "__main__":
+    test_grid_plan_is_feasible_in_minutes()
+    test_coarser_grid_shrinks_time_domains()
+    test_breaks_rounded_onto_the_same_step_are_merged()
+    test_greedy_plan_on_the_grid_is_a_feasible_model_solution()
+    print("✅ Time granularity tests passed")
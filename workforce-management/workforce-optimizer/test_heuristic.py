@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the greedy engine, mode=fast and the CP-SAT fallback
+"""
+
+import logging
+
+from ortools.sat.python import cp_model
+
+from heuristic import dependency_order, greedy_plan
+from instances import InstanceSpec, generate_instance
+from models import SolverOptions, Task
+from optimizer import build_model, solve
+from symmetry import canonical_plan
+from warm_start import add_solution_hints
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def test_dependency_order_puts_dependencies_first():
+    tasks = [
+        Task(id="a", name="a", skill_id=1, priority=9, units=1, dependencies=["b"]),
+        Task(id="b", name="b", skill_id=1, priority=1, units=1),
+        Task(id="c", name="c", skill_id=1, priority=5, units=1),
+        Task(id="x", name="x", skill_id=1, priority=5, units=1, dependencies=["y"]),
+        Task(id="y", name="y", skill_id=1, priority=5, units=1, dependencies=["x"]),
+    ]
+    # Cycles never become ready
+    assert [t.id for t in dependency_order(tasks)] == ["c", "b", "a"]
+
+
+def test_greedy_plan_is_a_feasible_model_solution():
+    """Fixing the model to the greedy plan is feasible and scores the greedy objective"""
+    for seed in (4, 5):
+        req = generate_instance(InstanceSpec(workers=60, tasks=40, skills=10, dependency_density=0.3, seed=seed))
+        built = build_model(req)
+        greedy = greedy_plan(req, built.roster, built.eligibility)
+        greedy.plan = canonical_plan(greedy.plan, built.classes)
+        add_solution_hints(built.model, greedy.plan, built.presences, built.start_vars, built.end_vars,
+                           built.split_unit_vars, built.unit_caps)
+        solver = cp_model.CpSolver()
+        solver.parameters.fix_variables_to_their_hinted_value = True
+        solver.parameters.max_time_in_seconds = 20
+        assert solver.Solve(built.model) == cp_model.OPTIMAL
+        assert solver.ObjectiveValue() == greedy.objective
+
+
+def test_fast_mode_reports_the_greedy_engine():
+    req = generate_instance(InstanceSpec(workers=6, tasks=4, skills=2, dependency_density=0.3, seed=4))
+    fast = solve(req.model_copy(update={"mode": "fast"}))
+    exact = solve(req)
+    assert fast.solver_stats.engine == "greedy"
+    assert exact.solver_stats.engine == "cp-sat"
+    assert exact.solver_stats.heuristic_objective == fast.solver_stats.objective
+    assert exact.solver_stats.objective >= fast.solver_stats.objective
+    assert any(not a.is_break for a in fast.assignments)
+
+
+def test_greedy_plan_is_returned_when_cp_sat_finds_nothing():
+    req = generate_instance(InstanceSpec(workers=60, tasks=40, skills=10, dependency_density=0.3, seed=4))
+    response = solve(req.model_copy(update={"solver_options": SolverOptions(max_deterministic_time=0.0)}))
+    assert response.solver_stats.status == "UNKNOWN"
+    assert response.solver_stats.engine == "greedy"
+    assert response.solver_stats.objective == response.solver_stats.heuristic_objective
+    assert any(not a.is_break for a in response.assignments)
+
+
+if __name__ == "__main__":
+    test_dependency_order_puts_dependencies_first()
+    test_greedy_plan_is_a_feasible_model_solution()
+    test_fast_mode_reports_the_greedy_engine()
+    test_greedy_plan_is_returned_when_cp_sat_finds_nothing()
+    print("✅ Heuristic tests passed")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic instance generator and the benchmark suite's regression checks
+"""
+
+from collections import Counter
+
+from benchmark_suite import BASELINES, compare, load_baselines, run_tier
+from instances import SHIFTS, InstanceSpec, generate_instance
+
+
+def test_same_spec_same_instance():
+    spec = InstanceSpec(workers=40, tasks=30, seed=4)
+    assert generate_instance(spec) == generate_instance(spec)
+    assert generate_instance(spec) != generate_instance(InstanceSpec(workers=40, tasks=30, seed=5))
+
+
+def test_spec_controls_shifts_dependencies_and_spread():
+    spec = InstanceSpec(workers=400, tasks=300, skills=12, dependency_density=0.5,
+                        shift_mix={"day": 0.7, "overnight": 0.3}, productivity_spread=0.0, seed=1)
+    req = generate_instance(spec)
+    shifts = Counter((w.shift_start, w.shift_end) for w in req.workers)
+    assert set(shifts) == {SHIFTS["day"], SHIFTS["overnight"]}
+    assert 0.6 < shifts[SHIFTS["day"]] / len(req.workers) < 0.8
+
+    # Dependencies only point back, so the graph is acyclic
+    dependent = [t for t in req.tasks if t.dependencies]
+    assert all(int(d) < int(t.id) for t in dependent for d in t.dependencies)
+    assert 0.4 < len(dependent) / len(req.tasks) < 0.6
+
+    # Without spread every holder of a skill works at its base rate
+    rates = {}
+    for w in req.workers:
+        for s, prod in w.productivity.items():
+            rates.setdefault(s, set()).add(prod)
+    assert all(len(r) == 1 for r in rates.values())
+    assert all(1 <= len(w.skills) <= 3 for w in req.workers)
+
+
+def test_compare_flags_regressions_only_beyond_tolerance():
+    baseline = {"build_time": 1.0, "wall_time": 10.0, "peak_rss_mb": 200.0, "objective": 1000.0,
+                "assignment_rate": 90.0, "gap": 0.05}
+    assert compare(dict(baseline, build_time=1.4, objective=995.0), baseline) == []
+    regressions = compare(dict(baseline, wall_time=20.0, objective=900.0, assignment_rate=85.0), baseline)
+    assert [r.split()[0] for r in regressions] == ["wall_time", "objective", "assignment_rate"]
+    assert compare(dict(baseline, wall_time=20.0), baseline, time_tolerance=1.5) == []
+
+
+def test_small_tier_matches_its_baseline():
+    """The small tier is deterministic, so its plan quality must match the stored baseline"""
+    baseline = load_baselines(BASELINES)["small"]
+    result = run_tier("small")
+    assert (result["variables"], result["constraints"]) == (baseline["variables"], baseline["constraints"])
+    assert compare(result, {k: baseline[k] for k in ("objective", "assignment_rate", "gap")}) == []
+
+
+if __name__ == "__main__":
+    test_same_spec_same_instance()
+    test_spec_controls_shifts_dependencies_and_spread()
+    test_compare_flags_regressions_only_beyond_tolerance()
+    test_small_tier_matches_its_baseline()
+    print("✅ Instance generator tests passed")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the durable SQLite job queue
+"""
+
+import logging
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+from job_queue import COMPLETED, FAILED, QUEUED, RUNNING, JobQueue, process_next
+from models import OptimizeRequest
+from test_api_fix import test_payload
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def test_equal_requests_share_a_job(tmp_path):
+    queue = JobQueue(str(tmp_path / "queue.db"))
+    first, deduplicated = queue.enqueue(OptimizeRequest(**test_payload))
+    assert first["status"] == QUEUED and not deduplicated
+    # Same request, productivity keyed by string instead of int
+    payload = {**test_payload, "workers": [{**test_payload["workers"][0], "productivity": {"100": 80}}]}
+    again, deduplicated = queue.enqueue(OptimizeRequest(**payload))
+    assert again["job_id"] == first["job_id"] and deduplicated
+    fresh, deduplicated = queue.enqueue(OptimizeRequest(**test_payload), refresh=True)
+    assert fresh["job_id"] != first["job_id"] and not deduplicated
+    assert queue.stats()[QUEUED] == 2
+
+
+def test_worker_result_survives_a_restart(tmp_path):
+    path = str(tmp_path / "queue.db")
+    job, _ = JobQueue(path).enqueue(OptimizeRequest(**test_payload))
+    assert process_next(JobQueue(path), "worker-1")
+    assert not process_next(JobQueue(path), "worker-1")
+
+    restarted = JobQueue(path)
+    state = restarted.get(job["job_id"])
+    assert state["status"] == COMPLETED and state["attempts"] == 1
+    assert sum(a["units"] for a in state["result"]["assignments"] if not a["is_break"]) == 50
+    stats = restarted.stats()
+    assert stats[COMPLETED] == 1 and stats[QUEUED] == 0 and stats["recent_wait"] >= 0
+
+
+def test_expired_lease_moves_to_another_worker(tmp_path):
+    queue = JobQueue(str(tmp_path / "queue.db"), lease_seconds=0.05, max_attempts=2)
+    job, _ = queue.enqueue(OptimizeRequest(**test_payload))
+    lost = queue.claim("worker-1")
+    assert queue.claim("worker-2") is None
+    time.sleep(0.1)
+    taken = queue.claim("worker-2")
+    assert taken.job_id == job["job_id"] and taken.attempt == 2
+    # The first worker's late result is discarded
+    assert not queue.complete(lost, "{}")
+    assert queue.get(job["job_id"])["status"] == RUNNING
+    time.sleep(0.1)
+    # Both claimants died: the job fails instead of being claimed a third time
+    assert queue.claim("worker-3") is None
+    assert queue.get(job["job_id"])["status"] == FAILED
+
+
+def test_queue_endpoints_and_metrics(tmp_path):
+    queue = JobQueue(str(tmp_path / "queue.db"))
+    disabled, main.job_queue = main.job_queue, queue
+    try:
+        with TestClient(main.app) as client:
+            created = client.post("/optimize/queue", json=test_payload)
+            assert created.status_code == 202
+            job_id = created.json()["job_id"]
+            assert client.post("/optimize/queue", json=test_payload).json()["deduplicated"]
+            assert "optimizer_queue_jobs{status=\"queued\"} 1" in client.get("/metrics").text
+
+            process_next(queue, "worker-1")
+            state = client.get(f"/optimize/queue/{job_id}").json()
+            assert state["status"] == COMPLETED and state["result"]["unassigned_tasks"] == []
+            assert client.get("/optimize/queue/missing").status_code == 404
+    finally:
+        main.job_queue = disabled
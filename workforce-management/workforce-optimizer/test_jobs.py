@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for asynchronous optimization jobs
+"""
+
+import asyncio
+import queue
+import threading
+
+from jobs import CANCELLED, COMPLETED, RUNNING, Job, JobManager
+from models import OptimizeRequest
+from solver_pool import SolverPool
+from test_api_fix import test_payload
+
+
+def run_with_jobs(scenario):
+    pool = SolverPool(size=1, max_queue=1)
+    jobs = JobManager(pool, poll_interval=0.02)
+
+    async def run():
+        pool.start()
+        jobs.start()
+        try:
+            return await scenario(jobs)
+        finally:
+            jobs.shutdown()
+            pool.shutdown()
+
+    return asyncio.run(run())
+
+
+def test_job_streams_solutions_and_completes():
+    """A job reports intermediate solutions and ends with the final plan"""
+    async def scenario(jobs):
+        job = jobs.submit(OptimizeRequest(**test_payload))
+        assert await job.wait_for_change(0, 60)
+        while not job.done:
+            await job.wait_for_change(job.solution_count, 60)
+        return job
+
+    job = run_with_jobs(scenario)
+    assert job.status == COMPLETED
+    assert job.solution_count >= 1
+    progress = job.summary()["progress"]
+    assert progress["assignment_rate"] == 100.0
+    assert progress["gap"] >= 0
+    assert job.result["unassigned_tasks"] == []
+
+
+def test_cancelled_job_discards_result():
+    async def scenario(jobs):
+        job = jobs.submit(OptimizeRequest(**test_payload))
+        await jobs.cancel(job)
+        # Let the pool process observe the stop event and finish
+        while jobs.pool.running:
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.1)
+        return job
+
+    job = run_with_jobs(scenario)
+    assert job.status == CANCELLED
+    assert job.result is None
+
+
+def test_updates_are_taken_off_the_event_loop():
+    """Manager queue calls block on IPC, so they must not run on the event loop"""
+    on_loop = []
+
+    class Updates(queue.Queue):
+        def get(self, *args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return super().get(*args, **kwargs)
+
+    async def scenario():
+        jobs = JobManager(pool=None, poll_interval=0.02)
+        job = Job("job", threading.Event())
+        updates = Updates()
+        future = asyncio.get_running_loop().create_future()
+        follow = asyncio.ensure_future(jobs._follow(job, future, updates))
+        updates.put({"event": "started"})
+        while job.status != RUNNING:
+            await asyncio.sleep(0.01)
+        updates.put({"solution": 1, "objective": 10.0})
+        await asyncio.sleep(0.05)
+        future.set_result({"assignments": []})
+        await follow
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == COMPLETED and job.latest == {"solution": 1, "objective": 10.0}
+    assert on_loop and not any(on_loop)
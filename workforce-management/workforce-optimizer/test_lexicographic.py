@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for the lexicographic (staged) objective
+"""
+
+import logging
+
+from ortools.sat.python import cp_model
+
+from batch import day_requests
+from instances import InstanceSpec, generate_instance
+from models import BatchOptimizeRequest, LexicographicObjective, OptimizeRequest, SolverOptions
+from optimizer import build_model, solve
+from test_api_fix import test_payload
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def staged_request(**lexicographic):
+    req = generate_instance(InstanceSpec(workers=5, tasks=6, skills=3, seed=5))
+    # Deterministic stages: the same limits and seed give the same stage plans run to run
+    req.solver_options = SolverOptions(num_search_workers=1, max_deterministic_time=0.5, random_seed=0,
+                                       time_limit=60, capacity_presolve=False)
+    req.lexicographic = LexicographicObjective(**lexicographic)
+    return req
+
+
+def priority_units(req, response) -> int:
+    priority = {t.id: t.priority for t in req.tasks}
+    return sum(a.units * priority[a.task_id] for a in response.assignments if not a.is_break)
+
+
+def worker_loads(response) -> dict:
+    loads = {}
+    for a in response.assignments:
+        if not a.is_break:
+            loads[a.worker_id] = loads.get(a.worker_id, 0) + a.units
+    return loads
+
+
+def test_first_stage_reaches_the_priority_optimum():
+    req = staged_request()
+    response = solve(req)
+    stages = response.components[0].stages
+    assert [stage.name for stage in stages] == ["priority", "quality", "fairness"]
+    assert stages[0].status == "OPTIMAL"
+
+    built = build_model(req)
+    units = [built.split_unit_vars[key] for key in built.split_unit_vars]
+    built.model.Maximize(cp_model.LinearExpr.WeightedSum(units, [built.task_map[t_id].priority for t_id, _ in built.split_unit_vars]))
+    solver = cp_model.CpSolver()
+    solver.parameters.num_search_workers = 1
+    assert solver.Solve(built.model) == cp_model.OPTIMAL
+    assert stages[0].objective == solver.ObjectiveValue()
+    # Later stages keep the priority value
+    assert priority_units(req, response) == stages[0].objective
+
+
+def test_priority_tolerance_is_respected():
+    req = staged_request(priority_tolerance=0.1)
+    response = solve(req)
+    stages = response.components[0].stages
+    assert priority_units(req, response) >= 0.9 * stages[0].objective
+
+
+def test_fairness_stage_reduces_overload():
+    """Warm-started from the quality stage's plan, the fairness stage can only lower the overload"""
+    two_stage = solve(staged_request(stage_time_limits=[20, 20]))
+    assert [stage.name for stage in two_stage.components[0].stages] == ["priority", "quality"]
+    balanced = solve(staged_request(stage_time_limits=[20, 20, 20]))
+    fairness = balanced.components[0].stages[-1]
+    assert fairness.name == "fairness"
+
+    def overload(response):
+        return sum(max(0, load - fairness.fairness_target) for load in worker_loads(response).values())
+
+    assert overload(balanced) == fairness.objective
+    assert overload(balanced) <= overload(two_stage)
+    # Quality is kept exactly (quality_tolerance 0)
+    assert balanced.components[0].stages[1].objective == two_stage.components[0].stages[1].objective
+
+
+def test_fairness_target_is_per_component():
+    """Components share no workers, so each balances its own loads around its own mean"""
+    req = staged_request(stage_time_limits=[20, 20, 20])
+    other = generate_instance(InstanceSpec(workers=4, tasks=3, skills=2, seed=8))
+    for w in other.workers:
+        w.id = f"B{w.id}"
+        w.skills = [s + 100 for s in w.skills]
+        w.productivity = {str(int(k) + 100): v for k, v in w.productivity.items()}
+        w.skill_levels = {str(int(k) + 100): v for k, v in w.skill_levels.items()}
+    for t in other.tasks:
+        t.id = f"B{t.id}"
+        t.skill_id += 100
+        t.dependencies = [f"B{d}" for d in t.dependencies or []]
+    req = OptimizeRequest(**{**req.model_dump(), "tasks": req.tasks + other.tasks, "workers": req.workers + other.workers})
+    response = solve(req)
+    assert len(response.components) == 2
+    loads = worker_loads(response)
+    targets = []
+    for component in response.components:
+        fairness = component.stages[-1]
+        assert fairness.name == "fairness"
+        on_b = component.tasks == len(other.tasks)
+        mine = [load for w_id, load in loads.items() if w_id.startswith("B") == on_b]
+        assert sum(max(0, load - fairness.fairness_target) for load in mine) == fairness.objective
+        targets.append(fairness.fairness_target)
+    assert targets[0] != targets[1]
+
+
+def test_batch_days_inherit_the_staged_objective():
+    batch = BatchOptimizeRequest(
+        workers=test_payload["workers"],
+        days=[{"date": "2025-07-14", "tasks": test_payload["tasks"]}],
+        lexicographic={"priority_tolerance": 0.05},
+    )
+    assert day_requests(batch)[0].lexicographic.priority_tolerance == 0.05
+
+
+if __name__ == "__main__":
+    test_first_stage_reaches_the_priority_optimum()
+    test_priority_tolerance_is_respected()
+    test_fairness_stage_reduces_overload()
+    test_fairness_target_is_per_component()
+    test_batch_days_inherit_the_staged_objective()
+    print("✅ Lexicographic objective tests passed")
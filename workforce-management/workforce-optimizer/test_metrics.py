@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for phase timing, request traces and the Prometheus metrics endpoint
+"""
+
+import logging
+import os
+import pstats
+
+from fastapi.testclient import TestClient
+
+from metrics import Counter, Histogram, Registry, size_class
+from models import OptimizeRequest, OptimizeResponse
+from serialization import Encoding, solve_cacheable
+from test_api_fix import test_payload
+from test_decomposition import two_site_request
+from timing import (BUILD, BUILD_DEPENDENCIES, BUILD_NO_OVERLAP, ELIGIBILITY, EXTRACTION, PARSE, QUEUE, SERIALIZATION, SOLVE,
+                    PhaseTimer, phase)
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+# Without the capacity presolve the greedy plan cannot short-cut the CP-SAT model
+cp_sat_payload = {**test_payload, "solver_options": {"capacity_presolve": False}}
+
+
+def test_phase_is_a_no_op_without_an_active_timer():
+    timer = PhaseTimer()
+    with phase(SOLVE):
+        pass
+    with timer.active():
+        with phase(SOLVE):
+            pass
+        with phase(SOLVE):
+            pass
+    with phase(BUILD):
+        pass
+    assert list(timer.phases) == [SOLVE]
+
+
+def test_solve_trace_covers_phases_and_model_size():
+    _, _, trace = solve_cacheable(OptimizeRequest(**cp_sat_payload), Encoding())
+    assert {ELIGIBILITY, BUILD, SOLVE, EXTRACTION, SERIALIZATION} <= set(trace.phases)
+    stats = trace.solver_stats
+    assert stats.variables > 0 and stats.constraints > 0 and stats.intervals > 0
+
+    # A decomposed request builds and solves only in component threads, which report into the same timer
+    _, _, trace = solve_cacheable(two_site_request(), Encoding())
+    assert {BUILD, SOLVE} <= set(trace.phases)
+
+
+def test_exposition_format():
+    registry = Registry()
+    solves = registry.register(Counter("solves_total", "Solves.", ["status"]))
+    seconds = registry.register(Histogram("solve_seconds", "Solve time.", ["size"], buckets=(1.0, 10.0)))
+    solves.inc(status="OPTIMAL")
+    solves.inc(status="OPTIMAL")
+    seconds.observe(0.5, size="xs")
+    seconds.observe(5.0, size="xs")
+    lines = registry.render().decode().splitlines()
+    assert "# TYPE solves_total counter" in lines
+    assert 'solves_total{status="OPTIMAL"} 2' in lines
+    assert 'solve_seconds_bucket{size="xs",le="1"} 1' in lines
+    assert 'solve_seconds_bucket{size="xs",le="+Inf"} 2' in lines
+    assert 'solve_seconds_sum{size="xs"} 5.5' in lines
+    assert [size_class(10, 10), size_class(100, 200), size_class(5000, 1000)] == ["xs", "m", "xl"]
+
+
+def test_metrics_endpoint_records_solves_and_cache_outcomes():
+    from main import app, result_cache
+
+    result_cache.backend.clear()
+    with TestClient(app) as client:
+        client.post("/optimize", json=cp_sat_payload, headers={"Cache-Control": "no-cache"})
+        client.post("/optimize", json=cp_sat_payload)
+        response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    for phase_name in ("parse", "eligibility", "build", "solve", "extraction", "serialization"):
+        assert f'optimizer_phase_seconds_count{{phase="{phase_name}"}}' in text
+    assert 'optimizer_cache_requests_total{outcome="hit"}' in text
+    assert 'optimizer_solve_seconds_count{size="xs"}' in text
+    assert "optimizer_model_intervals " in text
+    assert "optimizer_solves_in_flight 0" in text
+
+
+def test_trace_header_returns_phase_breakdown_and_profile(tmp_path):
+    from main import app, result_cache
+
+    os.environ["OPTIMIZER_PROFILE_DIR"] = str(tmp_path)
+    result_cache.backend.clear()
+    try:
+        with TestClient(app) as client:
+            plain = client.post("/optimize", json=cp_sat_payload)
+            assert OptimizeResponse.model_validate_json(plain.content).trace is None
+
+            traced = client.post("/optimize", json=cp_sat_payload, headers={"X-Optimizer-Trace": "timing"})
+            assert "x-cache" not in traced.headers
+            trace = OptimizeResponse.model_validate_json(traced.content).trace
+            assert {PARSE, QUEUE, BUILD, BUILD_NO_OVERLAP, BUILD_DEPENDENCIES, SOLVE, EXTRACTION} <= set(trace.phases)
+            assert trace.phases[BUILD_DEPENDENCIES] <= trace.phases[BUILD] <= trace.wall_time
+            assert trace.profile is None
+
+            profiled = client.post("/optimize", json=cp_sat_payload, headers={"X-Optimizer-Trace": "profile"})
+            path = OptimizeResponse.model_validate_json(profiled.content).trace.profile
+            assert os.path.dirname(path) == str(tmp_path)
+            assert any(func == "build_model" for _, _, func in pstats.Stats(path).stats)
+
+            assert client.post("/optimize", json=cp_sat_payload, headers={"X-Optimizer-Trace": "yes"}).status_code == 400
+            os.environ["OPTIMIZER_PROFILE_DIR"] = "off"
+            assert client.post("/optimize", json=cp_sat_payload, headers={"X-Optimizer-Trace": "profile"}).status_code == 400
+    finally:
+        del os.environ["OPTIMIZER_PROFILE_DIR"]
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    test_phase_is_a_no_op_without_an_active_timer()
+    test_solve_trace_covers_phases_and_model_size()
+    test_exposition_format()
+    test_metrics_endpoint_records_solves_and_cache_outcomes()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_trace_header_returns_phase_breakdown_and_profile(Path(tmp))
+    print("✅ Metrics tests passed")
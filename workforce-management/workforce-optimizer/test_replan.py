@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental intraday re-planning
+"""
+
+import logging
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from instances import InstanceSpec, generate_instance
+from models import OptimizeRequest
+from optimizer import solve
+from replan import freeze_committed, now_on_shift_axis
+from roster import normalize_workers
+from test_api_fix import test_payload
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+NOW = "2025-07-17T03:30:00"
+
+
+def replan_instance() -> OptimizeRequest:
+    """Day, evening and night shifts, so at NOW only the night shift is still open"""
+    shifts = {"day": 1, "evening": 1, "night": 1}
+    return generate_instance(InstanceSpec(workers=6, tasks=4, skills=2, dependency_density=0.3, shift_mix=shifts,
+                                          load_factor=0.3, seed=0))
+
+
+def work(response):
+    return [a for a in response.assignments if not a.is_break]
+
+
+def test_now_on_night_shift_axis():
+    assert now_on_shift_axis("2025-07-16", (0, 480), NOW) == 210
+    assert now_on_shift_axis("2025-07-16", (480, 960), NOW) == 1650
+    assert now_on_shift_axis("2025-07-16", (960, 1440), "2025-07-16T12:00:00") == 720
+
+
+def test_started_work_is_frozen():
+    req = replan_instance()
+    first = solve(req)
+    frozen = freeze_committed(req.model_copy(update={"now": NOW, "committed_assignments": first.assignments}),
+                              normalize_workers(req.workers).shift_bounds())
+    started = [a for a in work(first) if a.start < NOW]
+    assert frozen.assignments == started
+    assert len(frozen.pending) == len(work(first)) - len(started)
+    # The in-progress piece blocks its worker until it ends
+    in_progress = [a for a in started if a.end > NOW]
+    for a in in_progress:
+        assert frozen.window_start[a.worker_id] >= now_on_shift_axis(req.date, (0, 480), a.end)
+
+
+def test_replan_keeps_frozen_work_and_plans_the_rest_after_now():
+    req = replan_instance()
+    first = solve(req)
+    started = [a for a in work(first) if a.start < NOW]
+    req.tasks[0].units += 40
+    rerun = solve(req.model_copy(update={"now": NOW, "committed_assignments": first.assignments}))
+    assert rerun.components[0].status == "OPTIMAL"
+    for a in started:
+        assert a in rerun.assignments
+    blocked_until = {a.worker_id: a.end for a in started}
+    for a in work(rerun):
+        if a in started:
+            continue
+        # Day and evening shifts are over by NOW, so all new work is on the night shift
+        assert a.start >= NOW
+        assert a.start >= blocked_until.get(a.worker_id, "")
+    planned = {t.id: 0 for t in req.tasks}
+    for a in work(rerun):
+        planned[a.task_id] += a.units
+    for t in req.tasks:
+        assert planned[t.id] <= t.units
+    remaining = {u.id: u.remaining_units for u in rerun.unassigned_tasks}
+    assert all(planned[t.id] + remaining.get(t.id, 0) == t.units for t in req.tasks)
+
+
+@pytest.mark.parametrize("mode", ["exact", "fast"])
+def test_dependency_is_not_planned_after_its_dependent_started(mode):
+    """Task 2 depends on task 1 and is already under way, so task 1's units left cannot go after it"""
+    worker = test_payload["workers"][0]
+    req = OptimizeRequest(**{
+        **test_payload,
+        "tasks": [{**test_payload["tasks"][0], "units": 30},
+                  {**test_payload["tasks"][0], "id": "2", "units": 40, "dependencies": ["1"]}],
+        "workers": [worker, {**worker, "id": "TEST002", "name": "Second Worker"}],
+    }, mode=mode, now="2025-08-05T09:00:00",
+        committed_assignments=[{"worker_id": "TEST002", "task_id": "2", "start": "2025-08-05T08:30:00",
+                                "end": "2025-08-05T09:30:00", "units": 40}])
+    rerun = solve(req)
+    assert [a.task_id for a in work(rerun)] == ["2"]
+    assert [(u.id, u.remaining_units) for u in rerun.unassigned_tasks] == [("1", 30)]
+
+
+def test_timestamps_with_an_offset_become_local_time():
+    committed = {"worker_id": "TEST001", "task_id": "1", "start": "2025-08-05T08:00:00Z",
+                 "end": "2025-08-05T09:00:00+00:00", "units": 10}
+    req = OptimizeRequest(**test_payload, now="2025-08-05T10:00:00.000Z", committed_assignments=[committed])
+    assert req.now == "2025-08-05T10:00:00"
+    assert (req.committed_assignments[0].start, req.committed_assignments[0].end) == ("2025-08-05T08:00:00", "2025-08-05T09:00:00")
+    berlin = OptimizeRequest(**test_payload, now="2025-08-05T10:00:00+02:00", timezone="Europe/Berlin")
+    assert berlin.now == "2025-08-05T10:00:00"
+    assert OptimizeRequest(**test_payload, now="2025-08-05T10:00:00+02:00").now == "2025-08-05T08:00:00"
+    # Naive timestamps are already local
+    assert OptimizeRequest(**test_payload, now="2025-08-05T10:00:00").now == "2025-08-05T10:00:00"
+
+    rerun = solve(req)
+    assert [a.start for a in work(rerun) if a.start < req.now] == ["2025-08-05T08:00:00"]
+
+
+def test_malformed_timestamps_are_rejected():
+    with pytest.raises(ValidationError):
+        OptimizeRequest(**test_payload, now="not-a-date")
+    with pytest.raises(ValidationError):
+        OptimizeRequest(**test_payload, timezone="Mars/Olympus")
+    bad = {"worker_id": "TEST001", "task_id": "1", "start": "8 o'clock", "end": "2025-08-05T09:00:00", "units": 10}
+    with pytest.raises(ValidationError):
+        OptimizeRequest(**test_payload, committed_assignments=[bad])
+
+    from main import app
+    with TestClient(app) as client:
+        response = client.post("/optimize", json={**test_payload, "now": "not-a-date"})
+    assert response.status_code == 422
+
+
+if __name__ == "__main__":
+    test_now_on_night_shift_axis()
+    test_started_work_is_frozen()
+    test_replan_keeps_frozen_work_and_plans_the_rest_after_now()
+    test_dependency_is_not_planned_after_its_dependent_started("exact")
+    test_timestamps_with_an_offset_become_local_time()
+    test_malformed_timestamps_are_rejected()
+    print("✅ Re-plan tests passed")
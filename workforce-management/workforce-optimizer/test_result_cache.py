@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed result cache
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+from fastapi.testclient import TestClient
+
+from models import OptimizeRequest, OptimizeResponse, SolverStats
+from result_cache import COALESCED, HIT, MISS, DiskCache, MemoryCache, ResultCache, is_final, request_key
+from test_api_fix import test_payload
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def test_request_key_is_canonical():
+    req = OptimizeRequest(**test_payload)
+    payload = dict(test_payload)
+    payload["workers"] = [{**w, "productivity": {str(k): v for k, v in w["productivity"].items()}}
+                          for w in test_payload["workers"]]
+    assert request_key(OptimizeRequest(**payload)) == request_key(req)
+    assert request_key(req.model_copy(update={"date": "2025-08-06"})) != request_key(req)
+
+
+def test_memory_cache_evicts_lru_and_expires():
+    cache = MemoryCache(ttl_seconds=60, max_entries=2, max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"
+    cache.put("c", b"1234")  # over the entry limit: "b" is least recently used
+    assert cache.get("b") is None and cache.get("a") is not None
+    cache.put("d", b"12345678")  # over the byte limit
+    assert cache.stats()["bytes"] <= 10 and cache.get("d") == b"12345678"
+    assert cache.stats()["evictions"] == 3
+
+    cache.ttl_seconds = 0
+    time.sleep(0.01)
+    assert cache.get("d") is None
+
+
+def test_disk_cache_shares_entries_and_evicts(tmp_path):
+    cache = DiskCache(str(tmp_path), ttl_seconds=60, max_entries=2, max_bytes=1024)
+    cache.put("a", b"plan a")
+    assert DiskCache(str(tmp_path), 60, 2, 1024).get("a") == b"plan a"
+    os.utime(tmp_path / "a.json", (time.time() - 10, os.stat(tmp_path / "a.json").st_mtime))
+    cache.put("b", b"plan b")
+    assert cache.get("b") == b"plan b"
+    cache.put("c", b"plan c")
+    assert cache.get("a") is None and cache.stats()["entries"] == 2
+
+    expired = DiskCache(str(tmp_path), ttl_seconds=0, max_entries=2, max_bytes=1024)
+    time.sleep(0.01)
+    assert expired.get("b") is None
+
+
+def test_concurrent_identical_requests_are_coalesced():
+    cache = ResultCache(MemoryCache(ttl_seconds=60, max_entries=8, max_bytes=1024))
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return b"plan", "encoded"
+
+    async def run():
+        first = await asyncio.gather(*(cache.get("k", compute) for _ in range(3)))
+        return first, await cache.get("k", compute), await cache.get("k", compute, refresh=True)
+
+    first, hit, refreshed = asyncio.run(run())
+    assert [outcome for _, _, outcome in first] == [MISS, COALESCED, COALESCED]
+    assert [extra for _, extra, _ in first] == ["encoded", None, None]
+    assert hit == (b"plan", None, HIT)
+    assert refreshed[2] == MISS and len(calls) == 2
+    assert cache.stats()["hits"] == 1 and cache.stats()["coalesced"] == 2
+
+
+def test_plans_not_proven_optimal_expire_sooner(tmp_path):
+    for backend in (MemoryCache(ttl_seconds=60, max_entries=8, max_bytes=1024),
+                    DiskCache(str(tmp_path), ttl_seconds=60, max_entries=8, max_bytes=1024)):
+        cache = ResultCache(backend, provisional_ttl=0.05)
+
+        async def compute(status):
+            return status.encode(), status
+
+        async def run():
+            outcomes = []
+            for status in ("OPTIMAL", "FEASIBLE"):
+                for _ in range(2):
+                    _, _, outcome = await cache.get(status, lambda: compute(status), final=lambda s: s == "OPTIMAL")
+                    outcomes.append(outcome)
+            await asyncio.sleep(0.1)
+            for status in ("OPTIMAL", "FEASIBLE"):
+                _, _, outcome = await cache.get(status, lambda: compute(status), final=lambda s: s == "OPTIMAL")
+                outcomes.append(outcome)
+            return outcomes
+
+        assert asyncio.run(run()) == [MISS, HIT, MISS, HIT, HIT, MISS]
+
+    unstored = ResultCache(MemoryCache(ttl_seconds=60, max_entries=8, max_bytes=1024), provisional_ttl=0)
+
+    async def feasible():
+        return b"plan", None
+
+    asyncio.run(unstored.get("k", feasible, final=lambda _: False))
+    assert unstored.backend.stats()["entries"] == 0
+
+
+def test_is_final():
+    assert is_final(SolverStats(status="OPTIMAL", wall_time=0.1))
+    assert is_final(SolverStats(status="INFEASIBLE", wall_time=0.1))
+    assert not is_final(SolverStats(status="FEASIBLE", engine="greedy", wall_time=0.1))
+    assert not is_final(None)
+
+
+def test_optimize_endpoint_serves_repeats_from_cache():
+    from main import app, result_cache
+
+    result_cache.backend.clear()
+    with TestClient(app) as client:
+        first = client.post("/optimize", json=test_payload, headers={"Cache-Control": "no-cache"})
+        second = client.post("/optimize", json=test_payload)
+        assert (first.headers["x-cache"], second.headers["x-cache"]) == (MISS, HIT)
+        assert second.content == first.content
+
+        ndjson = client.post("/optimize", json=test_payload, headers={"Accept": "application/x-ndjson"})
+        assert ndjson.headers["x-cache"] == HIT
+        assert len(ndjson.text.splitlines()) == len(OptimizeResponse.model_validate_json(first.content).assignments) + 1
+        assert client.get("/health").json()["result_cache"]["hits"] >= 2
+
+
+if __name__ == "__main__":
+    import tempfile
+    from pathlib import Path
+
+    test_request_key_is_canonical()
+    test_memory_cache_evicts_lru_and_expires()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_disk_cache_shares_entries_and_evicts(Path(tmp))
+    test_concurrent_identical_requests_are_coalesced()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_plans_not_proven_optimal_expire_sooner(Path(tmp))
+    test_is_final()
+    test_optimize_endpoint_serves_repeats_from_cache()
+    print("✅ Result cache tests passed")
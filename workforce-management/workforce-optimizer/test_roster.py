@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Tests for the normalized roster and vectorized eligibility
+"""
+
+import math
+
+from benchmark_eligibility import scalar_eligibility
+from instances import InstanceSpec, generate_instance
+from models import Task, Worker
+from optimizer import get_skill_quality_score
+from roster import compute_eligibility, normalize_workers
+
+
+def test_vectorized_eligibility_matches_scalar_scan():
+    req = generate_instance(InstanceSpec(workers=300, tasks=120, skills=8, dependency_density=0, seed=11))
+    eligibility = compute_eligibility(req.tasks, normalize_workers(req.workers))
+    assert sum(len(e) for e in eligibility.values()) == scalar_eligibility(req)
+
+
+def test_pair_attributes_match_scalar_helpers():
+    """Mixed str/int keys resolve like the dict lookups they replace"""
+    worker = Worker(id="W1", name="Mixed Keys", skills=[100, 200], productivity={"100": 80, 200: 45},
+                    skill_levels={100: 3}, shift_start="16:00", shift_end="00:00", break_minutes=60)
+    roster = normalize_workers([worker])
+    tasks = [Task(id="1", name="Pick", skill_id=100, priority=5, units=10),
+             Task(id="2", name="Pack", skill_id=200, priority=5, units=10),
+             Task(id="3", name="Ship", skill_id=300, priority=5, units=10)]
+    eligibility = compute_eligibility(tasks, roster)
+
+    assert roster.shift_bounds() == {"W1": (960, 1440)}
+    for task, prod in ((tasks[0], 80), (tasks[1], 45)):
+        pair = eligibility[task.id]
+        assert pair.workers.tolist() == [0]
+        assert pair.quality[0] == get_skill_quality_score(worker, task.skill_id)
+        # One contiguous piece: at most the 240 minutes before the break
+        assert pair.max_units[0] == math.floor(prod * (240 / 60.0))
+    assert len(eligibility["3"]) == 0
+
+
+def test_critical_tasks_accept_under_skilled_workers_with_penalty():
+    worker = Worker(id="W1", name="Junior", skills=[100], productivity={"100": 80}, skill_levels={"100": 1},
+                    shift_start="08:00", shift_end="16:00")
+    roster = normalize_workers([worker])
+    tasks = [Task(id="7", name="Important", skill_id=100, priority=7, units=10),
+             Task(id="9", name="Critical", skill_id=100, priority=9, units=10)]
+    eligibility = compute_eligibility(tasks, roster)
+
+    assert len(eligibility["7"]) == 0
+    assert eligibility["9"].quality[0] == max(0.1, get_skill_quality_score(worker, 100) - 2 * 0.2)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for batch solution extraction, vectorized timestamps and response encoding
+"""
+
+import gzip
+import json
+import logging
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from instances import InstanceSpec, generate_instance
+from models import OptimizeRequest, OptimizeResponse
+from optimizer import shift_timestamp_strings, shift_timestamps, solve
+from serialization import GZIP_MIN_BYTES, JSON, NDJSON, Encoding, encode, negotiate
+from test_api_fix import test_payload
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def test_vectorized_timestamps_match_scalar():
+    # Day shift, night shift 00:00-08:00 and an evening shift crossing midnight
+    cases = [((480, 960), 500, 560), ((0, 480), 30, 90), ((960, 1440 + 120), 1400, 1460), ((960, 1440 + 120), 1000, 1100)]
+    bounds = np.array([b for b, _, _ in cases])
+    starts, ends = shift_timestamp_strings("2025-07-14", bounds[:, 0], bounds[:, 1],
+                                           np.array([c[1] for c in cases]), np.array([c[2] for c in cases]))
+    for (b, start, end), start_iso, end_iso in zip(cases, starts, ends):
+        start_dt, end_dt = shift_timestamps("2025-07-14", b, start, end)
+        assert (start_iso, end_iso) == (start_dt.isoformat(), end_dt.isoformat())
+
+
+def test_ndjson_and_gzip_carry_the_json_response():
+    req = generate_instance(InstanceSpec(workers=200, tasks=150, skills=10, dependency_density=0, seed=3)).model_copy(update={"mode": "fast"})
+    response = solve(req)
+    plain = encode(response)
+    assert plain.media_type == JSON and not plain.gzipped
+    assert OptimizeResponse.model_validate_json(plain.content) == response
+
+    lines = [json.loads(line) for line in encode(response, Encoding(media_type=NDJSON)).content.splitlines()]
+    assert [line["assignment"] for line in lines[:-1]] == [a.model_dump() for a in response.assignments]
+    assert lines[-1]["result"] == response.model_dump(exclude={"assignments"})
+
+    compressed = encode(response, Encoding(gzip=True))
+    assert len(plain.content) >= GZIP_MIN_BYTES and compressed.gzipped
+    assert gzip.decompress(compressed.content) == plain.content
+
+
+def test_negotiate_reads_headers():
+    assert negotiate("application/x-ndjson, */*;q=0.1", "gzip, deflate") == Encoding(media_type=NDJSON, gzip=True)
+    assert negotiate("application/json", "") == Encoding()
+
+
+def test_optimize_endpoint_encodes_in_the_pool():
+    from main import app
+
+    with TestClient(app) as client:
+        response = client.post("/optimize", json=test_payload)
+        assert response.status_code == 200
+        planned = OptimizeResponse.model_validate(response.json())
+        assert planned.assignments == solve(OptimizeRequest(**test_payload)).assignments
+
+        response = client.post("/optimize", json=test_payload, headers={"Accept": NDJSON})
+        assert response.headers["content-type"].startswith(NDJSON)
+        assert json.loads(response.text.splitlines()[-1])["result"]["unassigned_tasks"] == []
+
+
+if __name__ == "__main__":
+    test_vectorized_timestamps_match_scalar()
+    test_ndjson_and_gzip_carry_the_json_response()
+    test_negotiate_reads_headers()
+    test_optimize_endpoint_encodes_in_the_pool()
+    print("✅ Serialization tests passed")
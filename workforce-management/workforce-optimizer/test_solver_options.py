@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for per-request solver options and solver statistics
+"""
+
+import logging
+
+import pytest
+from ortools.sat.python import cp_model
+from pydantic import ValidationError
+
+from models import OptimizeRequest, SolverOptions
+from optimizer import solve
+from solver_options import DEFAULT_TIME_LIMIT, apply_options, resolve_options, share_search_workers
+from test_api_fix import test_payload
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def test_explicit_fields_override_the_preset():
+    options = resolve_options(SolverOptions(preset="interactive", time_limit=2.0))
+    assert options.time_limit == 2.0
+    assert options.relative_gap_limit == 0.02
+    assert resolve_options(None).time_limit == DEFAULT_TIME_LIMIT
+    assert resolve_options(SolverOptions(random_seed=3)).time_limit == DEFAULT_TIME_LIMIT
+
+
+def test_unknown_preset_is_rejected():
+    with pytest.raises(ValidationError):
+        SolverOptions(preset="fastest")
+
+
+def test_options_reach_cp_sat_parameters():
+    solver = cp_model.CpSolver()
+    options = resolve_options(SolverOptions(num_search_workers=2, random_seed=11, absolute_gap_limit=5,
+                                            max_deterministic_time=3.0))
+    apply_options(solver, options, 1.5)
+    assert solver.parameters.max_time_in_seconds == 1.5
+    assert solver.parameters.num_search_workers == 2
+    assert solver.parameters.random_seed == 11
+    assert solver.parameters.absolute_gap_limit == 5
+    assert solver.parameters.max_deterministic_time == 3.0
+
+
+def test_concurrent_solves_share_the_search_workers(monkeypatch):
+    options = resolve_options(SolverOptions(num_search_workers=8))
+    assert share_search_workers(options, 1) is options
+    assert share_search_workers(options, 3).num_search_workers == 2
+    assert share_search_workers(options, 16).num_search_workers == 1
+    # Unset: CP-SAT would start one worker per core in every solve
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    assert share_search_workers(resolve_options(None), 2).num_search_workers == 2
+
+
+def test_response_carries_solver_stats():
+    # Without the capacity presolve this small request would skip CP-SAT
+    req = OptimizeRequest(**test_payload, solver_options={"preset": "interactive", "num_search_workers": 1,
+                                                          "capacity_presolve": False})
+    response = solve(req)
+    stats = response.solver_stats
+    assert stats.status == "OPTIMAL"
+    assert stats.objective == stats.best_bound == sum(c.objective for c in response.components)
+    assert stats.gap == 0
+    assert stats.variables > 0 and stats.constraints > 0
+    assert stats.wall_time >= sum(c.solve_time for c in response.components) / len(response.components)
+
+
+if __name__ == "__main__":
+    test_explicit_fields_override_the_preset()
+    test_unknown_preset_is_rejected()
+    test_options_reach_cp_sat_parameters()
+    test_response_carries_solver_stats()
+    print("✅ Solver option tests passed")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for running solves on the bounded solver process pool
+"""
+
+import asyncio
+import multiprocessing
+import subprocess
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from models import OptimizeRequest
+from optimizer import solve
+from solver_pool import PoolSaturatedError, PoolUnavailableError, SolverPool
+from test_api_fix import test_payload
+
+
+def test_pool_runs_solve_in_worker_process():
+    """A solve submitted to the pool returns the same plan as an in-process solve"""
+    req = OptimizeRequest(**test_payload)
+    pool = SolverPool(size=1, max_queue=0)
+
+    async def run():
+        pool.start()
+        try:
+            return await pool.run(solve, req)
+        finally:
+            pool.shutdown()
+
+    response = asyncio.run(run())
+    work = [a for a in response.assignments if not a.is_break]
+    assert sum(a.units for a in work) == 50
+    assert response.unassigned_tasks == []
+
+
+def test_pool_rejects_when_queue_is_full():
+    """Requests beyond size + max_queue are rejected instead of queued"""
+    pool = SolverPool(size=1, max_queue=0, retry_after=7)
+
+    async def run():
+        pool.start()
+        try:
+            first = asyncio.ensure_future(pool.run(time.sleep, 0.5))
+            await asyncio.sleep(0)
+            assert pool.running == 1
+            with pytest.raises(PoolSaturatedError) as excinfo:
+                await pool.run(time.sleep, 0)
+            assert excinfo.value.retry_after == 7
+            await first
+            assert pool.stats()["running"] == 0
+        finally:
+            pool.shutdown()
+
+    asyncio.run(run())
+
+
+def test_pool_unavailable_before_start():
+    pool = SolverPool(size=1, max_queue=0)
+    with pytest.raises(PoolUnavailableError):
+        asyncio.run(pool.run(time.sleep, 0))
+
+
+def wait_until_ready(pool: SolverPool, timeout: float = 60.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not pool.ready and time.monotonic() < deadline:
+        time.sleep(0.1)
+    return pool.ready
+
+
+def test_pool_warms_every_process_at_start():
+    pool = SolverPool(size=2, max_queue=0)
+    assert not pool.ready
+    pool.start()
+    try:
+        assert wait_until_ready(pool)
+        assert pool.stats()["warm"] == 2
+    finally:
+        pool.shutdown()
+    assert not pool.ready
+
+
+def test_failed_warm_up_is_counted_and_does_not_block_readiness(monkeypatch):
+    import main
+    import solver_pool
+
+    def broken_warm_up():
+        raise RuntimeError("warm-up failed")
+
+    monkeypatch.setattr(solver_pool, "configure_logging", lambda: None)
+    monkeypatch.setattr(solver_pool, "warm_up", broken_warm_up)
+    warm, failed = multiprocessing.Value("i", 0), multiprocessing.Value("i", 0)
+    solver_pool._initialize(warm, failed, True)
+    assert (warm.value, failed.value) == (0, 1)
+
+    # One process failed its warm-up, the other warmed up: the pool is ready, with the failure reported
+    pool = SolverPool(size=2, max_queue=0)
+    monkeypatch.setattr(pool, "_executor", object())
+    pool._warm, pool._failed = multiprocessing.Value("i", 1), failed
+    assert pool.ready
+    assert pool.stats()["warm"] == 1 and pool.stats()["warm_up_failed"] == 1
+    monkeypatch.setattr(main, "solver_pool", pool)
+    assert asyncio.run(main.readiness())["status"] == "degraded"
+
+
+def test_api_process_does_not_load_ortools():
+    """OR-Tools is only imported by pool processes, so the API starts fast"""
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print(any(m.startswith('ortools') for m in sys.modules))"],
+        capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    assert loaded == "False"
+
+
+def test_readiness_waits_for_the_warm_pool():
+    from main import app, solver_pool
+
+    with TestClient(app) as client:
+        assert client.get("/health/live").status_code == 200
+        assert wait_until_ready(solver_pool)
+        ready = client.get("/health/ready")
+        assert ready.status_code == 200 and ready.json()["solver_pool"]["ready"]
+    assert client.get("/health/ready").status_code == 503
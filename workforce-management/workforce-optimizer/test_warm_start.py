@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for warm-starting from a previous plan
+"""
+
+import logging
+
+from instances import InstanceSpec, generate_instance
+from optimizer import shift_timestamps, solve
+from roster import normalize_workers
+from warm_start import previous_plan, to_model_minutes
+
+logging.getLogger("optimizer").setLevel(logging.ERROR)
+
+
+def work(response):
+    return {(a.task_id, a.worker_id): a.units for a in response.assignments if not a.is_break}
+
+
+def test_model_minutes_round_trip_across_midnight():
+    for bounds, minute in (((480, 960), 600), ((960, 1440), 1000), ((960, 1680), 1500), ((0, 480), 120)):
+        start_dt, _ = shift_timestamps("2025-07-16", bounds, minute, minute + 30)
+        assert to_model_minutes("2025-07-16", bounds, start_dt.isoformat()) == minute
+
+
+def test_previous_plan_maps_back_onto_model():
+    req = generate_instance(InstanceSpec(workers=6, tasks=4, skills=2, dependency_density=0.3, load_factor=0.3, seed=4))
+    first = solve(req)
+    plan = previous_plan(req.date, first.assignments, normalize_workers(req.workers).shift_bounds())
+    assert {key: units for key, (_, _, units) in plan.items()} == work(first)
+
+
+def test_stability_weight_keeps_previous_pairs():
+    req = generate_instance(InstanceSpec(workers=6, tasks=4, skills=2, dependency_density=0.3, load_factor=0.3, seed=4))
+    first = solve(req)
+    req.tasks[0].units += 5
+    rerun = solve(req.model_copy(update={"previous_assignments": first.assignments, "stability_weight": 100000}))
+    assert rerun.components[0].status == "OPTIMAL"
+    assert set(work(rerun)) == set(work(first))
@@ -0,0 +1,129 @@
+"""Wall-clock time per phase of a solve, and opt-in profiles of single requests.
+
+``solve`` and its helpers wrap each phase in ``phase(name)``. Durations are
+only collected while a ``PhaseTimer`` is active in the current context, so
+callers that do not ask for them (tests, benchmarks, jobs) pay nothing.
+Component threads add into the same timer, so for a decomposed request a
+phase's total can exceed the request's wall time. Dotted phases
+(``build.dependencies``) are parts of the phase before the dot.
+
+``profiled`` runs a block under cProfile and writes the stats (pstats format,
+readable with ``python -m pstats`` or snakeviz) to ``OPTIMIZER_PROFILE_DIR``.
+"""
+import contextvars
+import cProfile
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, Optional
+
+from models import SolverStats
+
+PARSE = "parse"  # request body read and validated (API process)
+QUEUE = "queue"  # waiting for a pool process
+DIAGNOSTICS = "diagnostics"  # per-task eligibility analysis, only with DEBUG logging
+ROSTER = "roster"  # worker columns and break windows
+ELIGIBILITY = "eligibility"
+PRESOLVE = "presolve"  # capacity LP, decomposition and greedy plan
+BUILD = "build"  # CP-SAT model construction and hints
+BUILD_NO_OVERLAP = "build.no_overlap"  # per-worker no-overlap with break intervals
+BUILD_DEPENDENCIES = "build.dependencies"
+SOLVE = "solve"
+EXTRACTION = "extraction"  # solution values to assignments
+SERIALIZATION = "serialization"
+
+PHASES = (PARSE, QUEUE, DIAGNOSTICS, ROSTER, ELIGIBILITY, PRESOLVE, BUILD, BUILD_NO_OVERLAP, BUILD_DEPENDENCIES,
+          SOLVE, EXTRACTION, SERIALIZATION)
+
+PROFILE_KEEP = 20  # newest profiles kept in the profile directory
+
+_active: contextvars.ContextVar[Optional["PhaseTimer"]] = contextvars.ContextVar("phase_timer", default=None)
+
+
+class PhaseTimer:
+    """Seconds spent per phase; safe to add to from several threads."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def active(self) -> Iterator["PhaseTimer"]:
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+
+
+@contextmanager
+def phase(name: str):
+    """Time the block as ``name`` when a timer is active."""
+    timer = _active.get()
+    if timer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - started)
+
+
+@dataclass
+class SolveTrace:
+    """What the API process learns about a solve that ran in a pool process."""
+    workers: int
+    tasks: int
+    phases: Dict[str, float] = field(default_factory=dict)
+    solver_stats: Optional[SolverStats] = None
+
+
+@dataclass
+class TraceRequest:
+    """An ``X-Optimizer-Trace`` request, carried to the pool process with the solve."""
+    parse_seconds: float
+    submitted_at: float  # time.time() when handed to the pool, to measure the queue wait
+    profile: bool = False
+
+
+def profile_dir() -> Optional[str]:
+    """Where profiles are written; None when ``OPTIMIZER_PROFILE_DIR=off``."""
+    directory = os.getenv("OPTIMIZER_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "workforce-optimizer-profiles"))
+    return None if directory.lower() == "off" else directory
+
+
+@contextmanager
+def profiled(directory: str, keep: int = PROFILE_KEEP) -> Iterator[str]:
+    """Profile the block's thread; yields the path the stats are written to when it ends.
+
+    Only the calling thread is profiled, so work in component threads shows up
+    as the time spent waiting for them. Older profiles beyond ``keep`` are removed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.prof")
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield path
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        _prune(directory, keep)
+
+
+def _prune(directory: str, keep: int):
+    profiles = sorted((entry.stat().st_mtime, entry.path) for entry in os.scandir(directory) if entry.name.endswith(".prof"))
+    for _, path in profiles[:-keep]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
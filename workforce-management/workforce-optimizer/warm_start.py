@@ -0,0 +1,81 @@
+"""Warm-start a solve from a previous plan.
+
+Planners re-optimize many times a day after small edits. Assignments from the
+previous plan that still map onto the new model become CP-SAT solution hints,
+and ``stability_weight`` optionally penalizes (task, worker) pairs that are
+added or dropped relative to that plan, which keeps the Gantt chart stable.
+"""
+import datetime
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from models import Assignment
+
+logger = logging.getLogger("optimizer")
+
+
+def to_model_minutes(date: str, shift_bounds: Tuple[int, int], iso: str) -> Optional[int]:
+    """Inverse of ``optimizer.shift_timestamps``: ISO datetime -> minutes on the worker's shift axis."""
+    base_dt = datetime.datetime.fromisoformat(f"{date}T00:00")
+    minutes = int((datetime.datetime.fromisoformat(iso) - base_dt).total_seconds() // 60)
+    shift_start, shift_end = shift_bounds
+    # Night and post-midnight work is emitted on the next day of the Gantt timeline
+    for candidate in (minutes, minutes - 24 * 60):
+        if shift_start <= candidate <= shift_end:
+            return candidate
+    return None
+
+
+def previous_plan(date: str, assignments: List[Assignment], shift_bounds: Dict[str, Tuple[int, int]]) -> Dict[Tuple[str, str], Tuple[int, int, int]]:
+    """(task id, worker id) -> (start, end, units) for previous work assignments on known workers."""
+    plan = {}
+    skipped = 0
+    for a in assignments:
+        if a.is_break or a.units <= 0:
+            continue
+        bounds = shift_bounds.get(a.worker_id)
+        start = end = None
+        if bounds is not None:
+            try:
+                start = to_model_minutes(date, bounds, a.start)
+                end = to_model_minutes(date, bounds, a.end)
+            except ValueError:
+                pass
+        if start is None or end is None:
+            skipped += 1
+            continue
+        key = (a.task_id, a.worker_id)
+        if key in plan:
+            # A pair has a single interval in the model: merge split rows
+            prev_start, prev_end, prev_units = plan[key]
+            plan[key] = (min(prev_start, start), max(prev_end, end), prev_units + a.units)
+        else:
+            plan[key] = (start, end, a.units)
+    if skipped:
+        logger.info(f"Warm start: {skipped} previous assignments no longer fit a worker's shift")
+    return plan
+
+
+def add_solution_hints(model, plan: Dict[Tuple[str, str], Tuple[int, int, int]], presences: dict,
+                       start_vars: dict, end_vars: dict, split_unit_vars: dict, max_units: Dict[Tuple[str, str], int],
+                       granularity: int = 1):
+    """Hint every pair: previous pairs keep their start/end/units, all others are hinted absent.
+
+    Plans are in minutes; on a model grid of ``granularity`` minutes each piece
+    is hinted from the next step boundary for as many steps as its duration needs.
+    """
+    mapped = 0
+    for key, presence in presences.items():
+        if key in plan:
+            start, end, units = plan[key]
+            if granularity > 1:
+                start, end = -(-start // granularity), -(-start // granularity) + -(-(end - start) // granularity)
+            model.AddHint(presence, 1)
+            model.AddHint(start_vars[key], start)
+            model.AddHint(end_vars[key], end)
+            model.AddHint(split_unit_vars[key], min(units, max_units[key]))
+            mapped += 1
+        else:
+            model.AddHint(presence, 0)
+            model.AddHint(split_unit_vars[key], 0)
+    logger.info(f"Warm start: {mapped} of {len(plan)} previous assignments map onto the model")